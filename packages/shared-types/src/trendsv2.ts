@@ -71,6 +71,7 @@ export interface SkillTrendV2Item {
   /** Momentum (optional if previous period missing) */
   job_count_change_pct?: number; // Δ vs prev period
   median_salary_change_pct?: number; // Δ vs prev period
+  job_count_smoothed_change_pct?: number; // Δ of the N-period mean vs the N before
   trend_signal?: "rising" | "falling" | "steady";
 
   /** Which dimension this row represents */
@@ -0,0 +1,561 @@
+cat > backfill.py << "EOF"
+#!/usr/bin/env python3
+"""
+One scan of job-postings-enhanced, fanned out to every backfill that reads it.
+
+    python3 backfill.py                                   # all sinks
+    python3 backfill.py --sinks v2,status --segments 8
+    python3 backfill.py --sinks normalized,lookups --resume
+
+Sinks (--sinks, comma-separated):
+    normalized  job-postings-normalized items        (normalize.py)
+    lookups     technology / skill posting counts -> job-postings-technologies
+                / -skills, written once the scan is complete (normalize.py)
+    v1          job-tech-index rows, PK display name  (job-tech-index.py)
+    v2          job-tech-index-v2 rows, PK slug       (jtindex.py)
+    status      Active / Expired reconcile            (statusadd.py --full)
+
+The scan projects the union of the attributes the selected sinks read.
+Each page goes to every sink's bounded queue; a sink works through its
+queue on its own thread and writes through its own BatchWriter pool. A
+slow sink holds the scan back once its queue is full, the others keep
+going with what they have queued. Rebuilding everything costs one read
+pass, not four.
+
+Every CHECKPOINT_PAGES pages each sink drains its queue and flushes its
+writes, then the scan position and the sinks' state (the lookup counts)
+are checkpointed; --resume continues from there. Index sinks only put
+rows, like a plain jtindex.py run (--incremental there also deletes).
+
+The status sink runs first, on the scan thread: a page's status updates
+go through the lifecycle engine's UpdateItem pool before the page is
+queued for the others, which get each posting with the status the updater
+actually wrote (or, when its update failed or was skipped, as read), so
+normalized items and index rows match the table. --dedup runs
+once per page before the fan-out: duplicates are written to the
+normalized table with duplicate_of, but aren't counted and get no index
+rows. --max-wcu / --capacity-pct cap all sinks' writes together.
+"""
+
+import abc
+import argparse
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from capacity import CapacityGovernor, add_capacity_args, governor_from_args
+from checkpoint import Checkpoint, add_checkpoint_args, default_path
+from dates import add_date_args, set_policy
+from ddbscan import SegmentScanError, add_scan_args, scan_pages
+from ddbwriter import DEFAULT_WORKERS, BatchWriter, add_writer_args
+from dedup import DEDUP_ATTRS, add_dedup_args, dedup_from_args
+from indexrows import V1_TABLE, V2_TABLE, display_puts, slug_puts
+from lifecycle import ATTRS as LIFECYCLE_ATTRS
+from lifecycle import APPLIED, MAX_AGE_DAYS, LifecycleEngine
+from metrics import Metrics, add_metrics_args, metrics_from_args
+from normalize import build_normalized_item, normalize_posting, write_lookup_table
+from normalize import dynamodb, normalized_table, skills_table, source_table, tech_table
+from postings import COUNT_ATTRS, DESCRIPTION_ATTRS, WRITE_ATTRS
+from postings import AttributeLoader, Posting, projection
+from snapshot import COLUMNS, add_snapshot_args, open_snapshot
+
+SINKS = ("normalized", "lookups", "v1", "v2", "status")
+CHECKPOINT_JOB = "backfill"
+CHECKPOINT_PAGES = 20  # drain + flush every sink, then checkpoint
+DEFAULT_QUEUE_PAGES = 8  # pages buffered per sink
+
+
+class Sink(abc.ABC):
+    """One consumer of the scan; handle() runs on the sink's own thread."""
+
+    name = ""
+    attrs: Sequence[str] = ()
+
+    @abc.abstractmethod
+    def handle(self, items: List[Dict[str, Any]], dup_of: List[Optional[str]]):
+        """Process one page (dup_of[i]: canonical job id of a duplicate, or None)."""
+
+    def flush(self) -> None:
+        """Everything handled so far has landed."""
+
+    def state(self) -> Dict[str, Any]:
+        """What a resumed run needs back (saved with the checkpoint)."""
+        return {}
+
+    def finish(self, complete: bool) -> None:
+        """After the last page; complete=False when the scan stopped early."""
+
+    def close(self) -> None:
+        pass
+
+    def summary(self) -> str:
+        return ""
+
+
+class WriterSink(Sink):
+    def __init__(
+        self,
+        table,
+        key_names: List[str],
+        workers: int = DEFAULT_WORKERS,
+        governor: Optional[CapacityGovernor] = None,
+        metrics: Optional[Metrics] = None,
+        dry_run: bool = False,
+    ):
+        self.writer = BatchWriter(
+            table,
+            key_names=key_names,
+            workers=workers,
+            governor=governor,
+            metrics=metrics,
+        )
+        if metrics:
+            metrics.watch(writer=self.writer, name=self.name)
+        self.dry_run = dry_run
+
+    def put(self, item: Dict[str, Any]) -> None:
+        if not self.dry_run:
+            self.writer.put(item)
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.close()
+
+    def summary(self) -> str:
+        return self.writer.stats.summary()
+
+
+class NormalizedSink(WriterSink):
+    name = "normalized"
+    attrs = WRITE_ATTRS + DESCRIPTION_ATTRS
+
+    def __init__(self, table, loader: Optional[AttributeLoader] = None, **writer_opts):
+        super().__init__(table, ["Id"], **writer_opts)
+        self.loader = loader
+        self.written = 0
+        self.failed = 0
+
+    def handle(self, items, dup_of):
+        postings = [Posting(it) for it in items]
+        if self.loader is not None:
+            self.loader.fill(postings)
+        for posting, dup in zip(postings, dup_of):
+            try:
+                item = build_normalized_item(posting)
+                if dup is not None:
+                    item["duplicate_of"] = dup
+                self.put(item)
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"✗ normalized: {posting.get('jobId')} not written: {e}")
+
+    def summary(self) -> str:
+        return f"items={self.written} failed={self.failed} {super().summary()}"
+
+
+class LookupSink(Sink):
+    name = "lookups"
+    attrs = COUNT_ATTRS
+    COUNTERS = ("counted", "skipped_normalized", "duplicates")
+
+    def __init__(
+        self,
+        state: Optional[Dict[str, Any]] = None,
+        workers: int = DEFAULT_WORKERS,
+        governor: Optional[CapacityGovernor] = None,
+        metrics: Optional[Metrics] = None,
+        dry_run: bool = False,
+    ):
+        state = state or {}
+        self.tech_index = state.get("tech_index", {})
+        self.skill_index = state.get("skill_index", {})
+        self.counters = {k: state.get(k, 0) for k in self.COUNTERS}
+        self.workers = workers
+        self.governor = governor
+        self.metrics = metrics
+        self.dry_run = dry_run
+
+    def handle(self, items, dup_of):
+        c = self.counters
+        for it, dup in zip(items, dup_of):
+            # same rules as migrate_postings: normalized postings aren't recounted
+            if it.get("normalized") == True:
+                c["skipped_normalized"] += 1
+            elif dup is not None:
+                c["duplicates"] += 1
+            else:
+                c["counted"] += 1
+                normalize_posting(Posting(it), self.tech_index, self.skill_index)
+
+    def state(self):
+        return {
+            "tech_index": self.tech_index,
+            "skill_index": self.skill_index,
+            **self.counters,
+        }
+
+    def finish(self, complete):
+        if not complete or self.dry_run:
+            return
+        lookups = ((tech_table, self.tech_index), (skills_table, self.skill_index))
+        for table, index in lookups:
+            print(f"Writing {len(index)} terms to {table.name}...")
+            write_lookup_table(table, index, self.workers, self.governor, self.metrics)
+
+    def summary(self) -> str:
+        c = self.counters
+        return (
+            f"counted={c['counted']} skipped_normalized={c['skipped_normalized']} "
+            f"duplicates={c['duplicates']} technologies={len(self.tech_index)} "
+            f"skills={len(self.skill_index)}"
+        )
+
+
+class IndexSink(WriterSink):
+    attrs = LIFECYCLE_ATTRS  # what build_puts reads
+
+    def __init__(self, name: str, table, build_rows, **writer_opts):
+        self.name = name
+        super().__init__(table, ["PK", "SK"], **writer_opts)
+        self.build_rows = build_rows
+        self.rows = 0
+
+    def handle(self, items, dup_of):
+        for j, dup in zip(items, dup_of):
+            if dup is not None:
+                continue
+            puts = self.build_rows(j)
+            for p in puts:
+                self.put(p["PutRequest"]["Item"])
+            self.rows += len(puts)
+
+    def summary(self) -> str:
+        return f"rows={self.rows} {super().summary()}"
+
+
+class StatusSink(Sink):
+    """Runs on the scan thread, before the page is queued for the other sinks."""
+
+    name = "status"
+    attrs = LIFECYCLE_ATTRS
+
+    def __init__(self, engine: LifecycleEngine):
+        self.engine = engine
+
+    def handle(self, items, dup_of) -> List[Dict[str, Any]]:
+        """Apply the page's transitions; returns the items with what was applied."""
+        moves = list(self.engine.transitions(items))
+        outcomes = self.engine.update(moves)
+        applied = {
+            id(it): status
+            for (it, status), outcome in zip(moves, outcomes)
+            if outcome == APPLIED
+        }
+        return [
+            {**it, "status": applied[id(it)]} if id(it) in applied else it
+            for it in items
+        ]
+
+    def summary(self) -> str:
+        return self.engine.summary()
+
+
+class SinkRunner:
+    """A sink's bounded page queue and the thread working through it."""
+
+    def __init__(self, sink: Sink, queue_pages: int, metrics: Metrics):
+        self.sink = sink
+        self.metrics = metrics
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_pages))
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(
+            target=self._run, name=f"sink-{sink.name}", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                if self.error is None:  # after a failure, just drain
+                    items, dup_of = job
+                    with self.metrics.stage(f"sink.{self.sink.name}", items=len(items)):
+                        self.sink.handle(items, dup_of)
+            except Exception as e:
+                self.error = e
+                print(f"✗ sink {self.sink.name} failed: {e}", file=sys.stderr)
+            finally:
+                self.queue.task_done()
+
+    def check(self):
+        if self.error is not None:
+            raise RuntimeError(f"sink {self.sink.name} failed: {self.error}")
+
+    def submit(self, items, dup_of):
+        """Queue a page; blocks while the queue is full."""
+        while True:
+            self.check()
+            try:
+                self.queue.put((items, dup_of), timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        self.metrics.gauge(f"sink_queue.{self.sink.name}", self.queue.qsize())
+
+    def drain(self):
+        """Wait until every queued page is handled and its writes have landed."""
+        self.queue.join()
+        self.check()
+        self.sink.flush()
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
+
+
+def make_sinks(
+    names: Sequence[str],
+    state: Dict[str, Dict[str, Any]],
+    write_workers: int = DEFAULT_WORKERS,
+    update_workers: int = DEFAULT_WORKERS,
+    max_age_days: int = MAX_AGE_DAYS,
+    governor: Optional[CapacityGovernor] = None,
+    metrics: Optional[Metrics] = None,
+    loader: Optional[AttributeLoader] = None,
+    dry_run: bool = False,
+) -> List[Sink]:
+    opts = dict(
+        workers=write_workers, governor=governor, metrics=metrics, dry_run=dry_run
+    )
+    engine = None
+    if "status" in names:
+        engine = LifecycleEngine(
+            source_table,
+            max_age_days=max_age_days,
+            workers=update_workers,
+            governor=governor,
+            metrics=metrics,
+            dry_run=dry_run,
+        )
+    sinks: List[Sink] = []
+    for name in names:
+        if name == "normalized":
+            sinks.append(NormalizedSink(normalized_table, loader, **opts))
+        elif name == "lookups":
+            sinks.append(LookupSink(state.get(name), **opts))
+        elif name == "v1":
+            table = dynamodb.Table(V1_TABLE)
+            sinks.append(IndexSink(name, table, display_puts, **opts))
+        elif name == "v2":
+            table = dynamodb.Table(V2_TABLE)
+            sinks.append(IndexSink(name, table, slug_puts, **opts))
+        elif name == "status":
+            sinks.append(StatusSink(engine))
+    return sinks
+
+
+def parse_sinks(value: str) -> List[str]:
+    names = [s.strip() for s in value.split(",") if s.strip()]
+    unknown = [s for s in names if s not in SINKS]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(
+            f"unknown sink(s) {', '.join(unknown) or '-'} "
+            f"(choose from {', '.join(SINKS)})"
+        )
+    return [s for s in SINKS if s in names]  # fixed order, no repeats
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="One scan of job-postings-enhanced, many backfills (see module doc)"
+    )
+    ap.add_argument(
+        "--sinks",
+        type=parse_sinks,
+        default=list(SINKS),
+        help=f"comma-separated, from {','.join(SINKS)} (default: all)",
+    )
+    ap.add_argument(
+        "--sink-queue-pages",
+        type=int,
+        default=DEFAULT_QUEUE_PAGES,
+        help="pages buffered per sink before the scan waits (default: %(default)s)",
+    )
+    ap.add_argument(
+        "--update-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="status sink: concurrent UpdateItem calls (default: %(default)s)",
+    )
+    ap.add_argument(
+        "--max-age-days",
+        type=int,
+        default=MAX_AGE_DAYS,
+        help="status sink: days a posting stays Active (default: %(default)s)",
+    )
+    ap.add_argument(
+        "--dry-run", action="store_true", help="run every sink, write nothing"
+    )
+    add_scan_args(ap)
+    add_writer_args(ap)
+    add_capacity_args(ap)
+    add_snapshot_args(ap)
+    add_date_args(ap)
+    add_metrics_args(ap)
+    add_dedup_args(ap)
+    add_checkpoint_args(ap, CHECKPOINT_JOB)
+    ap.set_defaults(checkpoint=None)  # unset: a dry run gets its own (below)
+    args = ap.parse_args()
+    set_policy(args.unparseable_dates)
+
+    source = source_table
+    names = args.sinks
+    if args.checkpoint is None:  # an explicit --checkpoint is used as given
+        suffix = "-dry-run" if args.dry_run else ""  # leave the real one alone
+        args.checkpoint = default_path(f"{CHECKPOINT_JOB}{suffix}")
+    job = f"{CHECKPOINT_JOB}:{','.join(names)}"
+    snap = open_snapshot(args.snapshot) if args.snapshot else None
+    if snap:  # offline: one "segment", resumable by row offset
+        cp = Checkpoint.open(args.checkpoint, f"{job}@snapshot", 1, resume=args.resume)
+    else:
+        cp = Checkpoint.open(args.checkpoint, job, args.segments, resume=args.resume)
+    metrics = metrics_from_args(args, CHECKPOINT_JOB)
+    write_table = normalized_table if "normalized" in names else None
+    governor = governor_from_args(args, read_table=source, write_table=write_table)
+    metrics.watch(governor=governor)
+    dedup = dedup_from_args(args)
+
+    attrs: List[str] = []
+    for name in names:
+        attrs += {
+            "normalized": NormalizedSink.attrs,
+            "lookups": LookupSink.attrs,
+            "status": StatusSink.attrs,
+        }.get(name, IndexSink.attrs)
+    if dedup is not None:
+        attrs += DEDUP_ATTRS
+    attrs = list(dict.fromkeys(attrs))
+    loader = None
+    lazy = [a for a in NormalizedSink.attrs if a not in COLUMNS]
+    if snap and not snap.full and "normalized" in names and lazy:
+        loader = AttributeLoader(source, lazy, governor, metrics)
+        print(f"↻ Projected snapshot: {', '.join(lazy)} are read from the table")
+
+    sinks = make_sinks(
+        names,
+        cp.counters.get("sinks", {}),
+        args.write_workers,
+        args.update_workers,
+        args.max_age_days,
+        governor,
+        metrics,
+        loader,
+        args.dry_run,
+    )
+    # the status sink runs inline so the others see the statuses it applied
+    status = next((s for s in sinks if isinstance(s, StatusSink)), None)
+    queued = [s for s in sinks if s is not status]
+    runners = [SinkRunner(s, args.sink_queue_pages, metrics) for s in queued]
+    scanned = cp.counters.get("scanned", 0)
+    print(f"Backfilling from {source.name} → {', '.join(names)}")
+    if cp.total_segments > 1:
+        workers = args.workers or "auto"
+        print(f"  parallel scan: {cp.total_segments} segments, workers={workers}")
+
+    def commit():
+        with metrics.stage("drain"):
+            for r in runners:
+                r.drain()
+        if dedup is not None and not args.dry_run:
+            dedup.save()
+        cp.commit(scanned=scanned, sinks={s.name: s.state() for s in sinks})
+
+    start = time.time()
+    try:
+        if cp.complete:
+            # resumed after the scan finished: only the sinks' finish steps are left
+            print("↻ Scan already complete; skipping to the post-scan steps")
+            pages = ()
+        elif snap:
+            pages = snap.pages_from(cp.start_keys())
+        else:
+            pages = scan_pages(
+                source,
+                segments=cp.total_segments,
+                workers=args.workers,
+                only_segments=(
+                    cp.remaining_segments()
+                    if args.only_segments is None
+                    else args.only_segments
+                ),
+                start_keys=cp.start_keys(),
+                governor=governor,
+                metrics=metrics,
+                backend=args.scan_backend,
+                **projection(attrs),
+            )
+        for n, page in enumerate(metrics.pages(pages), 1):
+            dup_of = [None] * len(page.items)
+            if dedup is not None:
+                with metrics.stage("dedup", items=len(page.items)):
+                    dup_of = dedup.check(page.items)
+            items = page.items
+            if status is not None:
+                with metrics.stage("sink.status", items=len(items)):
+                    items = status.handle(items, dup_of)
+            with metrics.stage("fan_out", items=len(items)):
+                for r in runners:
+                    r.submit(items, dup_of)
+            scanned += len(page.items)
+            cp.page_done(page.segment, page.last_key)
+            if n % CHECKPOINT_PAGES == 0:
+                commit()
+                print(f"✓ Scanned {scanned} postings")
+        commit()
+        for s in sinks:
+            with metrics.stage(f"finish.{s.name}"):
+                s.finish(cp.complete)
+        for r in runners:
+            r.stop()
+            r.sink.close()
+        if cp.complete:
+            cp.finish()
+        print(f"✓ Done. scanned={scanned} in {time.time() - start:.1f}s")
+        for s in sinks:
+            print(f"  {s.name}: {s.summary()}")
+        if dedup is not None:
+            print(f"  dedup: {dedup.summary()}")
+        print(f"  capacity: {governor.summary()}")
+        print(f"  stages: {metrics.summary()}")
+    except KeyboardInterrupt:
+        print(
+            f"\n✗ Interrupted. Checkpoint: {args.checkpoint} (rerun with --resume)",
+            file=sys.stderr,
+        )
+        sys.exit(130)
+    except SegmentScanError as e:
+        commit()
+        print(f"✗ {e}. scanned={scanned}", file=sys.stderr)
+        print(
+            "  rerun with --resume to scan only the unfinished segments",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        print(f"  checkpoint: {args.checkpoint} (rerun with --resume)", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        metrics.close()
+
+
+if __name__ == "__main__":
+    main()
+EOF
@@ -0,0 +1,389 @@
+cat > bench.py << "EOF"
+#!/usr/bin/env python3
+"""
+Benchmarks for the backfill hot paths, on a seeded synthetic corpus
+(benchcorpus.py).
+
+    python3 bench.py micro [--n 20000]                     # hot functions
+    python3 bench.py e2e --sizes 10000,100000,1000000      # whole scripts on moto
+    python3 bench.py all
+    python3 bench.py compare OLD.json NEW.json [--threshold 0.1]
+
+micro times normalize_term (cold and memoized), slugify_tech, term_slug,
+iso_utc, build_puts, the per-posting work of migrate_postings
+(normalize_posting + build_normalized_item) and TermCounter.add, best of
+--repeat runs. e2e loads the corpus into an in-process DynamoDB (moto) and
+times jtindex.main(), migrate_postings() (plain and --batch-normalize) and
+statusadd's batch_update_items() end to end.
+
+Each run writes bench-results/bench-<commit>-<time>.json; `compare` prints
+the per-benchmark ratio between two of them and exits 1 if anything got
+slower than --threshold. Runs happen in a scratch directory, so checkpoints
+and the term map of the real working tree are untouched.
+
+e2e needs moto (pip install "moto[dynamodb]"); 1M postings with full-size
+descriptions need several GB of RAM, see --description-words.
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional
+
+from benchcorpus import DESCRIPTION_WORDS, generate
+
+RESULTS_DIR = "bench-results"
+DEFAULT_SIZES = "10000"
+MICRO_N = 20_000
+PAGE_ROWS = 1000  # TermCounter.add batch size, ~ one scan page
+
+SOURCE_TABLE = "job-postings-enhanced"
+INDEX_TABLES = ("job-tech-index", "job-tech-index-v2")
+LOOKUP_TABLES = (
+    "job-postings-technologies",
+    "job-postings-skills",
+    "job-postings-benefits",
+    "job-postings-requirements",
+    "job-postings-industries",
+)
+NORMALIZED_TABLE = "job-postings-normalized"
+
+
+def _moto():
+    try:
+        import moto
+    except ImportError as e:
+        raise SystemExit(f'bench.py e2e needs moto (pip install "moto[dynamodb]"): {e}')
+    return moto
+
+
+def timed(fn: Callable[[], Any], ops: int, repeat: int, setup: Callable[[], Any] = None):
+    """Best/median wall time of `repeat` runs of fn (setup() runs untimed first)."""
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    best = min(runs)
+    return {
+        "ops": ops,
+        "best_s": best,
+        "median_s": statistics.median(runs),
+        "ns_per_op": best / ops * 1e9 if ops else None,
+        "ops_per_s": ops / best if best else None,
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """The scripts report progress on stdout; keep it out of the results."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ---------- micro ----------
+def micro(n: int, seed: int, repeat: int, description_words) -> Dict[str, Any]:
+    import dates
+    import normalize
+    from canonicalize import Canonicalizer, slugify_tech
+    from jtindex import build_puts
+    from termcount import TermCounter
+    from termmap import TermMap
+
+    postings = list(generate(n, seed, description_words=description_words))
+    terms = [t for p in postings for t in p.get("technologies", [])]
+    raw_dates = [p.get("processed_date") for p in postings]
+    pages = [postings[i : i + PAGE_ROWS] for i in range(0, n, PAGE_ROWS)]
+    print(f"micro: {n} postings, {len(terms)} technology mentions, {len(set(terms))} distinct")
+
+    results = {}
+
+    def run(name, fn, ops, setup=None):
+        results[name] = r = timed(fn, ops, repeat, setup)
+        print(f"  {name:<32} {r['ns_per_op']:>12,.0f} ns/op  {r['ops_per_s']:>14,.0f} ops/s")
+
+    canon = {}
+
+    def fresh_canonicalizer():
+        canon["c"] = Canonicalizer()
+
+    run(
+        "normalize_term[cold]",
+        lambda: [canon["c"].normalize(t) for t in terms],
+        len(terms),
+        setup=fresh_canonicalizer,
+    )
+    warm = Canonicalizer()
+    for t in terms:
+        warm.normalize(t)
+    run("normalize_term[memoized]", lambda: [warm.normalize(t) for t in terms], len(terms))
+    run("slugify_tech", lambda: [slugify_tech(t) for t in terms], len(terms))
+
+    tm = TermMap()  # in memory: no file I/O in the numbers
+    for t in terms:
+        tm.slug(t)
+    run("term_slug[mapped]", lambda: [tm.slug(t) for t in terms], len(terms))
+
+    run(
+        "iso_utc[cold]",
+        lambda: [dates.iso_utc(d) for d in raw_dates],
+        len(raw_dates),
+        setup=dates._parse.cache_clear,
+    )
+    run("iso_utc[memoized]", lambda: [dates.iso_utc(d) for d in raw_dates], len(raw_dates))
+    run("build_puts", lambda: [build_puts(p) for p in postings], n)
+
+    # migrate_postings' per-posting work; it rewrites postings, so copy first
+    work = {}
+
+    def fresh_postings():
+        work["postings"] = copy.deepcopy(postings)
+
+    def normalize_all():
+        tech_index, skill_index = {}, {}
+        for p in work["postings"]:
+            normalize.normalize_posting(p, tech_index, skill_index)
+            normalize.build_normalized_item(p)
+
+    run("normalize_posting+build_item", normalize_all, n, setup=fresh_postings)
+
+    def count_pages():
+        counter = TermCounter(id_for=normalize.get_id_from_name)
+        for page in pages:
+            counter.add(page)
+
+    try:
+        run("TermCounter.add", count_pages, n)
+    except SystemExit as e:  # numpy missing: skip, don't fail the run
+        print(f"  ⚠ TermCounter.add skipped: {e}")
+    return results
+
+
+# ---------- e2e ----------
+def create_tables(ddb) -> None:
+    def make(name, keys):
+        ddb.create_table(
+            TableName=name,
+            KeySchema=[{"AttributeName": k, "KeyType": t} for k, t in keys],
+            AttributeDefinitions=[{"AttributeName": k, "AttributeType": "S"} for k, _ in keys],
+            BillingMode="PAY_PER_REQUEST",
+        ).wait_until_exists()
+
+    make(SOURCE_TABLE, [("jobId", "HASH")])
+    for name in INDEX_TABLES:
+        make(name, [("PK", "HASH"), ("SK", "RANGE")])
+    for name in LOOKUP_TABLES:
+        make(name, [("Id", "HASH"), ("Name", "RANGE")])
+    make(NORMALIZED_TABLE, [("Id", "HASH")])
+
+
+def drop_tables(ddb) -> None:
+    for t in ddb.tables.all():
+        t.delete()
+
+
+def load_corpus(ddb, n: int, seed: int, description_words, write_workers: int) -> float:
+    from ddbwriter import BatchWriter
+
+    t0 = time.perf_counter()
+    with BatchWriter(ddb.Table(SOURCE_TABLE), key_names=["jobId"], workers=write_workers) as w:
+        for item in generate(n, seed, description_words=description_words):
+            w.put(item)
+    return time.perf_counter() - t0
+
+
+def run_jtindex(args) -> bool:
+    import jtindex
+
+    argv = sys.argv
+    sys.argv = ["jtindex.py", "--write-workers", str(args.write_workers)]
+    try:
+        jtindex.main()
+    except SystemExit as e:
+        return not e.code
+    finally:
+        sys.argv = argv
+    return True
+
+
+def run_normalize(args, batch: bool = False) -> bool:
+    import normalize
+
+    return bool(normalize.migrate_postings(write_workers=args.write_workers, batch_normalize=batch))
+
+
+def run_statusadd(args) -> bool:
+    import statusadd
+
+    return bool(statusadd.batch_update_items(statusadd.table, write_workers=args.write_workers))
+
+
+# statusadd updates statuses in the source table, so it goes last
+SCRIPTS = {
+    "jtindex": run_jtindex,
+    "normalize": run_normalize,
+    "normalize-batch": lambda args: run_normalize(args, batch=True),
+    "statusadd": run_statusadd,
+}
+
+
+def e2e(args) -> Dict[str, Any]:
+    import boto3
+
+    ddb = boto3.resource("dynamodb")
+    results = {}
+    for n in [int(s) for s in args.sizes.split(",")]:
+        drop_tables(ddb)
+        create_tables(ddb)
+        load_s = load_corpus(ddb, n, args.seed, args.description_words, args.write_workers)
+        print(f"e2e: {n} postings (loaded in {load_s:.1f}s)")
+        size = results[str(n)] = {"load_s": load_s}
+        for name in args.scripts.split(","):
+            t0 = time.perf_counter()
+            with quiet():
+                ok = SCRIPTS[name](args)
+            secs = time.perf_counter() - t0
+            size[name] = {"ok": ok, "seconds": secs, "postings_per_s": n / secs if secs else None}
+            mark = "✓" if ok else "✗"
+            print(f"  {mark} {name:<16} {secs:>9.2f}s  {n / secs:>10,.0f} postings/s")
+    return results
+
+
+# ---------- results ----------
+def git_commit(repo: str) -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment(args, commit: Optional[str]) -> Dict[str, Any]:
+    versions = {}
+    for mod in ("numpy", "moto", "boto3", "pyarrow"):
+        try:
+            versions[mod] = __import__(mod).__version__
+        except ImportError:
+            versions[mod] = None
+    return {
+        "commit": commit or os.environ.get("BENCH_COMMIT"),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": versions,
+        "seed": args.seed,
+        "description_words": list(args.description_words),
+    }
+
+
+def flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    """benchmark name -> seconds (lower is better), for compare."""
+    flat = {}
+    for name, r in results.get("micro", {}).items():
+        flat[f"micro/{name}"] = r["ns_per_op"] / 1e9
+    for n, scripts in results.get("e2e", {}).items():
+        for name, r in scripts.items():
+            if isinstance(r, dict) and r.get("ok"):
+                flat[f"e2e/{n}/{name}"] = r["seconds"]
+    return flat
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    with open(old_path) as f:
+        old = flatten(json.load(f))
+    with open(new_path) as f:
+        new = flatten(json.load(f))
+    slower = 0
+    for name in sorted(set(old) & set(new)):
+        ratio = new[name] / old[name] if old[name] else float("inf")
+        mark = "⚠" if ratio > 1 + threshold else ("✓" if ratio < 1 - threshold else " ")
+        slower += mark == "⚠"
+        print(f"{mark} {name:<44} {old[name]:>12.6g}s → {new[name]:>12.6g}s  x{ratio:.2f}")
+    for name in sorted(set(old) ^ set(new)):
+        print(f"  {name:<44} only in {'old' if name in old else 'new'}")
+    print(f"{slower} slower by more than {threshold:.0%}")
+    return 1 if slower else 0
+
+
+def _words(s: str):
+    lo, hi = (int(x) for x in s.split(","))
+    return lo, hi
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark the backfill hot paths")
+    ap.add_argument("mode", choices=("micro", "e2e", "all", "compare"))
+    ap.add_argument("files", nargs="*", help="compare: OLD.json NEW.json")
+    ap.add_argument("--n", type=int, default=MICRO_N, help="micro corpus size (default: %(default)s)")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help="e2e corpus sizes, e.g. 10000,100000,1000000")
+    ap.add_argument("--scripts", default=",".join(SCRIPTS), help="e2e scripts (default: %(default)s)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=5, help="micro runs per benchmark (best is kept)")
+    ap.add_argument("--write-workers", type=int, default=8)
+    ap.add_argument(
+        "--description-words",
+        type=_words,
+        default=DESCRIPTION_WORDS,
+        help="min,max words per job_description (default: %s,%s)" % DESCRIPTION_WORDS,
+    )
+    ap.add_argument("--out", default=None, help=f"results file (default: {RESULTS_DIR}/bench-<commit>-<time>.json)")
+    ap.add_argument("--threshold", type=float, default=0.10, help="compare: tolerated slowdown")
+    args = ap.parse_args()
+
+    if args.mode == "compare":
+        if len(args.files) != 2:
+            ap.error("compare needs OLD.json NEW.json")
+        sys.exit(compare(*args.files, args.threshold))
+    unknown = set(args.scripts.split(",")) - set(SCRIPTS)
+    if unknown:
+        ap.error(f"unknown scripts: {', '.join(sorted(unknown))}")
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    commit = git_commit(here)
+    out = os.path.abspath(
+        args.out
+        or os.path.join(RESULTS_DIR, f"bench-{commit or 'nocommit'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    )
+    if args.mode in ("e2e", "all"):
+        # the stand-in must be up before the scripts create their boto3 resources
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+        os.environ["AWS_ACCESS_KEY_ID"] = os.environ["AWS_SECRET_ACCESS_KEY"] = "bench"
+        stand_in = _moto().mock_aws()
+        stand_in.start()
+    else:
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")  # import-time resources
+
+    scratch = tempfile.mkdtemp(prefix="bench-")
+    os.environ["TERMMAP_DIR"] = os.path.join(scratch, ".termmap")
+    os.chdir(scratch)  # checkpoints/term map land here, not in the working tree
+
+    results = {"env": environment(args, commit)}
+    if args.mode in ("micro", "all"):
+        results["micro"] = micro(args.n, args.seed, args.repeat, args.description_words)
+    if args.mode in ("e2e", "all"):
+        results["e2e"] = e2e(args)
+
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"✓ Results: {out} (peak RSS {peak_mb:.0f} MB)")
+EOF
@@ -0,0 +1,194 @@
+cat > benchcorpus.py << "EOF"
+#!/usr/bin/env python3
+"""
+Seeded synthetic job-postings-enhanced corpus for the benchmarks (bench.py).
+
+Technologies and skills follow a Zipf distribution over a vocabulary of real
+canonical terms (each with the messy spellings seen in scraped postings:
+"ReactJS", "react.js", "Node JS", ...) plus a long tail of rare terms.
+processed_date mixes ISO, date-only, epoch s/ms, prose dates, missing and
+garbage values; descriptions are several KB. Same seed, same corpus.
+
+    python3 benchcorpus.py --n 10000 --out corpus.jsonl
+"""
+
+import argparse
+import bisect
+import itertools
+import random
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+ZIPF_S = 1.1
+LONG_TAIL = 5000  # rare techs after the head vocabulary
+DESCRIPTION_WORDS = (150, 1200)  # ~1-8 KB job_description
+
+# canonical -> spellings seen in the wild (first one is the tidy form)
+TECH_VARIANTS = {
+    "Python": ["Python", "python", "PYTHON", " Python "],
+    "JavaScript": ["JavaScript", "javascript", "Javascript", "JS"],
+    "React": ["React", "ReactJS", "react.js", "reactjs", "React.JS", "react"],
+    "AWS": ["AWS", "aws", "Amazon Web Services"],
+    "TypeScript": ["TypeScript", "typescript", "Typescript", "TS"],
+    "SQL": ["SQL", "sql"],
+    "Node.js": ["Node.js", "Node JS", "node.js", "NodeJS", "nodejs", "Node"],
+    "Docker": ["Docker", "docker"],
+    "Kubernetes": ["Kubernetes", "kubernetes", "k8s", "K8s"],
+    "Java": ["Java", "java"],
+    "PostgreSQL": ["PostgreSQL", "Postgres", "postgresql", "postgres", "Postgre SQL"],
+    "Go": ["Go", "golang", "Golang", "GoLang"],
+    "Git": ["Git", "git"],
+    "C#": ["C#", "c#", "C Sharp"],
+    "C++": ["C++", "c++", "cpp"],
+    "Redis": ["Redis", "redis"],
+    "MongoDB": ["MongoDB", "mongo", "Mongo DB", "mongodb"],
+    "GCP": ["GCP", "gcp", "Google Cloud"],
+    "Azure": ["Azure", "azure", "Microsoft Azure"],
+    "Django": ["Django", "django"],
+    "FastAPI": ["FastAPI", "fastapi", "Fast API"],
+    "Flask": ["Flask", "flask"],
+    "Next.js": ["Next.js", "NextJS", "next.js", "Next"],
+    "Vue": ["Vue", "Vue.js", "vuejs", "VueJS"],
+    "Angular": ["Angular", "AngularJS", "angular.js"],
+    "Rust": ["Rust", "rust"],
+    "Terraform": ["Terraform", "terraform"],
+    "GraphQL": ["GraphQL", "graphql", "Graph QL"],
+    "Spring Boot": ["Spring Boot", "Spring.boot", "springboot", "Spring-Boot"],
+    ".NET": [".NET", ".net", "dotnet", "DotNet"],
+    "PyTorch": ["PyTorch", "pytorch", "Torch"],
+    "TensorFlow": ["TensorFlow", "tensorflow", "Tensor Flow"],
+    "Elasticsearch": ["Elasticsearch", "ElasticSearch", "elastic search"],
+    "DynamoDB": ["DynamoDB", "dynamodb", "Dynamo DB"],
+    "Express": ["Express", "Express.js", "expressjs"],
+    "Jenkins": ["Jenkins", "jenkins"],
+    "GitHub": ["GitHub", "Github", "github"],
+    "GitLab": ["GitLab", "Gitlab", "gitlab"],
+    "Svelte": ["Svelte", "SvelteJS", "svelte.js"],
+    "Nuxt": ["Nuxt", "Nuxt.js", "nuxtjs"],
+}
+SKILLS = [
+    "Communication",
+    "Teamwork",
+    "Problem Solving",
+    "Leadership",
+    "Mentoring",
+    "Agile",
+    "Scrum",
+    "System Design",
+    "Code Review",
+    "Stakeholder Management",
+    "communication",
+    "team work",
+    "problem-solving",
+]
+WORDS = (
+    "build scalable reliable services team customers data platform ship own "
+    "design review mentor cloud infrastructure product users growth fast "
+    "pipelines latency observability secure deliver impact roadmap quality"
+).split()
+LOCATIONS = ["Remote, US", "New York, NY, US", "San Francisco, CA, US", "Toronto, CA", "London, UK", ""]
+SENIORITY = ["Junior", "Mid", "Senior", "Staff", "Principal", "senior", None]
+REMOTE = ["remote", "hybrid", "on_site", "Remote", None]
+SALARIES = ["$120k-$150k", "120,000 - 150,000 USD", "$55/hr", "£70,000", "Unknown", None]
+
+
+def _zipf_cum(n: int, s: float = ZIPF_S) -> List[float]:
+    return list(itertools.accumulate(1.0 / (r**s) for r in range(1, n + 1)))
+
+
+class CorpusGenerator:
+    def __init__(
+        self,
+        seed: int = 0,
+        long_tail: int = LONG_TAIL,
+        description_words: Tuple[int, int] = DESCRIPTION_WORDS,
+    ):
+        self.rng = random.Random(seed)
+        self.description_words = description_words
+        tail = [f"tech{i}" for i in range(long_tail)]
+        self.techs: List[Sequence[str]] = list(TECH_VARIANTS.values()) + [
+            [t, t.upper(), t.title()] for t in tail
+        ]
+        self.tech_cum = _zipf_cum(len(self.techs))
+        self.skill_cum = _zipf_cum(len(SKILLS))
+
+    def _pick(self, cum: List[float]) -> int:
+        return bisect.bisect(cum, self.rng.random() * cum[-1])
+
+    def _techs(self) -> List[str]:
+        rng = self.rng
+        out = []
+        for _ in range(rng.randint(0, 12)):
+            variants = self.techs[self._pick(self.tech_cum)]
+            # tidy spelling most of the time, a messy one otherwise
+            out.append(variants[0] if rng.random() < 0.6 else rng.choice(variants))
+        return out
+
+    def _date(self) -> Any:
+        rng = self.rng
+        epoch = 1_735_689_600 + rng.randint(0, 300 * 86400)  # 2025
+        kind = rng.random()
+        if kind < 0.40:
+            return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z"
+        if kind < 0.55:
+            return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        if kind < 0.70:
+            return Decimal(epoch)
+        if kind < 0.75:
+            return Decimal(epoch * 1000)
+        if kind < 0.82:
+            return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:00:00.{rng.randint(0, 999999):06d}Z"
+        if kind < 0.88:
+            return rng.choice(["Oct 5, 2025", "March 3, 2025", "06/15/2025"])
+        if kind < 0.97:
+            return None
+        return rng.choice(["yesterday", "N/A", "2025-13-45"])
+
+    def _description(self) -> str:
+        rng = self.rng
+        n = rng.randint(*self.description_words)
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    def posting(self, i: int) -> Dict[str, Any]:
+        rng = self.rng
+        item = {
+            "jobId": f"job-{i:08d}",
+            "title": f"{rng.choice(['Software', 'Backend', 'Frontend', 'Data', 'Platform'])} Engineer",
+            "company": f"Company {self._pick(self.tech_cum) % 997}",
+            "job_description": self._description(),
+            "technologies": self._techs(),
+            "skills": [SKILLS[self._pick(self.skill_cum)] for _ in range(rng.randint(0, 4))],
+            "processed_date": self._date(),
+            "location": rng.choice(LOCATIONS),
+            "remote_status": rng.choice(REMOTE),
+            "seniority_level": rng.choice(SENIORITY),
+            "salary_range": rng.choice(SALARIES),
+            "salary_mentioned": rng.random() < 0.4,
+        }
+        if rng.random() < 0.5:
+            item["status"] = rng.choice(["Active", "Active", "Expired"])
+        if rng.random() < 0.05:
+            item["normalized"] = True
+        # DynamoDB has no empty lists/nulls in practice: drop them
+        return {k: v for k, v in item.items() if v is not None and v != []}
+
+
+def generate(n: int, seed: int = 0, **opts) -> Iterator[Dict[str, Any]]:
+    gen = CorpusGenerator(seed, **opts)
+    for i in range(n):
+        yield gen.posting(i)
+
+
+if __name__ == "__main__":
+    from checkpoint import dumps
+
+    ap = argparse.ArgumentParser(description="Write a synthetic posting corpus as JSONL")
+    ap.add_argument("--n", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="corpus.jsonl")
+    args = ap.parse_args()
+    with open(args.out, "w") as f:
+        for item in generate(args.n, args.seed):
+            f.write(dumps(item) + "\n")
+    print(f"✓ Wrote {args.n} postings to {args.out}")
+EOF
@@ -0,0 +1,249 @@
+cat > canonicalize.py << "EOF"
+#!/usr/bin/env python3
+"""
+Shared skill/technology canonicalizer used by normalize.py and jtindex.py,
+plus the slug rules for job-tech-index-v2 partition keys.
+
+Rules are compiled once: literal rules become a dict lookup, the rest are
+folded into a single alternation that preserves rule order, and results are
+memoized per raw term so repeated strings cost a single dict hit.
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional
+
+# Normalization rules mapping (order matters: first match wins)
+NORMALIZATION_RULES = {
+    # JavaScript frameworks
+    r"^react(?:\.js|js)?$": "React",
+    r"^vue(?:\.js|js)?$": "Vue",
+    r"^angular(?:\.js|js)?$": "Angular",
+    r"^next(?:\.js|js)?$": "Next.js",
+    r"^nuxt(?:\.js|js)?$": "Nuxt",
+    r"^svelte(?:\.js|js)?$": "Svelte",
+    # Python
+    r"^python$": "Python",
+    r"^django$": "Django",
+    r"^fastapi$": "FastAPI",
+    r"^flask$": "Flask",
+    r"^pytorch$": "PyTorch",
+    r"^tensorflow$": "TensorFlow",
+    # Node
+    r"^node(?:\.?js)?$": "Node.js",
+    r"^express(?:\.js|js)?$": "Express",
+    # Databases
+    r"^postgre?sql$": "PostgreSQL",
+    r"^mongo(?:db)?$": "MongoDB",
+    r"^redis$": "Redis",
+    r"^mysql$": "MySQL",
+    r"^dynamodb$": "DynamoDB",
+    r"^elasticsearch$": "Elasticsearch",
+    # Cloud
+    r"^aws$": "AWS",
+    r"^gcp$": "GCP",
+    r"^azure$": "Azure",
+    r"^docker$": "Docker",
+    r"^kubernetes$": "Kubernetes",
+    # Languages
+    r"^java(?:script)?$": "JavaScript",
+    r"^type(?:script)?$": "TypeScript",
+    r"^c#$": "C#",
+    r"^c\+\+$": "C++",
+    r"^golang|go$": "Go",
+    r"^rust$": "Rust",
+    # Tools
+    r"^git$": "Git",
+    r"^docker$": "Docker",
+    r"^jenkins$": "Jenkins",
+    r"^github$": "GitHub",
+    r"^gitlab$": "GitLab",
+}
+
+# `^golang|go$` parses as `(^golang)|(go$)`, so with re.match it also catches
+# anything that merely starts with "golang" (e.g. "golangci" -> "Go").
+# Kept as-is for output parity; set FIX_GO_PRECEDENCE=1 to anchor both sides.
+GO_RULE = r"^golang|go$"
+GO_RULE_FIXED = r"^(?:golang|go)$"
+FIX_GO_PRECEDENCE = os.environ.get("FIX_GO_PRECEDENCE") == "1"
+
+MEMO_SIZE = int(os.environ.get("CANON_MEMO_SIZE", "65536"))
+
+_CLEAN_RE = re.compile(r"[\s\-_\.]+")
+_LITERAL_RE = re.compile(r"^\^((?:[a-z0-9#]|\\[+.#])+)\$$")
+
+
+def _literal(pattern: str) -> Optional[str]:
+    """Return the literal string a `^...$` pattern matches, or None if it is a real regex."""
+    m = _LITERAL_RE.match(pattern)
+    if not m:
+        return None
+    return re.sub(r"\\(.)", r"\1", m.group(1))
+
+
+class Canonicalizer:
+    """
+    Compiled form of NORMALIZATION_RULES.
+    normalize() returns exactly what the old per-call regex loop returned.
+    """
+
+    def __init__(
+        self,
+        rules: Dict[str, str] = None,
+        fix_go_precedence: bool = FIX_GO_PRECEDENCE,
+        memo_size: int = MEMO_SIZE,
+    ):
+        rules = dict(NORMALIZATION_RULES if rules is None else rules)
+        if fix_go_precedence and GO_RULE in rules:
+            rules = {
+                (GO_RULE_FIXED if p == GO_RULE else p): c for p, c in rules.items()
+            }
+        self.rules = rules
+        self._ordered = [(re.compile(p), c) for p, c in rules.items()]
+
+        # Literal rules -> dict. The value is resolved through the ordered
+        # rules so an earlier regex that also matches the literal still wins.
+        self.exact: Dict[str, str] = {}
+        regex_rules = []
+        for pattern, canonical in rules.items():
+            lit = _literal(pattern)
+            if lit is not None:
+                self.exact.setdefault(lit, self._match_ordered(lit))
+            else:
+                regex_rules.append((pattern, canonical))
+
+        # Remaining rules -> one alternation; re tries branches left to right,
+        # so the first matching group is the first matching rule.
+        self._group_canon = [c for _, c in regex_rules]
+        alternation = "|".join(
+            f"(?P<r{i}>{p})" for i, (p, _) in enumerate(regex_rules)
+        )
+        self._combined = re.compile(alternation) if regex_rules else None
+
+        self._memo = lru_cache(maxsize=memo_size)(self._canonicalize)
+
+    def _match_ordered(self, cleaned: str) -> Optional[str]:
+        for rx, canonical in self._ordered:
+            if rx.match(cleaned):
+                return canonical
+        return None
+
+    def _match_rule(self, cleaned: str) -> Optional[str]:
+        hit = self.exact.get(cleaned)
+        if hit is not None:
+            return hit
+        if self._combined is None:
+            return None
+        m = self._combined.match(cleaned)
+        if not m:
+            return None
+        return self._group_canon[int(m.lastgroup[1:])]
+
+    def _canonicalize(self, term: str) -> Optional[str]:
+        stripped = term.strip()
+        cleaned = stripped.lower()
+        if not cleaned:
+            return None
+
+        # Remove common punctuation variations
+        cleaned = _CLEAN_RE.sub("", cleaned)
+
+        canonical = self._match_rule(cleaned)
+        if canonical is not None:
+            return canonical
+
+        # If no rule matches, use title case with dots/hyphens preserved
+        return ".".join(p.title() for p in stripped.split("."))
+
+    def normalize(self, term: str) -> Optional[str]:
+        """
+        Normalize a skill/technology term to canonical form
+        """
+        if not term or not isinstance(term, str):
+            return None
+        return self._memo(term)
+
+    def cache_info(self):
+        return self._memo.cache_info()
+
+
+default_canonicalizer = Canonicalizer()
+
+
+def normalize_term(term: str) -> str:
+    """
+    Normalize a skill/technology term to canonical form
+    """
+    return default_canonicalizer.normalize(term)
+
+
+# ---------- slugs (job-tech-index-v2 partition keys) ----------
+# Minimal structural transforms (not a giant exceptions list)
+STRUCTURAL_MAP = {
+    "c#": "csharp",
+    "csharp": "csharp",
+    "c++": "cpp",
+    "cpp": "cpp",
+    ".net": "dotnet",
+    "node.js": "nodejs",
+    "next.js": "nextjs",
+    "nuxt.js": "nuxtjs",
+    "express.js": "express",
+    "postgres": "postgresql",
+    "postgresql": "postgresql",
+    "mongo": "mongodb",
+    "mongodb": "mongodb",
+}
+
+
+def normalize_unicode(s: str) -> str:
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+
+
+def structural_pass(s: str) -> str:
+    t = s.lower().strip()
+    # quick wins first
+    if t in STRUCTURAL_MAP:
+        return STRUCTURAL_MAP[t]
+    # handle common .js pattern generically
+    if t.endswith(".js"):
+        base = t[:-3]
+        if base in ("node", "next", "nuxt", "express"):
+            return STRUCTURAL_MAP.get(t, base + "js")
+    return t
+
+
+def slugify_tech(raw: str) -> str:
+    if not raw or not isinstance(raw, str):
+        return ""
+    # 1) structural transforms on the raw string
+    t = structural_pass(raw)
+    # 2) unicode fold
+    t = normalize_unicode(t)
+    # 3) replace anything non-alnum with a dash
+    t = re.sub(r"[^a-z0-9]+", "-", t.lower())
+    # 4) collapse dashes and trim
+    t = re.sub(r"-{2,}", "-", t).strip("-")
+    return t
+
+
+# Bump when the code above changes behaviour (the rule tables are hashed as data)
+RULES_VERSION = 1
+
+
+def rules_fingerprint(canonicalizer: Canonicalizer = None) -> str:
+    """Hash of everything that decides a term's display name and slug."""
+    canonicalizer = canonicalizer or default_canonicalizer
+    payload = json.dumps(
+        {
+            "version": RULES_VERSION,
+            "rules": list(canonicalizer.rules.items()),
+            "structural": sorted(STRUCTURAL_MAP.items()),
+        }
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+EOF
@@ -0,0 +1,218 @@
+cat > capacity.py << "EOF"
+#!/usr/bin/env python3
+"""
+Capacity governor shared by the backfill scripts: token buckets for RCU and
+WCU so a backfill stays under a known share of the table's capacity and
+leaves the rest to the production lambdas.
+
+Limits come from a percentage of provisioned capacity (--capacity-pct) or
+from explicit --max-rcu / --max-wcu. Every Scan and BatchWriteItem asks for
+ReturnConsumedCapacity and is charged what it actually consumed; a call
+waits while the bucket is in debt. Throttling halves the rate, and it then
+recovers linearly back to the target.
+"""
+
+import argparse
+import threading
+import time
+from typing import Any, Dict, Optional
+
+MIN_RATE_FRACTION = 0.05  # never slow below 5% of the target
+RECOVERY_SECONDS = 30.0  # time to climb from the floor back to the target
+BURST_SECONDS = 2.0  # bucket holds this many seconds of tokens
+
+
+class TokenBucket:
+    """Pay-after token bucket; thread-safe. rate=None means unlimited."""
+
+    def __init__(
+        self, name: str, rate: Optional[float], burst_seconds: float = BURST_SECONDS
+    ):
+        if rate is not None and rate <= 0:
+            raise ValueError(f"{name} limit must be > 0 (None = unlimited): {rate}")
+        self.name = name
+        self.target = rate
+        self.rate = rate
+        self.capacity = rate * burst_seconds if rate else 0.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.consumed = 0.0
+        self.waited = 0.0
+        self.throttles = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limited(self) -> bool:
+        return self.target is not None
+
+    def _refill(self, now: float):
+        dt = now - self.updated
+        self.updated = now
+        if self.rate < self.target:  # additive recovery after a throttle
+            step = self.target * (1 - MIN_RATE_FRACTION) * dt / RECOVERY_SECONDS
+            self.rate = min(self.target, self.rate + step)
+        self.tokens = min(self.capacity, self.tokens + self.rate * dt)
+
+    def wait(self):
+        """Block until the bucket is out of debt."""
+        if not self.limited:
+            return
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens > 0:
+                    return
+                delay = -self.tokens / self.rate
+            delay = min(delay, 1.0)
+            time.sleep(delay)
+            with self._lock:
+                self.waited += delay
+
+    def charge(self, units: float):
+        with self._lock:
+            self.consumed += units
+            if self.limited:
+                self._refill(time.monotonic())
+                self.tokens -= units
+
+    def throttled(self):
+        """Multiplicative decrease on a throttle signal."""
+        with self._lock:
+            self.throttles += 1
+            if self.limited:
+                self.rate = max(self.target * MIN_RATE_FRACTION, self.rate / 2)
+                self.tokens = min(self.tokens, 0.0)
+
+    def describe(self) -> str:
+        limit = f"{self.target:g}/s" if self.limited else "unlimited"
+        return (
+            f"{self.name}: limit={limit} consumed={self.consumed:.1f} "
+            f"waited={self.waited:.1f}s throttles={self.throttles}"
+        )
+
+
+THROTTLE_CODES = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+
+
+def is_throttle(e: Exception) -> bool:
+    resp = getattr(e, "response", None) or {}
+    return resp.get("Error", {}).get("Code") in THROTTLE_CODES
+
+
+def consumed_units(resp: Dict[str, Any]) -> float:
+    """Sum CapacityUnits from a ConsumedCapacity field (dict or list form)."""
+    cc = resp.get("ConsumedCapacity")
+    if not cc:
+        return 0.0
+    if isinstance(cc, dict):
+        cc = [cc]
+    return float(sum(c.get("CapacityUnits", 0) or 0 for c in cc))
+
+
+class CapacityGovernor:
+    """RCU + WCU buckets. Scan/write helpers call before_*/after_*."""
+
+    def __init__(self, rcu: Optional[float] = None, wcu: Optional[float] = None):
+        self.read = TokenBucket("RCU", rcu)
+        self.write = TokenBucket("WCU", wcu)
+
+    # reads
+    def before_read(self):
+        self.read.wait()
+
+    def after_read(self, resp: Dict[str, Any]):
+        self.read.charge(consumed_units(resp))
+
+    # writes
+    def before_write(self):
+        self.write.wait()
+
+    def after_write(self, resp: Dict[str, Any]):
+        self.write.charge(consumed_units(resp))
+
+    def summary(self) -> str:
+        return f"{self.read.describe()}; {self.write.describe()}"
+
+    @classmethod
+    def for_tables(
+        cls,
+        read_table=None,
+        write_table=None,
+        capacity_pct: Optional[float] = None,
+        max_rcu: Optional[float] = None,
+        max_wcu: Optional[float] = None,
+    ) -> "CapacityGovernor":
+        """
+        Explicit limits win; otherwise capacity_pct of the tables' provisioned
+        throughput. On-demand tables have no provisioned figure, so they stay
+        unlimited unless an explicit limit is given.
+        """
+        rcu, wcu = max_rcu, max_wcu
+        if capacity_pct:
+            frac = capacity_pct / 100.0
+            if rcu is None and read_table is not None:
+                prov = provisioned(read_table).get("ReadCapacityUnits") or 0
+                rcu = prov * frac if prov else None
+                if not prov:
+                    print(f"⚠ {read_table.name} is on-demand; use --max-rcu to cap reads")
+            if wcu is None and write_table is not None:
+                prov = provisioned(write_table).get("WriteCapacityUnits") or 0
+                wcu = prov * frac if prov else None
+                if not prov:
+                    print(f"⚠ {write_table.name} is on-demand; use --max-wcu to cap writes")
+        return cls(rcu=rcu, wcu=wcu)
+
+
+def provisioned(table) -> Dict[str, Any]:
+    try:
+        return table.provisioned_throughput or {}
+    except Exception as e:
+        print(f"⚠ Could not read provisioned throughput for {table.name}: {e}")
+        return {}
+
+
+def positive(value: str) -> float:
+    """argparse type: a limit > 0 (leave the flag out for no limit)."""
+    try:
+        f = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {value!r}")
+    if not f > 0:
+        raise argparse.ArgumentTypeError(
+            f"must be > 0, got {value} (omit the flag for no limit)"
+        )
+    return f
+
+
+def add_capacity_args(parser):
+    parser.add_argument(
+        "--capacity-pct",
+        type=positive,
+        default=None,
+        help="cap reads/writes at this %% of the tables' provisioned capacity",
+    )
+    parser.add_argument(
+        "--max-rcu", type=positive, default=None, help="read units/s cap"
+    )
+    parser.add_argument(
+        "--max-wcu", type=positive, default=None, help="write units/s cap"
+    )
+    return parser
+
+
+def governor_from_args(args, read_table=None, write_table=None) -> CapacityGovernor:
+    gov = CapacityGovernor.for_tables(
+        read_table,
+        write_table,
+        capacity_pct=args.capacity_pct,
+        max_rcu=args.max_rcu,
+        max_wcu=args.max_wcu,
+    )
+    if gov.read.limited or gov.write.limited:
+        print(f"  capacity limits: {gov.summary()}")
+    return gov
+EOF
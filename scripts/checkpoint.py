@@ -0,0 +1,219 @@
+cat > checkpoint.py << "EOF"
+#!/usr/bin/env python3
+"""
+Resumable backfills: persist the last fully written LastEvaluatedKey per
+scan segment, plus the running counters, to a local JSON file.
+
+Usage in a scan loop:
+    cp = Checkpoint.open(path, job="jtindex-v2", total_segments=4, resume=args.resume)
+    for page in scan_pages(table, segments=cp.total_segments,
+                           only_segments=cp.remaining_segments(),
+                           start_keys=cp.start_keys()):
+        ... buffer writes for page.items ...
+        cp.page_done(page.segment, page.last_key)
+        if flushed:
+            cp.commit(scanned=..., written=...)   # only after the writes landed
+    cp.finish()
+
+A key is only persisted once every write derived from its page has been
+flushed, so a resumed run re-reads at most the pages after the last commit
+and rewrites them with the same (idempotent) puts.
+"""
+
+import base64
+import json
+import os
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+CHECKPOINT_DIR = ".checkpoints"
+VERSION = 1
+
+
+def default_path(job: str) -> str:
+    return os.path.join(CHECKPOINT_DIR, f"{job}.json")
+
+
+# DynamoDB keys/counters can carry Decimal, bytes and sets; tag them in JSON
+def _encode(obj):
+    if isinstance(obj, Decimal):
+        return {"$N": str(obj)}
+    if isinstance(obj, (bytes, bytearray)):
+        return {"$B": base64.b64encode(bytes(obj)).decode("ascii")}
+    if isinstance(obj, (set, frozenset)):
+        return {"$SET": [_encode(v) for v in sorted(obj, key=str)]}
+    if isinstance(obj, dict):
+        return {str(k): _encode(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_encode(v) for v in obj]
+    return obj
+
+
+def _decode(obj):
+    if isinstance(obj, dict):
+        if len(obj) == 1:
+            (tag, val), = obj.items()
+            if tag == "$N":
+                return Decimal(val)
+            if tag == "$B":
+                return base64.b64decode(val)
+            if tag == "$SET":
+                return set(_decode(v) for v in val)
+        return {k: _decode(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_decode(v) for v in obj]
+    return obj
+
+
+def dumps(obj: Any) -> str:
+    """json.dumps that round-trips Decimal / bytes / sets through loads()."""
+    return json.dumps(_encode(obj), sort_keys=True)
+
+
+def loads(s: str) -> Any:
+    return _decode(json.loads(s))
+
+
+def atomic_write_json(path: str, data: Any) -> None:
+    """Write JSON via tmp file + fsync + rename so a crash never leaves half a file."""
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(_encode(data), f, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_json(path: str) -> Any:
+    with open(path) as f:
+        return _decode(json.load(f))
+
+
+class CheckpointMismatch(Exception):
+    pass
+
+
+class Checkpoint:
+    def __init__(self, path: str, job: str, total_segments: Optional[int] = None):
+        self.path = path
+        self.job = job
+        self.requested_segments = total_segments
+        self.total_segments = total_segments or 1
+        # segment -> {"last_key": dict|None, "done": bool}
+        self.segments: Dict[int, Dict[str, Any]] = {
+            s: {"last_key": None, "done": False} for s in range(self.total_segments)
+        }
+        self.counters: Dict[str, Any] = {}
+        self.resumed = False
+        self._pending: Dict[int, Optional[Dict[str, Any]]] = {}
+
+    @classmethod
+    def open(
+        cls,
+        path: str,
+        job: str,
+        total_segments: Optional[int] = None,
+        resume: bool = False,
+    ) -> "Checkpoint":
+        """
+        resume=True loads `path` (its segment count wins over total_segments);
+        otherwise any previous checkpoint at `path` is discarded.
+        total_segments=None means "not asked for": 1, or the checkpoint's count.
+        """
+        cp = cls(path, job, total_segments)
+        if resume and os.path.exists(path):
+            cp._load()
+        elif resume:
+            print(f"⚠ No checkpoint at {path}; starting from the beginning")
+        else:
+            cp.clear()
+        return cp
+
+    def _load(self) -> None:
+        data = read_json(self.path)
+        if data.get("job") != self.job:
+            raise CheckpointMismatch(
+                f"{self.path} belongs to {data.get('job')!r}, not {self.job!r}"
+            )
+        requested = self.requested_segments
+        if requested is not None and requested != data.get("total_segments"):
+            print(
+                f"⚠ Checkpoint was taken with {data.get('total_segments')} segments; "
+                f"resuming with that instead of {requested}"
+            )
+        self.total_segments = int(data["total_segments"])
+        self.segments = {int(k): v for k, v in data["segments"].items()}
+        self.counters = data.get("counters", {})
+        self.resumed = True
+        done = sum(1 for s in self.segments.values() if s["done"])
+        print(
+            f"↻ Resuming from {self.path} ({done}/{self.total_segments} segments done, "
+            f"saved {data.get('saved_at')})"
+        )
+
+    # --- what to scan -----------------------------------------------------
+    def remaining_segments(self) -> List[int]:
+        return sorted(s for s, st in self.segments.items() if not st["done"])
+
+    def start_keys(self) -> Dict[int, Optional[Dict[str, Any]]]:
+        return {
+            s: st["last_key"] for s, st in self.segments.items() if not st["done"]
+        }
+
+    @property
+    def complete(self) -> bool:
+        return not self.remaining_segments()
+
+    # --- progress ---------------------------------------------------------
+    def page_done(self, segment: int, last_key: Optional[Dict[str, Any]]) -> None:
+        """Every item of this page has been handed to the writer (not yet flushed)."""
+        self._pending[segment] = last_key
+
+    def commit(self, **counters) -> None:
+        """All writes for pages marked so far are durable; persist their keys."""
+        for seg, key in self._pending.items():
+            self.segments[seg] = {"last_key": key, "done": key is None}
+        self._pending.clear()
+        self.counters.update(counters)
+        self.save()
+
+    def save(self) -> None:
+        atomic_write_json(
+            self.path,
+            {
+                "version": VERSION,
+                "job": self.job,
+                "total_segments": self.total_segments,
+                "segments": {str(k): v for k, v in self.segments.items()},
+                "counters": self.counters,
+                "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            },
+        )
+
+    def clear(self) -> None:
+        for p in (self.path, f"{self.path}.tmp"):
+            if os.path.exists(p):
+                os.remove(p)
+
+    def finish(self) -> None:
+        """Run completed: nothing left to resume."""
+        self.clear()
+
+
+def add_checkpoint_args(parser, job: str):
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the last checkpoint instead of rescanning everything",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=default_path(job),
+        help=f"checkpoint file (default: {default_path(job)})",
+    )
+    return parser
+EOF
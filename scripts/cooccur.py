@@ -0,0 +1,199 @@
+cat > cooccur.py << "EOF"
+#!/usr/bin/env python3
+"""
+Technology co-occurrence, accumulated during the index backfill's own scan.
+
+    matrix = CooccurrenceMatrix()
+    for job in jobs:
+        matrix.add(tech_set)            # the PKs build_puts() just produced
+    top = matrix.top_k(10)              # {tech: {co_tech: postings}}
+
+The same top-K as SkillTrendV2Item.cooccurring_skills (packages/shared-types/
+src/trendsv2.ts), over every posting rather than per trend row (trendcube.py
+fills the rows' own), without a second full-table pass.
+
+Techs are dictionary-encoded to ints. Each posting adds its (a, b) pairs,
+a < b, packed into one int64 (a << 32 | b) to a SparseCounter
+(sparsecount.py): sorted NumPy key/count arrays fed from a flat buffer.
+The matrix is symmetric, so each pair is stored once, and memory scales
+with the pairs actually seen, not techs². top_k() mirrors the pairs and
+picks every tech's K largest with one lexsort.
+
+--cooccurrence PATH writes the top-K JSON at the end of a complete scan.
+The matrix is saved next to the checkpoint at every commit, so --resume
+continues it. Requires numpy.
+"""
+
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+from checkpoint import atomic_write_json
+from sparsecount import SHIFT, SparseCounter, _np, open_state, save_npz
+
+TOP_K = 10  # same as the aggregate-skill-trends-v2 lambda's topN(coMap, 10)
+VERSION = 1
+
+
+class CooccurrenceMatrix:
+    def __init__(self):
+        np = self.np = _np()
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.postings = 0  # postings added, with or without techs
+        self.seq = 0  # checkpoint commit this state belongs to (see save())
+        self.pairs = SparseCounter()  # packed (a, b), a < b -> postings with both
+        self.totals = np.zeros(0, dtype=np.int64)  # postings per tech
+        self._tech_buf = array("q")
+
+    def _id(self, name: str) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def add(self, techs: Iterable[str]) -> None:
+        """One posting's normalized technologies (duplicates are ignored)."""
+        self.postings += 1
+        ids = sorted({self._id(t) for t in techs})
+        if not ids:
+            return
+        self._tech_buf.extend(ids)
+        for i, a in enumerate(ids[:-1]):
+            high = a << SHIFT
+            self.pairs.extend([high | b for b in ids[i + 1 :]])
+
+    def _merge(self) -> None:
+        np = self.np
+        if self._tech_buf:
+            seen = np.frombuffer(self._tech_buf, dtype=np.int64)
+            totals = np.bincount(seen, minlength=len(self.names))
+            totals[: len(self.totals)] += self.totals
+            self.totals = totals
+            self._tech_buf = array("q")
+        self.pairs.merge()
+
+    @property
+    def nnz(self) -> int:
+        """Distinct co-occurring pairs."""
+        return len(self.pairs)
+
+    def job_counts(self) -> Dict[str, int]:
+        self._merge()
+        return {self.names[i]: int(c) for i, c in enumerate(self.totals) if c}
+
+    def top_k(self, k: int = TOP_K) -> Dict[str, Dict[str, int]]:
+        """{tech: {co_tech: postings with both}}, K largest per tech, ties by name."""
+        np = self.np
+        self._merge()
+        if not len(self.pairs):
+            return {}
+        a, b, counts = self.pairs.split()
+        rows = np.concatenate([a, b])
+        cols = np.concatenate([b, a])
+        counts = np.concatenate([counts, counts])
+        rank = np.empty(len(self.names), dtype=np.int64)
+        rank[np.argsort(np.array(self.names, dtype=object))] = np.arange(len(self.names))
+        order = np.lexsort((rank[cols], -counts, rows))
+        rows, cols, counts = rows[order], cols[order], counts[order]
+        # position of each entry within its row
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        lengths = np.diff(np.r_[starts, len(rows)])
+        pos = np.arange(len(rows)) - np.repeat(starts, lengths)
+        keep = pos < k
+        out: Dict[str, Dict[str, int]] = {}
+        names = self.names
+        for r, c, n in zip(rows[keep].tolist(), cols[keep].tolist(), counts[keep].tolist()):
+            out.setdefault(names[r], {})[names[c]] = n
+        return out
+
+    # --- persistence ------------------------------------------------------
+    def save(self, path: str, seq: int) -> None:
+        """Atomically write the state, tagged with the checkpoint commit `seq`."""
+        np = self.np
+        self._merge()
+        self.seq = seq
+        save_npz(
+            path,
+            version=VERSION,
+            names=np.array(self.names, dtype=str),
+            pairs=self.pairs.keys,
+            counts=self.pairs.counts,
+            totals=self.totals,
+            postings=self.postings,
+            seq=seq,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CooccurrenceMatrix":
+        m = cls()
+        with m.np.load(path) as z:
+            if int(z["version"]) != VERSION:
+                raise ValueError(f"{path}: co-occurrence state v{int(z['version'])}")
+            for name in z["names"].tolist():
+                m._id(name)
+            m.pairs.load(z["pairs"], z["counts"])
+            m.totals = z["totals"]
+            m.postings = int(z["postings"])
+            m.seq = int(z["seq"])
+        return m
+
+    def summary(self) -> str:
+        return f"{self.postings} postings, {len(self.names)} techs, {self.nnz} pairs"
+
+
+def state_path(checkpoint_path: str) -> str:
+    return f"{checkpoint_path}.cooccur.npz"
+
+
+def open_matrix(checkpoint_path: str, seq: Optional[int], resumed: bool):
+    """Fresh matrix, or on --resume the one saved with checkpoint commit `seq`."""
+    return open_state(
+        state_path(checkpoint_path),
+        seq,
+        resumed,
+        fresh=CooccurrenceMatrix,
+        load=CooccurrenceMatrix.load,
+        label="co-occurrence",
+    )
+
+
+def write_top_k(
+    matrix: CooccurrenceMatrix, path: str, k: int = TOP_K, **meta: Any
+) -> int:
+    """{tech: {job_count, cooccurring}} JSON for the trends aggregation; returns techs."""
+    top = matrix.top_k(k)
+    techs = {
+        name: {"job_count": n, "cooccurring": top.get(name, {})}
+        for name, n in sorted(matrix.job_counts().items())
+    }
+    atomic_write_json(
+        path,
+        {
+            "version": VERSION,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "postings": matrix.postings,
+            "top_k": k,
+            **meta,
+            "techs": techs,
+        },
+    )
+    return len(techs)
+
+
+def add_cooccurrence_args(parser):
+    parser.add_argument(
+        "--cooccurrence",
+        default=None,
+        metavar="PATH",
+        help="also accumulate tech co-occurrence and write the top-K per tech here (JSON)",
+    )
+    parser.add_argument(
+        "--cooccurrence-top",
+        type=int,
+        default=TOP_K,
+        help="co-occurring techs kept per tech (default: %(default)s)",
+    )
+    return parser
+EOF
@@ -0,0 +1,153 @@
+cat > dates.py << "EOF"
+#!/usr/bin/env python3
+"""
+One deterministic processed_date parser for all the backfill scripts.
+
+    parse_datetime(val)  -> aware UTC datetime, or None if unparseable
+    iso_utc(val)         -> ISO string for the index SK; unparseable values
+                            follow the policy below, never datetime.now()
+
+Accepts epoch seconds / milliseconds (int, float, DynamoDB Decimal, digit
+strings), ISO 8601 with or without 'Z' / offset, and a few common strptime
+and RFC 2822 shapes. Naive values are taken as UTC. A string gets the
+first parser in PARSERS order that accepts it, whatever was parsed before,
+and results are memoized per raw value.
+
+Unparseable or missing dates (policy: --unparseable-dates / DATE_POLICY):
+    sentinel  use SENTINEL_ISO (1970-01-01T00:00:00+00:00)  [default]
+    skip      iso_utc() returns None; callers leave the record out
+    error     raise UnparseableDate
+"""
+
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+POLICIES = ("sentinel", "skip", "error")
+SENTINEL = datetime(1970, 1, 1, tzinfo=timezone.utc)
+SENTINEL_ISO = SENTINEL.isoformat()
+MEMO_SIZE = int(os.environ.get("DATE_MEMO_SIZE", "262144"))
+EPOCH_MS_THRESHOLD = 100_000_000_000  # larger epochs are milliseconds (> year 5138 in s)
+
+policy = os.environ.get("DATE_POLICY", "sentinel")
+
+
+class UnparseableDate(ValueError):
+    pass
+
+
+def _utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _from_epoch(x: float) -> datetime:
+    if abs(x) >= EPOCH_MS_THRESHOLD:
+        x /= 1000.0
+    return datetime.fromtimestamp(x, tz=timezone.utc)
+
+
+def _iso(s: str) -> datetime:
+    if s.endswith(("Z", "z")):
+        s = s[:-1] + "+00:00"
+    return _utc(datetime.fromisoformat(s))
+
+
+def _strptime(fmt: str) -> Callable[[str], datetime]:
+    def parse(s: str) -> datetime:
+        return _utc(datetime.strptime(s, fmt))
+
+    return parse
+
+
+def _rfc2822(s: str) -> datetime:
+    return _utc(parsedate_to_datetime(s))
+
+
+def _epoch_str(s: str) -> datetime:
+    return _from_epoch(float(s))
+
+
+# tried in order; the first that accepts the string wins
+PARSERS = (
+    _iso,
+    _epoch_str,
+    _strptime("%Y-%m-%dT%H:%M:%S.%fZ"),
+    _strptime("%Y-%m-%d %H:%M:%S"),
+    _strptime("%Y/%m/%d"),
+    _strptime("%m/%d/%Y"),
+    _strptime("%d %b %Y"),
+    _strptime("%b %d, %Y"),
+    _strptime("%B %d, %Y"),
+    _rfc2822,
+)
+
+def _parse_str(s: str) -> Optional[datetime]:
+    # No per-shape shortcut: strings of one shape can need different parsers
+    # ("20251005" is ISO basic on 3.11+, "17000000" only epoch), so a remembered
+    # parser would make results depend on what was parsed first.
+    for parser in PARSERS:
+        try:
+            return parser(s)
+        except (ValueError, TypeError, OverflowError, IndexError):
+            continue
+    return None
+
+
+@lru_cache(maxsize=MEMO_SIZE, typed=True)  # typed: True != 1 here
+def _parse(val: Any) -> Optional[datetime]:
+    if isinstance(val, bool):
+        return None
+    if isinstance(val, (int, float, Decimal)):
+        try:
+            return _from_epoch(float(val))
+        except (ValueError, OverflowError, OSError):
+            return None
+    s = str(val).strip()
+    return _parse_str(s) if s else None
+
+
+def parse_datetime(val: Any) -> Optional[datetime]:
+    """Aware UTC datetime for a processed_date value, or None."""
+    if val is None or val == "":
+        return None
+    try:
+        return _parse(val)
+    except TypeError:  # unhashable (list/dict): not a date
+        return None
+
+
+def iso_utc(val: Any, on_error: Optional[str] = None) -> Optional[str]:
+    """ISO-8601 UTC string for the index sort key; see the module policy."""
+    dt = parse_datetime(val)
+    if dt is not None:
+        return dt.isoformat()
+    on_error = on_error or policy
+    if on_error == "skip":
+        return None
+    if on_error == "error":
+        raise UnparseableDate(f"unparseable processed_date: {val!r}")
+    return SENTINEL_ISO
+
+
+def set_policy(name: str) -> None:
+    global policy
+    if name not in POLICIES:
+        raise ValueError(f"date policy must be one of {POLICIES}, not {name!r}")
+    policy = name
+
+
+def add_date_args(parser):
+    parser.add_argument(
+        "--unparseable-dates",
+        choices=POLICIES,
+        default=policy,
+        help="missing/unparseable processed_date: sentinel (1970-01-01), "
+        "skip the job, or error (default: %(default)s)",
+    )
+    return parser
+EOF
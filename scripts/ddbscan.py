@@ -0,0 +1,341 @@
+cat > ddbscan.py << "EOF"
+#!/usr/bin/env python3
+"""
+Sequential / parallel (Segment + TotalSegments) scans for the backfill scripts.
+
+scan_pages() yields ScanPage(segment, items, last_key) as pages arrive.
+With segments > 1 each segment is paged by a worker thread and pages are
+handed over through a bounded queue, so the consumer (build_puts, normalize)
+runs alongside the reads and a slow consumer throttles the readers.
+
+A segment that keeps failing is retried on its own, from its last good key;
+the other segments keep going. Anything still failing at the end is raised
+as SegmentScanError with the per-segment state needed to rerun just those.
+"""
+
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import boto3
+
+from capacity import CapacityGovernor, is_throttle
+from rawitem import BACKENDS, ClientTable
+
+DEFAULT_QUEUE_PAGES = 16
+PAGE_RETRIES = 5
+SEGMENT_RETRIES = 2
+
+
+class ScanPage(NamedTuple):
+    segment: int
+    items: List[Dict[str, Any]]
+    last_key: Optional[Dict[str, Any]]  # None once the segment is exhausted
+
+
+class SegmentState:
+    """Progress of one scan segment."""
+
+    def __init__(self, segment: int, start_key: Optional[Dict[str, Any]] = None):
+        self.segment = segment
+        self.last_key = start_key
+        self.pages = 0
+        self.items = 0
+        self.attempts = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+    def __repr__(self):
+        return (
+            f"SegmentState(segment={self.segment}, pages={self.pages}, "
+            f"items={self.items}, done={self.done}, error={self.error!r})"
+        )
+
+
+class SegmentScanError(Exception):
+    """Raised after the scan when one or more segments could not finish."""
+
+    def __init__(self, failed: List[SegmentState]):
+        self.failed = failed
+        segs = ", ".join(str(s.segment) for s in failed)
+        super().__init__(f"{len(failed)} scan segment(s) failed: {segs}")
+
+    @property
+    def start_keys(self) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Where each failed segment should resume from."""
+        return {s.segment: s.last_key for s in self.failed}
+
+
+def format_key(key: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(key, default=str, sort_keys=True) if key else "-"
+
+
+def _scan_page(
+    table, scan_kwargs, segment, total, start_key, retries, governor=None, metrics=None
+):
+    kwargs = dict(scan_kwargs)
+    if total > 1:
+        kwargs["Segment"] = segment
+        kwargs["TotalSegments"] = total
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    if governor:
+        kwargs["ReturnConsumedCapacity"] = "TOTAL"
+    for attempt in range(retries + 1):
+        try:
+            if governor:
+                governor.before_read()
+            t0 = time.perf_counter()
+            resp = table.scan(**kwargs)
+            if metrics:
+                dt = time.perf_counter() - t0
+                metrics.observe("scan_call", dt, len(resp.get("Items", ())))
+            if governor:
+                governor.after_read(resp)
+            return resp
+        except Exception as e:
+            throttled = is_throttle(e)
+            if governor and throttled:
+                governor.read.throttled()
+            if metrics:
+                metrics.count("scan_throttles" if throttled else "scan_errors")
+            if attempt == retries:
+                raise
+            if metrics:
+                metrics.count("scan_retries")
+            time.sleep(min(20.0, 0.25 * (2**attempt)) * random.uniform(0.5, 1.0))
+
+
+def _sequential(table, scan_kwargs, state, retries, governor, metrics) -> Iterator[ScanPage]:
+    while True:
+        resp = _scan_page(
+            table, scan_kwargs, 0, 1, state.last_key, retries, governor, metrics
+        )
+        items = resp.get("Items", [])
+        state.last_key = resp.get("LastEvaluatedKey")
+        state.pages += 1
+        state.items += len(items)
+        state.done = not state.last_key
+        yield ScanPage(0, items, state.last_key)
+        if state.done:
+            return
+
+
+def scan_pages(
+    table,
+    segments: int = 1,
+    workers: Optional[int] = None,
+    queue_pages: int = DEFAULT_QUEUE_PAGES,
+    start_keys: Optional[Dict[int, Optional[Dict[str, Any]]]] = None,
+    only_segments: Optional[Iterable[int]] = None,
+    page_retries: int = PAGE_RETRIES,
+    segment_retries: int = SEGMENT_RETRIES,
+    states: Optional[Dict[int, SegmentState]] = None,
+    governor: Optional[CapacityGovernor] = None,
+    metrics=None,
+    backend: str = "resource",
+    **scan_kwargs,
+) -> Iterator[ScanPage]:
+    """
+    Yield scan pages from `table` (a boto3 Table).
+
+    segments       TotalSegments; 1 keeps the plain sequential scan
+    workers        reader threads (default: min(segments, 16))
+    queue_pages    bound on pages buffered between readers and consumer
+    start_keys     {segment: ExclusiveStartKey} to resume segments from
+    only_segments  scan just these segments (e.g. rerun failed ones); empty
+                   yields nothing
+    states         optional dict filled with per-segment SegmentState
+    governor       optional RCU token bucket shared by all readers (capacity.py)
+    metrics        optional Metrics (metrics.py): scan_call latency, retries,
+                   scan_queue_depth
+    backend        "resource" (boto3 Table, items decoded up front) or
+                   "client" (low-level client, RawItem decoded on access;
+                   see rawitem.py)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown scan backend {backend!r} (one of {BACKENDS})")
+    if backend == "client":
+        table = ClientTable(table)
+    start_keys = start_keys or {}
+    states = {} if states is None else states
+    wanted = range(segments) if only_segments is None else sorted(set(only_segments))
+    if not wanted:
+        return  # every requested segment is already done (e.g. a finished resume)
+    for seg in wanted:
+        if seg not in states:
+            states[seg] = SegmentState(seg, start_keys.get(seg))
+
+    if segments <= 1:
+        yield from _sequential(
+            table, scan_kwargs, states[0], page_retries, governor, metrics
+        )
+        return
+
+    workers = max(1, min(workers or min(segments, 16), len(states)))
+    todo: "queue.Queue[Optional[SegmentState]]" = queue.Queue()
+    out: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_pages))
+    stop = threading.Event()
+    local = threading.local()
+    table_name = table.name
+
+    def thread_table():
+        if backend == "client":
+            return table  # one low-level client, shared
+        # boto3 resources are not thread-safe; one per reader thread, on the
+        # caller's region and endpoint (e.g. DynamoDB Local)
+        if not hasattr(local, "table"):
+            meta = table.meta.client.meta
+            resource = boto3.session.Session().resource(
+                "dynamodb", region_name=meta.region_name, endpoint_url=meta.endpoint_url
+            )
+            local.table = resource.Table(table_name)
+        return local.table
+
+    def put(obj):
+        while not stop.is_set():
+            try:
+                out.put(obj, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run_segment(state: SegmentState):
+        tbl = thread_table()
+        while not stop.is_set():
+            resp = _scan_page(
+                tbl,
+                scan_kwargs,
+                state.segment,
+                segments,
+                state.last_key,
+                page_retries,
+                governor,
+                metrics,
+            )
+            items = resp.get("Items", [])
+            next_key = resp.get("LastEvaluatedKey")
+            if not put(ScanPage(state.segment, items, next_key)):
+                return
+            state.last_key = next_key
+            state.pages += 1
+            state.items += len(items)
+            if not next_key:
+                state.done = True
+                return
+
+    def worker():
+        try:
+            while not stop.is_set():
+                state = todo.get()
+                if state is None:
+                    return
+                state.attempts += 1
+                state.error = None
+                try:
+                    run_segment(state)
+                except Exception as e:  # isolate: this segment only
+                    state.error = e
+                    print(
+                        f"✗ segment {state.segment}/{segments} failed "
+                        f"(attempt {state.attempts}, pages={state.pages}, "
+                        f"last_key={format_key(state.last_key)}): {e}",
+                        file=sys.stderr,
+                    )
+                put(("segment", state))
+        finally:
+            put(("worker", None))
+
+    for state in states.values():
+        if not state.done:
+            todo.put(state)
+    pending = sum(1 for s in states.values() if not s.done)
+    threads = [
+        threading.Thread(target=worker, name=f"scan-{i}", daemon=True)
+        for i in range(workers)
+    ]
+    for t in threads:
+        t.start()
+
+    live = len(threads)
+    try:
+        while pending:
+            msg = out.get()
+            if metrics:
+                metrics.gauge("scan_queue_depth", out.qsize())
+            if isinstance(msg, ScanPage):
+                yield msg
+                continue
+            kind, state = msg
+            if kind == "worker":
+                live -= 1
+                if not live:
+                    break
+                continue
+            if state.error is not None and state.attempts <= segment_retries:
+                todo.put(state)  # retry just this segment from its last key
+                continue
+            pending -= 1
+            if state.done:
+                print(
+                    f"  segment {state.segment}/{segments} done: "
+                    f"pages={state.pages}, items={state.items}"
+                )
+    finally:
+        stop.set()
+        for _ in threads:
+            todo.put(None)
+
+    failed = [s for s in states.values() if not s.done]
+    if failed:
+        raise SegmentScanError(failed)
+
+
+def scan_items(table, **kwargs) -> Iterator[Dict[str, Any]]:
+    """Item-level view of scan_pages()."""
+    for page in scan_pages(table, **kwargs):
+        yield from page.items
+
+
+def add_backend_args(parser):
+    parser.add_argument(
+        "--scan-backend",
+        choices=BACKENDS,
+        default="resource",
+        help="client: low-level client scan, attributes decoded only when read "
+        "(default: %(default)s)",
+    )
+    return parser
+
+
+def add_scan_args(parser, default_segments: int = None, only_segments: bool = True):
+    """Shared --segments/--workers[/--only-segments]/--scan-backend flags."""
+    add_backend_args(parser)
+    parser.add_argument(
+        "--segments",
+        type=int,
+        default=default_segments,
+        help="parallel scan TotalSegments (default 1 = sequential scan; "
+        "--resume keeps the checkpoint's count)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="reader threads for a parallel scan (default: min(segments, 16))",
+    )
+    if not only_segments:
+        return parser
+    parser.add_argument(
+        "--only-segments",
+        type=lambda s: [int(x) for x in s.split(",") if x.strip()],
+        default=None,
+        help="comma-separated segment numbers to (re)scan, e.g. 3,7",
+    )
+    return parser
+EOF
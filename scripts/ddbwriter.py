@@ -0,0 +1,307 @@
+cat > ddbwriter.py << "EOF"
+#!/usr/bin/env python3
+"""
+Concurrent, retrying BatchWriteItem writer shared by the backfill scripts.
+
+    writer = BatchWriter(idx, key_names=["PK", "SK"], workers=8)
+    writer.put(item)            # blocks only when the batch queue is full
+    writer.delete({"PK": ..., "SK": ...})
+    writer.flush()              # wait for everything queued; raises on failures
+    writer.close()
+
+Items are serialized in the caller's thread, grouped into 25-item batches
+(duplicate keys within a batch collapse to the last write, like boto3's
+overwrite_by_pkeys) and sent by a pool of threads on the shared low-level
+client. UnprocessedItems and throttling errors are retried with jittered
+exponential backoff; whatever still fails is reported by flush().
+"""
+
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import boto3
+from boto3.dynamodb.types import TypeSerializer
+
+from capacity import CapacityGovernor, is_throttle
+
+BATCH_SIZE = 25  # BatchWriteItem limit
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE_BATCHES = 64
+MAX_RETRIES = 10
+BASE_DELAY = 0.05
+MAX_DELAY = 10.0
+
+_serializer = TypeSerializer()
+
+
+class BatchWriteError(Exception):
+    """Raised by flush() when some writes could not be applied."""
+
+    def __init__(self, table: str, failed: List[Dict[str, Any]], errors: List[str]):
+        self.table = table
+        self.failed = failed
+        self.errors = errors
+        detail = f": {errors[0]}" if errors else ""
+        super().__init__(f"{len(failed)} write(s) to {table} failed{detail}")
+
+
+class WriterStats:
+    """Throughput / retry counters; safe to read while the writer runs."""
+
+    FIELDS = (
+        "puts",
+        "deletes",
+        "deduped",
+        "written",
+        "batches",
+        "calls",
+        "retries",
+        "throttles",
+        "unprocessed",
+        "failed",
+        "queue_high_water",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        for f in self.FIELDS:
+            setattr(self, f, 0)
+
+    def add(self, **deltas):
+        with self._lock:
+            for k, v in deltas.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    def high_water(self, depth: int):
+        if depth > self.queue_high_water:
+            with self._lock:
+                self.queue_high_water = max(self.queue_high_water, depth)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def items_per_sec(self) -> float:
+        return self.written / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            d = {f: getattr(self, f) for f in self.FIELDS}
+        d["elapsed_s"] = round(self.elapsed, 3)
+        d["items_per_sec"] = round(self.items_per_sec, 1)
+        return d
+
+    def summary(self) -> str:
+        d = self.as_dict()
+        return (
+            f"written={d['written']} ({d['items_per_sec']}/s) batches={d['batches']} "
+            f"calls={d['calls']} retries={d['retries']} throttles={d['throttles']} "
+            f"unprocessed={d['unprocessed']} deduped={d['deduped']} failed={d['failed']}"
+        )
+
+
+def low_level_client(table):
+    """
+    Plain low-level client for `table`'s region/endpoint. table.meta.client
+    can't be used with wire-format items: the resource layer would serialize
+    them a second time.
+    """
+    meta = table.meta.client.meta
+    return boto3.session.Session().client(
+        "dynamodb", region_name=meta.region_name, endpoint_url=meta.endpoint_url
+    )
+
+
+class BatchWriter:
+    def __init__(
+        self,
+        table,
+        key_names: Sequence[str],
+        workers: int = DEFAULT_WORKERS,
+        queue_batches: int = DEFAULT_QUEUE_BATCHES,
+        max_retries: int = MAX_RETRIES,
+        client=None,
+        governor: Optional[CapacityGovernor] = None,
+        metrics=None,
+    ):
+        """
+        table      boto3 Table (or table name together with `client`)
+        key_names  primary key attribute names, used to dedupe within a batch
+        governor   optional WCU token bucket (see capacity.py)
+        metrics    optional Metrics (metrics.py): write_call latency and
+                   write_queue_depth
+        """
+        self.table_name = table if isinstance(table, str) else table.name
+        self.client = client or low_level_client(table)  # thread-safe, shared
+        self.key_names = tuple(key_names)
+        self.max_retries = max_retries
+        self.governor = governor
+        self.metrics = metrics
+        self.stats = WriterStats()
+
+        self._batch: Dict[tuple, Dict[str, Any]] = {}
+        self._queue: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(
+            maxsize=max(1, queue_batches)
+        )
+        self._lock = threading.Lock()
+        self._failed: List[Dict[str, Any]] = []
+        self._errors: List[str] = []
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"writer-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    # --- producer side ----------------------------------------------------
+    def _key(self, attrs: Dict[str, Any]) -> tuple:
+        return tuple(attrs[k] for k in self.key_names)
+
+    def _add(self, key: tuple, request: Dict[str, Any]):
+        if self._closed:
+            raise RuntimeError("BatchWriter is closed")
+        if key in self._batch:
+            self.stats.add(deduped=1)
+        self._batch[key] = request
+        if len(self._batch) >= BATCH_SIZE:
+            self._submit()
+
+    def put(self, item: Dict[str, Any]):
+        wire = {k: _serializer.serialize(v) for k, v in item.items()}
+        self._add(self._key(item), {"PutRequest": {"Item": wire}})
+        self.stats.add(puts=1)
+
+    def delete(self, key: Dict[str, Any]):
+        wire = {k: _serializer.serialize(key[k]) for k in self.key_names}
+        self._add(self._key(key), {"DeleteRequest": {"Key": wire}})
+        self.stats.add(deletes=1)
+
+    def _submit(self):
+        if not self._batch:
+            return
+        batch = list(self._batch.values())
+        self._batch = {}
+        self._queue.put(batch)  # blocks while the queue is full
+        self.stats.add(batches=1)
+        depth = self._queue.qsize()
+        self.stats.high_water(depth)
+        if self.metrics:
+            self.metrics.gauge(f"write_queue_depth.{self.table_name}", depth)
+
+    def flush(self):
+        """Send the partial batch, wait for all in-flight writes, raise on failures."""
+        self._submit()
+        self._queue.join()
+        with self._lock:
+            failed, errors = self._failed, self._errors
+            self._failed, self._errors = [], []
+        if failed:
+            raise BatchWriteError(self.table_name, failed, errors)
+
+    def close(self):
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(None)
+            for t in self._threads:
+                t.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            try:
+                self.close()
+            except BatchWriteError:
+                pass  # don't mask the original exception
+
+    # --- consumer side ----------------------------------------------------
+    def _worker(self):
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    return
+                self._write(batch)
+            finally:
+                self._queue.task_done()
+
+    def _backoff(self, attempt: int):
+        time.sleep(random.uniform(0, min(MAX_DELAY, BASE_DELAY * (2**attempt))))
+
+    def _write(self, requests: List[Dict[str, Any]]):
+        attempt = 0
+        while requests:
+            gov = self.governor
+            kwargs = {"RequestItems": {self.table_name: requests}}
+            if gov:
+                gov.before_write()
+                kwargs["ReturnConsumedCapacity"] = "TOTAL"
+            self.stats.add(calls=1)
+            t0 = time.perf_counter()
+            try:
+                resp = self.client.batch_write_item(**kwargs)
+            except Exception as e:
+                throttled = is_throttle(e)
+                if throttled:
+                    self.stats.add(throttles=1)
+                    if gov:
+                        gov.write.throttled()
+                if not throttled or attempt >= self.max_retries:
+                    self._fail(requests, e)
+                    return
+                attempt += 1
+                self.stats.add(retries=1)
+                self._backoff(attempt)
+                continue
+
+            if self.metrics:
+                dt = time.perf_counter() - t0
+                self.metrics.observe(f"write_call.{self.table_name}", dt, len(requests))
+            if gov:
+                gov.after_write(resp)
+            left = resp.get("UnprocessedItems", {}).get(self.table_name, [])
+            self.stats.add(written=len(requests) - len(left))
+            if not left:
+                return
+            self.stats.add(unprocessed=len(left))
+            if gov:
+                gov.write.throttled()  # unprocessed items = partial throttling
+            if attempt >= self.max_retries:
+                self._fail(left, "UnprocessedItems after retries")
+                return
+            attempt += 1
+            self.stats.add(retries=1)
+            self._backoff(attempt)
+            requests = left
+
+    def _fail(self, requests: List[Dict[str, Any]], err):
+        self.stats.add(failed=len(requests))
+        with self._lock:
+            self._failed.extend(requests)
+            if len(self._errors) < 10:
+                self._errors.append(str(err))
+
+
+def add_writer_args(parser):
+    parser.add_argument(
+        "--write-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"concurrent BatchWriteItem calls (default: {DEFAULT_WORKERS})",
+    )
+    return parser
+EOF
@@ -0,0 +1,388 @@
+cat > dedup.py << "EOF"
+#!/usr/bin/env python3
+"""
+Near-duplicate job postings (the same job scraped from several sources),
+found with MinHash signatures and LSH banding.
+
+    index = DedupIndex.open()                 # .dedup/minhash-<params>/
+    dups = index.check(page.items)            # per item: canonical job id, or None
+    index.save()                              # append what this run added
+
+A posting's shingles are the SHINGLE_WORDS-word windows of its description
+plus its title words, each repeated TITLE_WEIGHT times so a different title
+counts for about as much as a paragraph. NUM_PERM min-hashes (a·x + b mod p
+over crc32 shingle hashes, one NumPy expression per batch of postings) give
+a signature whose agreement rate estimates the Jaccard similarity. The
+signature is cut into BANDS bands; postings sharing a band hash are
+candidates, and a candidate is a duplicate when its signatures agree on at
+least `threshold` of the positions and the companies match (after dropping
+Inc/LLC/...; an unknown company matches any). Each check is a few
+searchsorted lookups, so a page costs the same whatever the corpus size.
+
+The first posting seen of a cluster is its canonical copy and the only one
+indexed; later copies point at it. Postings with fewer than MIN_WORDS
+description words are recorded but never compared.
+
+Everything checked is kept in append-only chunks under
+
+    .dedup/minhash-<params hash>/chunk-NNNNNN.npz
+
+(one directory per shingling/hashing parameter set, like termmap.py), so a
+later run loads the signatures and only computes them for job ids it hasn't
+seen; a known id gets its recorded answer again. Decisions never change
+once recorded, which also makes a resumed scan that re-reads a few pages
+agree with the run that was interrupted. Requires numpy.
+"""
+
+import hashlib
+import os
+import re
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+from sparsecount import _np, save_npz
+
+DEDUP_DIR = os.environ.get("DEDUP_DIR", ".dedup")
+NUM_PERM = 64
+BANDS = 16  # 4 rows each: pairs at Jaccard 0.8 share a band with p > 0.999
+SHINGLE_WORDS = 5
+TITLE_WEIGHT = 8
+MIN_WORDS = 20
+THRESHOLD = 0.8
+SEED = 20240601
+PRIME = 4294967291  # largest prime < 2**32: min-hashes fit uint32
+SIG_BATCH = 128  # postings hashed per NumPy expression (bounds the K × shingles temp)
+FOLD_KEYS = 200_000  # pending band keys before a merge into the sorted arrays
+COMPACT_CHUNKS = 64  # chunk files before save() rewrites them as one
+
+# attributes check() reads; the index builders add them to their projection
+DEDUP_ATTRS = (
+    "job_description",
+    "description",
+    "title",
+    "job_title",
+    "company",
+    "company_name",
+)
+
+CANONICAL, UNCHECKED = -1, -2  # dup_of values besides a canonical row
+
+_WORD = re.compile(r"[a-z0-9]+")
+_COMPANY_SUFFIXES = set(
+    "inc llc ltd limited corp corporation co company plc gmbh ag sa lp llp the".split()
+)
+
+
+def fingerprint() -> str:
+    params = f"{NUM_PERM}:{BANDS}:{SHINGLE_WORDS}:{TITLE_WEIGHT}:{MIN_WORDS}:{SEED}"
+    return hashlib.sha1(params.encode()).hexdigest()[:12]
+
+
+def job_id_of(j: Dict[str, Any]) -> Optional[str]:
+    """Same precedence as the index builders: id, jobId, Id, then PK JOB#<id>."""
+    job_id = j.get("id") or j.get("jobId") or j.get("Id")
+    if not job_id:
+        pk = j.get("PK") or ""
+        if isinstance(pk, str) and pk.startswith("JOB#"):
+            job_id = pk[4:]
+    return str(job_id) if job_id else None
+
+
+def _first(j: Dict[str, Any], *names: str) -> str:
+    for name in names:
+        v = j.get(name)
+        if isinstance(v, str) and v.strip():
+            return v
+    return ""
+
+
+def shingles(j: Dict[str, Any]) -> Optional[List[str]]:
+    """The posting's shingle set, or None if its description is too short to compare."""
+    words = _WORD.findall(_first(j, "job_description", "description").lower())
+    if len(words) < MIN_WORDS:
+        return None
+    n = len(words) - SHINGLE_WORDS + 1
+    out = {" ".join(words[i : i + SHINGLE_WORDS]) for i in range(n)}
+    for w in _WORD.findall(_first(j, "job_title", "title").lower()):
+        out.update(f"title:{w}:{k}" for k in range(TITLE_WEIGHT))
+    return list(out)
+
+
+def company_key(j: Dict[str, Any]) -> int:
+    """64-bit hash of the normalized company name; 0 when unknown."""
+    words = [
+        w
+        for w in _WORD.findall(_first(j, "company_name", "company").lower())
+        if w not in _COMPANY_SUFFIXES
+    ]
+    if not words:
+        return 0
+    digest = hashlib.blake2b(" ".join(words).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1 or 1  # fits int64, never 0
+
+
+class DedupIndex:
+    def __init__(self, path: Optional[str] = None, threshold: float = THRESHOLD):
+        """path=None keeps the index in memory only."""
+        np = self.np = _np()
+        self.path = path
+        self.threshold = threshold
+        rng = np.random.default_rng(SEED)
+        self._a = rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)[:, None]
+        rows = NUM_PERM // BANDS
+        self._band_mult = rng.integers(1, 1 << 63, rows, dtype=np.uint64) | np.uint64(1)
+        self._band_salt = rng.integers(0, 1 << 63, BANDS, dtype=np.uint64)
+        self._clear()
+        self.chunks: List[str] = []
+        self.loaded = 0
+        self.checked = self.known = self.unchecked = self.duplicates = 0
+        if path:
+            self._load()
+
+    def _clear(self) -> None:
+        np = self.np
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self._sigs = np.zeros((0, NUM_PERM), dtype=np.uint32)
+        self._company = array("q")
+        self._dup_of = array("q")
+        self._keys = np.zeros(0, dtype=np.int64)  # sorted band keys of canonical rows
+        self._key_rows = np.zeros(0, dtype=np.int64)
+        self._pending: Dict[int, List[int]] = {}  # band keys not folded in yet
+        self._pending_keys = 0
+        self.saved = 0  # rows already in chunk files
+
+    @classmethod
+    def open(
+        cls, directory: str = DEDUP_DIR, threshold: float = THRESHOLD
+    ) -> "DedupIndex":
+        return cls(os.path.join(directory, f"minhash-{fingerprint()}"), threshold)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---------- hashing ----------
+    def signatures(self, shingle_sets: List[List[str]]):
+        """(n, NUM_PERM) uint32 MinHash signatures."""
+        np = self.np
+        out = np.empty((len(shingle_sets), NUM_PERM), dtype=np.uint32)
+        for start in range(0, len(shingle_sets), SIG_BATCH):
+            batch = shingle_sets[start : start + SIG_BATCH]
+            x = np.fromiter(
+                (zlib.crc32(s.encode()) for sh in batch for s in sh), dtype=np.uint64
+            )
+            offsets = np.cumsum([0] + [len(sh) for sh in batch[:-1]])
+            h = (self._a * x + self._b) % np.uint64(PRIME)  # (NUM_PERM, shingles)
+            out[start : start + len(batch)] = np.minimum.reduceat(h, offsets, axis=1).T
+        return out
+
+    def band_keys(self, sigs):
+        """(n, BANDS) int64 hash of each band's rows, salted per band."""
+        np = self.np
+        v = sigs.reshape(len(sigs), BANDS, -1).astype(np.uint64)
+        keys = (v * self._band_mult).sum(axis=2, dtype=np.uint64) ^ self._band_salt
+        return keys.view(np.int64)
+
+    # ---------- band index ----------
+    def _index(self, row: int, keys) -> None:
+        for k in keys.tolist():
+            self._pending.setdefault(k, []).append(row)
+        self._pending_keys += len(keys)
+        if self._pending_keys >= FOLD_KEYS:
+            self._fold()
+
+    def _fold(self) -> None:
+        if not self._pending:
+            return
+        np = self.np
+        keys = [k for k, rows in self._pending.items() for _ in rows]
+        rows = [r for rs in self._pending.values() for r in rs]
+        self._pending, self._pending_keys = {}, 0
+        self._merge_keys(np.array(keys, dtype=np.int64), np.array(rows, dtype=np.int64))
+
+    def _merge_keys(self, keys, rows) -> None:
+        np = self.np
+        keys = np.concatenate([self._keys, keys])
+        rows = np.concatenate([self._key_rows, rows])
+        order = np.lexsort((rows, keys))
+        self._keys, self._key_rows = keys[order], rows[order]
+
+    def _candidates(self, keys) -> List[int]:
+        np = self.np
+        lo = np.searchsorted(self._keys, keys, "left")
+        hi = np.searchsorted(self._keys, keys, "right")
+        found = set()
+        for a, b in zip(lo[lo < hi].tolist(), hi[lo < hi].tolist()):
+            found.update(self._key_rows[a:b].tolist())
+        for k in keys.tolist():
+            found.update(self._pending.get(k, ()))
+        return sorted(found)
+
+    # ---------- checking ----------
+    def _append(self, job_id: str, sig, company: int, dup_of: int) -> int:
+        row = len(self.ids)
+        if row == len(self._sigs):
+            grown = self.np.zeros((max(1024, 2 * row), NUM_PERM), dtype=self.np.uint32)
+            grown[:row] = self._sigs
+            self._sigs = grown
+        if sig is not None:
+            self._sigs[row] = sig
+        self.ids.append(job_id)
+        self.rows[job_id] = row
+        self._company.append(company)
+        self._dup_of.append(dup_of)
+        return row
+
+    def check(self, items: Iterable[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        For each item, the canonical job id if it duplicates an earlier
+        posting, else None. New postings are recorded in order, so a copy
+        later on the same page is caught too.
+        """
+        np = self.np
+        items = list(items)
+        out: List[Optional[str]] = [None] * len(items)
+        new = []  # (position, job id, company key)
+        shingle_sets = []
+        pending_ids = set()
+        for i, j in enumerate(items):
+            job_id = job_id_of(j)
+            if not job_id:
+                continue
+            if job_id in self.rows or job_id in pending_ids:
+                continue  # answered below, after this page's new rows exist
+            sh = shingles(j)
+            pending_ids.add(job_id)
+            if sh is None:
+                self._append(job_id, None, company_key(j), UNCHECKED)
+                self.unchecked += 1
+                continue
+            new.append((i, job_id, company_key(j)))
+            shingle_sets.append(sh)
+        if new:
+            sigs = self.signatures(shingle_sets)
+            band_keys = self.band_keys(sigs)
+            need = int(np.ceil(self.threshold * NUM_PERM))
+            for (i, job_id, company), sig, keys in zip(new, sigs, band_keys):
+                self.checked += 1
+                dup = CANONICAL
+                for c in self._candidates(keys):
+                    other = self._company[c]
+                    if company and other and company != other:
+                        continue
+                    if int(np.count_nonzero(self._sigs[c] == sig)) >= need:
+                        dup = c
+                        break
+                row = self._append(job_id, sig, company, dup)
+                if dup == CANONICAL:
+                    self._index(row, keys)
+                else:
+                    self.duplicates += 1
+        for i, j in enumerate(items):
+            job_id = job_id_of(j)
+            if job_id in self.rows:
+                d = self._dup_of[self.rows[job_id]]
+                out[i] = self.ids[d] if d >= 0 else None
+                if job_id not in pending_ids:
+                    self.known += 1
+        return out
+
+    # ---------- persistence ----------
+    def _chunk_path(self, n: int) -> str:
+        return os.path.join(self.path, f"chunk-{n:06d}.npz")
+
+    def _load(self) -> None:
+        np = self.np
+        if not os.path.isdir(self.path):
+            return
+        names = sorted(
+            f for f in os.listdir(self.path) if re.fullmatch(r"chunk-\d+\.npz", f)
+        )
+        for name in names:
+            with np.load(os.path.join(self.path, name)) as z:
+                start = int(z["start"])
+                if start == 0:  # a compacted chunk replaces everything before it
+                    self._clear()
+                elif start != len(self.ids):
+                    print(f"⚠ dedup: {name} starts at row {start}, not {len(self)}")
+                    continue
+                ids = z["ids"].tolist()
+                sigs, company, dup_of = z["sigs"], z["company"], z["dup_of"]
+            self._sigs = np.concatenate([self._sigs[: len(self.ids)], sigs])
+            for k, job_id in enumerate(ids, len(self.ids)):
+                self.rows[job_id] = k
+            self.ids.extend(ids)
+            self._company.extend(company.tolist())
+            self._dup_of.extend(dup_of.tolist())
+            self.chunks.append(name)
+        self.saved = self.loaded = len(self.ids)
+        dup_of = np.frombuffer(self._dup_of, dtype=np.int64)
+        rows = np.flatnonzero(dup_of == CANONICAL)
+        if len(rows):
+            keys = self.band_keys(self._sigs[rows])
+            self._merge_keys(keys.ravel(), np.repeat(rows, BANDS))
+
+    def save(self) -> None:
+        """Write the rows added since the last save as a new chunk (atomic)."""
+        if not self.path or self.saved == len(self.ids):
+            return
+        np = self.np
+        n = int(self.chunks[-1][6:12]) + 1 if self.chunks else 0
+        start = 0 if len(self.chunks) >= COMPACT_CHUNKS else self.saved
+        end = len(self.ids)
+        save_npz(
+            self._chunk_path(n),
+            start=np.int64(start),
+            ids=np.array(self.ids[start:end], dtype=str),
+            sigs=self._sigs[start:end],
+            company=np.frombuffer(self._company, dtype=np.int64)[start:end],
+            dup_of=np.frombuffer(self._dup_of, dtype=np.int64)[start:end],
+        )
+        if start == 0:
+            for name in self.chunks:
+                os.remove(os.path.join(self.path, name))
+            self.chunks = []
+        self.chunks.append(os.path.basename(self._chunk_path(n)))
+        self.saved = end
+
+    def summary(self) -> str:
+        dup_of = self.np.frombuffer(self._dup_of, dtype=self.np.int64)
+        total_dups = int(self.np.count_nonzero(dup_of >= 0))
+        return (
+            f"{len(self.ids)} postings, {total_dups} duplicates "
+            f"(this run: {self.checked} checked, {self.duplicates} duplicates, "
+            f"{self.known} already known, {self.unchecked} too short to compare)"
+        )
+
+
+def add_dedup_args(parser):
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="skip near-duplicate postings (MinHash/LSH over description + title, "
+        "same company); signatures persist in --dedup-dir",
+    )
+    parser.add_argument(
+        "--dedup-dir",
+        default=DEDUP_DIR,
+        help="where signatures are kept between runs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=THRESHOLD,
+        help="estimated Jaccard similarity of a duplicate (default: %(default)s)",
+    )
+    return parser
+
+
+def dedup_from_args(args) -> Optional[DedupIndex]:
+    if not args.dedup:
+        return None
+    index = DedupIndex.open(args.dedup_dir, args.dedup_threshold)
+    if len(index):
+        print(f"↻ dedup index: {index.summary()}")
+    return index
+EOF
@@ -0,0 +1,393 @@
+cat > hydrate.py << "EOF"
+#!/usr/bin/env python3
+"""
+Hydrate job-tech-index rows into postings: the index stores only jobId.
+
+    python3 hydrate.py react --limit 200 > react.jsonl       # latest Active
+    python3 hydrate.py "Node.js" --index v1 --since 2025-10-01 --source enhanced
+
+    hydrator = Hydrator(normalized_table, attrs=EXPORT_ATTRS)
+    for rows in query_index(idx, "react", since="2025-10-01", limit=500):
+        postings = hydrator.get([r["jobId"] for r in rows])  # same order
+
+query_index() pages through one tech partition, newest first, over the
+status#processed#jobId sort key: SK BETWEEN status#since AND status#until,
+so "latest Active postings for X" is one Query per page and no filter.
+
+Hydrator.get() answers from a bounded LRU cache whose entries expire after
+`ttl` seconds (postings that no longer exist are cached too, as None), and
+fetches the rest with BatchGetItem, 100 keys per call, projected to `attrs`,
+the calls of one get() running `workers` at a time. UnprocessedKeys and
+throttled calls are retried with jittered backoff. Items are decoded with
+rawitem.decode().
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from boto3.dynamodb.types import TypeSerializer
+
+from capacity import CapacityGovernor, add_capacity_args, governor_from_args
+from capacity import is_throttle
+from ddbwriter import DEFAULT_WORKERS, low_level_client
+from indexrows import V1_TABLE, V2_TABLE
+from lifecycle import ACTIVE
+from metrics import add_metrics_args, metrics_from_args
+from rawitem import decode
+
+SOURCES = {  # table -> partition key
+    "job-postings-normalized": "Id",
+    "job-postings-enhanced": "jobId",
+}
+EXPORT_ATTRS = (
+    "job_title",
+    "company_name",
+    "location",
+    "remote_status",
+    "seniority_level",
+    "salary_range",
+    "status",
+    "processed_date",
+)
+BATCH_GET_KEYS = 100  # BatchGetItem limit
+CACHE_ITEMS = 10_000
+CACHE_TTL = 300.0  # seconds
+QUERY_PAGE = 500  # index rows per Query call
+MAX_RETRIES = 8
+
+_serializer = TypeSerializer()
+
+
+def _decode_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: decode(v) for k, v in item.items()}
+
+
+def _call(client, method: str, governor=None, metrics=None, **kwargs) -> Dict[str, Any]:
+    """One read call with governor accounting and throttle retries."""
+    for attempt in range(MAX_RETRIES + 1):
+        if governor:
+            governor.before_read()
+            kwargs["ReturnConsumedCapacity"] = "TOTAL"
+        t0 = time.perf_counter()
+        try:
+            resp = getattr(client, method)(**kwargs)
+        except Exception as e:
+            if not is_throttle(e) or attempt == MAX_RETRIES:
+                raise
+            if governor:
+                governor.read.throttled()
+            time.sleep(min(10.0, 0.05 * 2**attempt) * random.uniform(0.5, 1.0))
+            continue
+        if metrics:
+            metrics.observe(f"{method}_call", time.perf_counter() - t0)
+        if governor:
+            governor.after_read(resp)
+        return resp
+
+
+def query_index(
+    table,
+    pk: str,
+    status: str = ACTIVE,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    newest_first: bool = True,
+    limit: Optional[int] = None,
+    page_size: int = QUERY_PAGE,
+    governor: Optional[CapacityGovernor] = None,
+    metrics=None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of index rows for partition `pk` (a slug on v2, a display
+    name on v1) with the given status, processed between `since` and
+    `until` (ISO prefixes, both inclusive: "2025-10" covers the month).
+    """
+    client = low_level_client(table)
+    # U+FFFF sorts after any ISO character, so `until` covers its whole prefix
+    lo = f"{status}#{since or ''}"
+    hi = f"{status}#{until or ''}\uffff"
+    kwargs = {
+        "TableName": table.name,
+        "KeyConditionExpression": "PK = :pk AND SK BETWEEN :lo AND :hi",
+        "ExpressionAttributeValues": {
+            ":pk": {"S": pk},
+            ":lo": {"S": lo},
+            ":hi": {"S": hi},
+        },
+        "ScanIndexForward": not newest_first,
+    }
+    left = limit
+    while left is None or left > 0:
+        kwargs["Limit"] = page_size if left is None else min(page_size, left)
+        resp = _call(client, "query", governor, metrics, **kwargs)
+        rows = [_decode_item(it) for it in resp.get("Items", [])]
+        if left is not None:
+            left -= len(rows)
+        if rows:
+            yield rows
+        if not resp.get("LastEvaluatedKey"):
+            return
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+class ItemCache:
+    """Thread-safe LRU of key -> item (None: known missing); entries live `ttl` s."""
+
+    def __init__(self, max_items: int = CACHE_ITEMS, ttl: float = CACHE_TTL):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: "OrderedDict[Any, Tuple[float, Optional[Dict[str, Any]]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def lookup(self, key) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """(found, item); found=False when absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._items[key]
+                self.misses += 1
+                return False, None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def store(self, key, item: Optional[Dict[str, Any]]) -> None:
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, item)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evicted += 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def summary(self) -> str:
+        return (
+            f"size={len(self)}/{self.max_items} ttl={self.ttl:g}s hits={self.hits} "
+            f"misses={self.misses} evicted={self.evicted}"
+        )
+
+
+class Hydrator:
+    def __init__(
+        self,
+        table,
+        attrs: Sequence[str] = EXPORT_ATTRS,
+        key: Optional[str] = None,
+        workers: int = DEFAULT_WORKERS,
+        cache: Optional[ItemCache] = None,
+        governor: Optional[CapacityGovernor] = None,
+        metrics=None,
+    ):
+        """
+        table     boto3 Table of the postings (job-postings-normalized / -enhanced)
+        attrs     attributes to fetch; the key is always included
+        key       partition key name (default: from SOURCES)
+        cache     ItemCache shared across get() calls (default: a new one)
+        """
+        self.table_name = table.name
+        self.key = key or SOURCES[table.name]
+        self.client = low_level_client(table)  # thread-safe, shared
+        self.attrs = [self.key] + [a for a in attrs if a != self.key]
+        self.workers = max(1, workers)
+        self.cache = cache if cache is not None else ItemCache()
+        self.governor = governor
+        self.metrics = metrics
+        self.fetched = 0
+        self.missing = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, keys: Sequence[Any]) -> List[Optional[Dict[str, Any]]]:
+        """The postings for `keys`, in order; None for keys with no posting."""
+        found: Dict[Any, Optional[Dict[str, Any]]] = {}
+        todo = []
+        for k in dict.fromkeys(keys):
+            hit, item = self.cache.lookup(k)
+            if hit:
+                found[k] = item
+            else:
+                todo.append(k)
+        step = BATCH_GET_KEYS
+        chunks = [todo[i : i + step] for i in range(0, len(todo), step)]
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+                results = list(pool.map(self._batch_get, chunks))
+        else:
+            results = [self._batch_get(c) for c in chunks]
+        for chunk, items in zip(chunks, results):
+            by_key = {it[self.key]: it for it in items}
+            for k in chunk:
+                item = by_key.get(k)
+                self.cache.store(k, item)
+                found[k] = item
+            with self._lock:
+                self.fetched += len(items)
+                self.missing += len(chunk) - len(items)
+        return [found[k] for k in keys]
+
+    def _batch_get(self, keys: List[Any]) -> List[Dict[str, Any]]:
+        names = {f"#a{i}": a for i, a in enumerate(self.attrs)}
+        request = {
+            "Keys": [{self.key: _serializer.serialize(k)} for k in keys],
+            "ProjectionExpression": ",".join(names),
+            "ExpressionAttributeNames": names,
+        }
+        out = []
+        for attempt in range(MAX_RETRIES + 1):
+            with self._lock:
+                self.calls += 1
+            resp = _call(
+                self.client,
+                "batch_get_item",
+                self.governor,
+                self.metrics,
+                RequestItems={self.table_name: request},
+            )
+            items = resp.get("Responses", {}).get(self.table_name, [])
+            out += [_decode_item(it) for it in items]
+            left = resp.get("UnprocessedKeys", {}).get(self.table_name)
+            if not left:
+                return out
+            if attempt == MAX_RETRIES:
+                raise RuntimeError(f"{len(left['Keys'])} keys still unprocessed")
+            request = left
+            time.sleep(min(10.0, 0.05 * 2**attempt) * random.uniform(0.5, 1.0))
+        return out
+
+    def summary(self) -> str:
+        return (
+            f"fetched={self.fetched} missing={self.missing} calls={self.calls} "
+            f"cache: {self.cache.summary()}"
+        )
+
+
+def latest(
+    index_table,
+    hydrator: Hydrator,
+    pk: str,
+    limit: Optional[int] = None,
+    **query,
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(index row, posting) for the newest rows of `pk`, skipping postings now gone."""
+    for rows in query_index(index_table, pk, limit=limit, **query):
+        for row, item in zip(rows, hydrator.get([r["jobId"] for r in rows])):
+            if item is not None:
+                yield row, item
+
+
+def _json_default(v):
+    if isinstance(v, Decimal):
+        return int(v) if v == v.to_integral_value() else float(v)
+    if isinstance(v, (set, frozenset)):
+        return sorted(v)
+    return str(v)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Export the latest postings for a tech")
+    ap.add_argument("tech", help="technology, any spelling (mapped like the index)")
+    ap.add_argument(
+        "--index",
+        choices=("v1", "v2"),
+        default="v2",
+        help=f"v2: {V2_TABLE} (slug), v1: {V1_TABLE} (display name)",
+    )
+    ap.add_argument(
+        "--source",
+        choices=("normalized", "enhanced"),
+        default="normalized",
+        help="table the postings are read from (default: %(default)s)",
+    )
+    ap.add_argument("--status", default=ACTIVE, help="default: %(default)s")
+    ap.add_argument("--since", default=None, help="processed on/after (ISO prefix)")
+    ap.add_argument("--until", default=None, help="processed on/before (ISO prefix)")
+    ap.add_argument("--oldest-first", action="store_true")
+    ap.add_argument(
+        "--limit", type=int, default=100, help="index rows (default: %(default)s)"
+    )
+    ap.add_argument(
+        "--attrs",
+        type=lambda s: [a for a in s.split(",") if a],
+        default=list(EXPORT_ATTRS),
+        help="comma-separated posting attributes",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="concurrent BatchGetItem calls (default: %(default)s)",
+    )
+    ap.add_argument("--cache-items", type=int, default=CACHE_ITEMS)
+    ap.add_argument("--cache-ttl", type=float, default=CACHE_TTL, help="seconds")
+    ap.add_argument("--out", default="-", help="JSON lines file (default: stdout)")
+    add_capacity_args(ap)
+    add_metrics_args(ap)
+    args = ap.parse_args()
+
+    import boto3
+
+    from termmap import term_display, term_slug
+
+    dynamodb = boto3.resource("dynamodb")
+    idx = dynamodb.Table(V2_TABLE if args.index == "v2" else V1_TABLE)
+    source = dynamodb.Table(f"job-postings-{args.source}")
+    pk = term_slug(args.tech) if args.index == "v2" else term_display(args.tech)
+    if not pk:
+        sys.exit(f"✗ {args.tech!r} doesn't map to a technology")
+    metrics = metrics_from_args(args, "hydrate")
+    governor = governor_from_args(args, read_table=source)
+    hydrator = Hydrator(
+        source,
+        args.attrs,
+        workers=args.workers,
+        cache=ItemCache(args.cache_items, args.cache_ttl),
+        governor=governor,
+        metrics=metrics,
+    )
+    rows = latest(
+        idx,
+        hydrator,
+        pk,
+        limit=args.limit,
+        status=args.status,
+        since=args.since,
+        until=args.until,
+        newest_first=not args.oldest_first,
+        governor=governor,
+        metrics=metrics,
+    )
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    n = 0
+    t0 = time.time()
+    try:
+        for row, item in rows:
+            record = {**item, "jobId": row["jobId"], "tech": pk}
+            out.write(json.dumps(record, default=_json_default, sort_keys=True) + "\n")
+            n += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        metrics.close()
+    elapsed = time.time() - t0
+    print(f"✓ {n} {args.status} postings for {pk} in {elapsed:.2f}s", file=sys.stderr)
+    print(f"  hydrate: {hydrator.summary()}", file=sys.stderr)
+EOF
@@ -0,0 +1,118 @@
+cat > indexdelta.py << "EOF"
+#!/usr/bin/env python3
+"""
+Delta-only maintenance for job-tech-index / job-tech-index-v2.
+
+A full backfill rewrites every (tech, status#processed#jobId) row and never
+removes the row left behind when a job's status or processed_date changes.
+In incremental mode the index keys are loaded once (keys-only scan), and for
+each job the desired rows from build_puts() are compared with what is there:
+
+    delta = IndexDelta.load(idx, segments=4)
+    for job in jobs:
+        delta.apply(job_id_of(job), build_puts(job), writer)
+    delta.delete_orphans(writer)   # rows of jobs that no longer exist
+
+Only new rows are put and only obsolete rows are deleted, so a run where
+nothing changed costs reads but (almost) no writes. Every index attribute is
+derived from the key, so an existing key never needs rewriting.
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ddbscan import scan_pages
+
+IndexKey = Tuple[str, str]  # (PK, SK)
+
+
+def sk_job_id(sk: str) -> str:
+    """jobId from a status#processed#jobId sort key."""
+    return sk.split("#", 2)[-1]
+
+
+def load_index_keys(table, **scan_opts) -> Dict[str, Set[IndexKey]]:
+    """jobId -> {(PK, SK)} for every row in an index table (keys-only scan)."""
+    rows: Dict[str, Set[IndexKey]] = {}
+    for page in scan_pages(
+        table,
+        ProjectionExpression="#pk,#sk,jobId",
+        ExpressionAttributeNames={"#pk": "PK", "#sk": "SK"},
+        **scan_opts,
+    ):
+        for r in page.items:
+            job_id = r.get("jobId") or sk_job_id(r["SK"])
+            rows.setdefault(job_id, set()).add((r["PK"], r["SK"]))
+    return rows
+
+
+class IndexDelta:
+    COUNTERS = ("unchanged", "added", "removed", "orphans_removed")
+
+    def __init__(
+        self,
+        existing: Dict[str, Set[IndexKey]],
+        counters: Optional[Dict[str, int]] = None,
+    ):
+        self.existing = existing
+        self.counters = {k: 0 for k in self.COUNTERS}
+        self.counters.update(counters or {})
+
+    @classmethod
+    def load(cls, table, counters=None, **scan_opts) -> "IndexDelta":
+        print(f"Loading existing keys from {table.name}...")
+        existing = load_index_keys(table, **scan_opts)
+        n = sum(len(v) for v in existing.values())
+        print(f"  {n} rows for {len(existing)} jobs")
+        return cls(existing, counters)
+
+    def apply(self, job_id: Optional[str], puts: List[Dict[str, Any]], writer) -> int:
+        """
+        Reconcile one job's rows: put the missing ones, delete the obsolete ones.
+        `puts` is build_puts() output; returns the number of writes queued.
+        """
+        if not job_id:
+            return 0
+        have = self.existing.pop(job_id, set())  # popped = seen this run
+        want = {}
+        for p in puts:
+            item = p["PutRequest"]["Item"]
+            want[(item["PK"], item["SK"])] = item
+        ops = 0
+        for key, item in want.items():
+            if key in have:
+                self.counters["unchanged"] += 1
+            else:
+                writer.put(item)
+                self.counters["added"] += 1
+                ops += 1
+        for pk, sk in have - want.keys():
+            writer.delete({"PK": pk, "SK": sk})
+            self.counters["removed"] += 1
+            ops += 1
+        return ops
+
+    def delete_orphans(self, writer) -> int:
+        """
+        Delete rows of jobs apply() never saw. Only meaningful after a full,
+        uninterrupted scan of the jobs table.
+        """
+        n = 0
+        for job_id in list(self.existing):
+            for pk, sk in self.existing.pop(job_id):
+                writer.delete({"PK": pk, "SK": sk})
+                n += 1
+        self.counters["orphans_removed"] += n
+        return n
+
+    def summary(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.counters.items())
+
+
+def add_delta_args(parser):
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="diff against the existing index: put new rows, delete stale ones",
+    )
+    return parser
+EOF
@@ -0,0 +1,66 @@
+cat > indexrows.py << "EOF"
+#!/usr/bin/env python3
+"""
+job-tech-index rows: one per (technology, posting), sort key
+status#processed#jobId, jobId kept for hydration.
+
+    slug_puts(j)       job-tech-index-v2, PK = term slug     (jtindex.py)
+    display_puts(j)    job-tech-index,    PK = display name  (job-tech-index.py)
+
+Both return BatchWriteItem PutRequests. jtindex.py and job-tech-index.py
+materialize as the same module, so the one-scan backfill (backfill.py),
+which writes both tables, takes the row shapes from here.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from dates import iso_utc
+from termmap import term_display, term_slug
+
+V1_TABLE = "job-tech-index"
+V2_TABLE = "job-tech-index-v2"
+
+
+def job_id_of(j: Dict[str, Any]):
+    job_id = j.get("id") or j.get("jobId")
+    if not job_id:
+        pk = j.get("PK") or ""
+        if isinstance(pk, str) and pk.startswith("JOB#"):
+            job_id = pk[4:]
+    return job_id
+
+
+def _puts(
+    j: Dict[str, Any], key_of: Callable[[Any], Optional[str]], label: str
+) -> List[Dict[str, Any]]:
+    job_id = job_id_of(j)
+    if not job_id:
+        return []
+
+    status = (j.get("status") or "Active").strip() or "Active"
+    processed = iso_utc(j.get("processed_date"))
+    if processed is None:  # --unparseable-dates skip
+        return []
+
+    keys = set()
+    for t in j.get("technologies") or []:
+        k = key_of(t)
+        if k:
+            keys.add(k)
+
+    sk = f"{status}#{processed}#{job_id}"
+    return [
+        {"PutRequest": {"Item": {"PK": k, "SK": sk, label: k, "jobId": job_id}}}
+        for k in sorted(keys)
+    ]
+
+
+def slug_puts(j: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """v2 rows: PK = slug (through the persisted term map), `slug` attribute."""
+    return _puts(j, lambda t: term_slug(str(t)), "slug")
+
+
+def display_puts(j: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """v1 rows: PK = normalized display name, `tech` attribute."""
+    return _puts(j, term_display, "tech")
+EOF
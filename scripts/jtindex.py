@@ -1,10 +1,24 @@
 cat > jtindex.py << "EOF"
 #!/usr/bin/env python3
-import os, sys, time, re, unicodedata
-from datetime import datetime, timezone
-from typing import Iterable, Dict, Any, Set
+import sys, argparse
+from typing import Iterable
 import boto3
 
+from capacity import add_capacity_args, governor_from_args
+from checkpoint import Checkpoint, add_checkpoint_args
+from cooccur import add_cooccurrence_args, open_matrix, state_path, write_top_k
+from ddbscan import SegmentScanError, add_scan_args, scan_pages
+from dates import add_date_args, iso_utc, set_policy
+from dedup import DEDUP_ATTRS, add_dedup_args, dedup_from_args
+from ddbwriter import DEFAULT_WORKERS, BatchWriter, add_writer_args
+from indexdelta import IndexDelta, add_delta_args
+from metrics import add_metrics_args, metrics_from_args
+from momentum import thresholds_from_args
+from snapshot import Snapshot, add_snapshot_args, snapshot_pages
+from sparsecount import clear_state
+from trendcube import TREND_ATTRS, add_trend_args, cube_options, open_cube, write_rows
+from trendcube import state_path as cube_state_path
+
 JOBS_TABLE = "job-postings-enhanced"
 INDEX_TABLE = "job-tech-index-v2"
 
@@ -15,165 +29,272 @@ idx = dynamodb.Table(INDEX_TABLE)
 
 # ---------- time helpers ----------
 def parse_iso_or_epoch(val):
-    if not val:
-        return datetime.now(timezone.utc).isoformat()
-    if isinstance(val, (int, float)):
-        return datetime.fromtimestamp(val, tz=timezone.utc).isoformat()
-    s = str(val).strip()
-    try:
-        if s.endswith("Z"):
-            return (
-                datetime.fromisoformat(s.replace("Z", "+00:00"))
-                .astimezone(timezone.utc)
-                .isoformat()
-            )
-        return datetime.fromisoformat(s).astimezone(timezone.utc).isoformat()
-    except Exception:
-        for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"):
-            try:
-                return (
-                    datetime.strptime(s, fmt).replace(tzinfo=timezone.utc).isoformat()
-                )
-            except Exception:
-                pass
-        return datetime.now(timezone.utc).isoformat()
+    """processed_date -> ISO UTC via the shared parser (dates.py); never now()."""
+    return iso_utc(val)
 
 
 # ---------- slugify ----------
-# Minimal structural transforms (not a giant exceptions list)
-STRUCTURAL_MAP = {
-    "c#": "csharp",
-    "csharp": "csharp",
-    "c++": "cpp",
-    "cpp": "cpp",
-    ".net": "dotnet",
-    "node.js": "nodejs",
-    "next.js": "nextjs",
-    "nuxt.js": "nuxtjs",
-    "express.js": "express",
-    "postgres": "postgresql",
-    "postgresql": "postgresql",
-    "mongo": "mongodb",
-    "mongodb": "mongodb",
-}
-
-
-def normalize_unicode(s: str) -> str:
-    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-
-
-def structural_pass(s: str) -> str:
-    t = s.lower().strip()
-    # quick wins first
-    if t in STRUCTURAL_MAP:
-        return STRUCTURAL_MAP[t]
-    # handle common .js pattern generically
-    if t.endswith(".js"):
-        base = t[:-3]
-        if base in ("node", "next", "nuxt", "express"):
-            return STRUCTURAL_MAP.get(t, base + "js")
-    return t
-
-
-def slugify_tech(raw: str) -> str:
-    if not raw or not isinstance(raw, str):
-        return ""
-    # 1) structural transforms on the raw string
-    t = structural_pass(raw)
-    # 2) unicode fold
-    t = normalize_unicode(t)
-    # 3) replace anything non-alnum with a dash
-    t = re.sub(r"[^a-z0-9]+", "-", t.lower())
-    # 4) collapse dashes and trim
-    t = re.sub(r"-{2,}", "-", t).strip("-")
-    return t
+# slugify_tech lives in canonicalize.py; build_puts (indexrows.py) reads slugs
+# through the persisted term map (termmap.py)
+from termmap import default_term_map
 
 
 # ---------- scan ----------
-def scan_jobs():
-    lek = None
+def scan_job_pages(segments: int = 1, extra_attrs: Iterable[str] = (), **scan_opts):
+    """
+    Yield scan pages; segments > 1 runs a parallel segmented scan (see ddbscan.py).
+    extra_attrs are projected too (aliased, some are reserved words) unless
+    already in the projection.
+    """
     proj = "#pk,#sk,id,jobId,#st,processed_date,technologies"
     ean = {"#pk": "PK", "#sk": "SK", "#st": "status"}  # status is reserved
-    while True:
-        kwargs = {"ProjectionExpression": proj, "ExpressionAttributeNames": ean}
-        if lek:
-            kwargs["ExclusiveStartKey"] = lek
-        resp = jobs.scan(**kwargs)
-        for it in resp.get("Items", []):
-            yield it
-        lek = resp.get("LastEvaluatedKey")
-        if not lek:
-            break
+    have = set(proj.split(","))
+    for i, attr in enumerate(a for a in dict.fromkeys(extra_attrs) if a not in have):
+        proj += f",#x{i}"
+        ean[f"#x{i}"] = attr
+    yield from scan_pages(
+        jobs,
+        segments=segments,
+        ProjectionExpression=proj,
+        ExpressionAttributeNames=ean,
+        **scan_opts,
+    )
+
+
+def scan_jobs(segments: int = 1, **scan_opts):
+    for page in scan_job_pages(segments=segments, **scan_opts):
+        yield from page.items
 
 
 # ---------- build write batch ----------
-def build_puts(j: Dict[str, Any]):
-    job_id = j.get("id") or j.get("jobId")
-    if not job_id:
-        pk = j.get("PK") or ""
-        if isinstance(pk, str) and pk.startswith("JOB#"):
-            job_id = pk[4:]
-    if not job_id:
-        return []
-
-    status = (j.get("status") or "Active").strip() or "Active"
-    processed = parse_iso_or_epoch(j.get("processed_date"))
-
-    techs = j.get("technologies") or []
-    slugs: Set[str] = set()
-
-    for t in techs:
-        s = slugify_tech(str(t))
-        if s:
-            slugs.add(s)
-
-    if not slugs:
-        return []
-
-    puts = []
-    sk = f"{status}#{processed}#{job_id}"
-    for slug in sorted(slugs):
-        item = {
-            "PK": slug,  # slug as partition key
-            "SK": sk,  # status#processed#jobId
-            "slug": slug,  # convenience
-            "jobId": job_id,  # for hydration
-            # "display": t_norm  # optional: store a display label later if you want
-        }
-        puts.append({"PutRequest": {"Item": item}})
-    return puts
-
-
-def batch_write(items):
+# rows (PK = slug) are shaped in indexrows.py, shared with backfill.py
+from indexrows import job_id_of
+from indexrows import slug_puts as build_puts
+
+
+CHECKPOINT_PUTS = 5000  # flush the writer + checkpoint after this many writes
+CHECKPOINT_PAGES = 50  # ...or after this many pages (incremental runs write little)
+
+
+def make_writer(workers: int = DEFAULT_WORKERS, governor=None, metrics=None) -> BatchWriter:
+    """Concurrent BatchWriteItem writer for the index table (see ddbwriter.py)."""
+    return BatchWriter(
+        idx, key_names=["PK", "SK"], workers=workers, governor=governor, metrics=metrics
+    )
+
+
+def batch_write(items, writer: BatchWriter = None):
     if not items:
         return 0
-    written = 0
-    with idx.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as bw:
-        for i in items:
-            bw.put_item(Item=i["PutRequest"]["Item"])
-            written += 1
-    return written
+    own = writer is None
+    writer = writer or make_writer()
+    for i in items:
+        writer.put(i["PutRequest"]["Item"])
+    if own:
+        writer.close()
+    return len(items)
 
 
 def main():
-    scanned = written = 0
-    buf = []
+    ap = argparse.ArgumentParser(description=f"Backfill {INDEX_TABLE} from {JOBS_TABLE}")
+    add_scan_args(ap)
+    add_writer_args(ap)
+    add_capacity_args(ap)
+    add_delta_args(ap)
+    add_snapshot_args(ap)
+    add_date_args(ap)
+    add_metrics_args(ap)
+    add_cooccurrence_args(ap)
+    add_trend_args(ap)
+    add_dedup_args(ap)
+    args = add_checkpoint_args(ap, "jtindex-v2").parse_args()
+    set_policy(args.unparseable_dates)
+    governor = governor_from_args(args, read_table=jobs, write_table=idx)
+    metrics = metrics_from_args(args, "jtindex-v2")
+
+    if args.snapshot:  # offline: one "segment", resumable by row offset
+        cp = Checkpoint.open(args.checkpoint, "jtindex-v2@snapshot", 1, resume=args.resume)
+    else:
+        cp = Checkpoint.open(args.checkpoint, "jtindex-v2", args.segments, resume=args.resume)
+    scanned = cp.counters.get("scanned", 0)
+    written_before = written = cp.counters.get("written", 0)
+    reported = scanned
+    writer = make_writer(args.write_workers, governor, metrics)
+    metrics.watch(governor=governor, writer=writer)
+    committed_ops = 0
+    pages_since = 0
     print(f"Backfilling from {JOBS_TABLE} → {INDEX_TABLE} (slug PK)")
+    if cp.total_segments > 1:
+        print(f"  parallel scan: {cp.total_segments} segments, workers={args.workers or 'auto'}")
+    cooc = None
+    if args.cooccurrence:
+        cooc = open_matrix(args.checkpoint, cp.counters.get("cooccur_seq"), cp.resumed)
+    cube = None
+    if args.trends or args.trends_state:
+        cube = open_cube(
+            args.checkpoint, cp.counters.get("trends_seq"), cp.resumed, **cube_options(args)
+        )
+    dedup = dedup_from_args(args)
+    if dedup is not None and args.snapshot and not Snapshot(args.snapshot).full:
+        print("⚠ projected snapshot (no descriptions): --dedup only skips known ids")
+    delta = None
+    if args.incremental:
+        with metrics.stage("delta_load"):
+            delta = IndexDelta.load(
+                idx,
+                counters=cp.counters.get("delta"),
+                segments=cp.total_segments,
+                workers=args.workers,
+                governor=governor,
+                metrics=metrics,
+                backend=args.scan_backend,
+            )
+
+    def ops():
+        return writer.stats.puts + writer.stats.deletes
+
+    def commit():
+        nonlocal written, committed_ops, pages_since
+        with metrics.stage("flush"):
+            writer.flush()  # everything handed to the writer has landed
+        written = written_before + writer.stats.written
+        committed_ops, pages_since = ops(), 0
+        counters = {"scanned": scanned, "written": written}
+        if delta:
+            counters["delta"] = delta.counters
+        if cooc is not None:
+            # matrix + checkpoint carry the same seq; a mismatch on resume means
+            # the crash fell between the two saves
+            counters["cooccur_seq"] = cp.counters.get("cooccur_seq", 0) + 1
+            cooc.save(state_path(args.checkpoint), counters["cooccur_seq"])
+        if cube is not None:
+            counters["trends_seq"] = cp.counters.get("trends_seq", 0) + 1
+            cube.save(cube_state_path(args.checkpoint), counters["trends_seq"])
+        if dedup is not None:
+            dedup.save()  # append-only and idempotent per job id: no seq needed
+        cp.commit(**counters)
+
     try:
-        for j in scan_jobs():
-            scanned += 1
-            buf.extend(build_puts(j))
-            if len(buf) >= 500:
-                written += batch_write(buf)
-                buf = []
-                if scanned % 2000 == 0:
+        if cp.complete:
+            # resumed after the scan finished: only the post-scan steps are left
+            print("↻ Scan already complete; skipping to the post-scan steps")
+            pages = ()
+        elif args.snapshot:
+            pages = snapshot_pages(args.snapshot, start_keys=cp.start_keys())
+        else:
+            pages = scan_job_pages(
+                segments=cp.total_segments,
+                workers=args.workers,
+                only_segments=(
+                    cp.remaining_segments()
+                    if args.only_segments is None
+                    else args.only_segments
+                ),
+                start_keys=cp.start_keys(),
+                governor=governor,
+                metrics=metrics,
+                backend=args.scan_backend,
+                extra_attrs=(TREND_ATTRS if cube is not None else ())
+                + (DEDUP_ATTRS if dedup is not None else ()),
+            )
+        for page in metrics.pages(pages):
+            dup_of = [None] * len(page.items)
+            if dedup is not None:
+                with metrics.stage("dedup", items=len(page.items)):
+                    dup_of = dedup.check(page.items)
+            # duplicates get no rows (with --incremental, rows they had are deleted)
+            # and don't count towards co-occurrence or trends
+            with metrics.stage("build_puts", items=len(page.items)):
+                built = [
+                    (j, build_puts(j) if dup is None else [], dup is None)
+                    for j, dup in zip(page.items, dup_of)
+                ]
+            if cooc is not None:
+                with metrics.stage("cooccur", items=len(built)):
+                    for _, puts, keep in built:
+                        if keep:
+                            cooc.add(p["PutRequest"]["Item"]["PK"] for p in puts)
+            if cube is not None:
+                with metrics.stage("trends", items=len(page.items)):
+                    for j, _, keep in built:
+                        if keep:
+                            cube.add(j)
+            with metrics.stage("enqueue", items=len(built)):
+                for j, puts, _ in built:
+                    scanned += 1
+                    if delta:
+                        delta.apply(job_id_of(j), puts, writer)
+                    else:
+                        batch_write(puts, writer)
+            cp.page_done(page.segment, page.last_key)
+            pages_since += 1
+            # checkpoint on page boundaries so it never covers half a page
+            if (
+                ops() - committed_ops >= CHECKPOINT_PUTS
+                or pages_since >= CHECKPOINT_PAGES
+            ):
+                commit()
+                if scanned - reported >= 2000:
+                    reported = scanned
                     print(f"… scanned {scanned}, wrote {written}")
-        if buf:
-            written += batch_write(buf)
+        commit()
+        if delta:
+            if cp.resumed or args.only_segments:
+                # jobs handled before the resume / outside the segments look unseen
+                print("  skipping orphan cleanup (needs a full, uninterrupted run)")
+            elif cp.complete:
+                with metrics.stage("delete_orphans"):
+                    removed = delta.delete_orphans(writer)
+                print(f"  deleting {removed} rows of removed jobs")
+                commit()
+        writer.close()
+        if cooc is not None:
+            if cp.complete:
+                techs = write_top_k(
+                    cooc, args.cooccurrence, args.cooccurrence_top, index=INDEX_TABLE
+                )
+                print(f"  co-occurrence: {cooc.summary()} → {args.cooccurrence} ({techs} techs)")
+            else:
+                print("  co-occurrence not written: scan incomplete (rerun with --resume)")
+        if cube is not None and args.trends:
+            if cp.complete:
+                with metrics.stage("trends_write"):
+                    rows, totals = write_rows(
+                        cube, args.trends, args.write_workers, thresholds_from_args(args)
+                    )
+                print(f"  trends: {cube.summary()} → {args.trends} ({rows} rows, {totals} totals)")
+            else:
+                print("  trends not written: scan incomplete (rerun with --resume)")
+        if cube is not None and args.trends_state:
+            cube.save(args.trends_state, cube.seq)
+            print(f"  trend cube saved → {args.trends_state}")
+        if cp.complete:
+            cp.finish()
+            clear_state(state_path(args.checkpoint))
+            clear_state(cube_state_path(args.checkpoint))
         print(f"✓ Done. scanned={scanned}, wrote={written}")
+        if delta:
+            print(f"  delta: {delta.summary()}")
+        if dedup is not None:
+            print(f"  dedup: {dedup.summary()}")
+        print(f"  writer: {writer.stats.summary()}")
+        print(f"  capacity: {governor.summary()}")
+        print(f"  term map: {default_term_map().summary()}")
+        print(f"  stages: {metrics.summary()}")
+    except KeyboardInterrupt:
+        print(f"\n✗ Interrupted. Checkpoint: {args.checkpoint} (rerun with --resume)", file=sys.stderr)
+        sys.exit(130)
+    except SegmentScanError as e:
+        commit()
+        print(f"✗ {e}. scanned={scanned}, wrote={written}", file=sys.stderr)
+        print("  rerun with --resume to scan only the unfinished segments", file=sys.stderr)
+        sys.exit(1)
     except Exception as e:
         print(f"✗ Error: {e}", file=sys.stderr)
+        print(f"  checkpoint: {args.checkpoint} (rerun with --resume)", file=sys.stderr)
         sys.exit(1)
+    finally:
+        metrics.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,364 @@
+cat > lifecycle.py << "EOF"
+#!/usr/bin/env python3
+"""
+Posting status lifecycle: Active until processed_date is MAX_AGE_DAYS old,
+then Expired. Transitions are small conditional UpdateItem calls, sent in
+parallel, and carried into the job-tech-index rows (SK status#processed#jobId).
+
+    engine = LifecycleEngine(jobs, workers=16, indexes=[(v2_writer, slug_puts)])
+    engine.run_daily()            # Active postings whose day crossed the cutoff
+    engine.reconcile(items)       # any postings, e.g. a scan (statusadd.py --full)
+
+The daily run reads the jobs table's status-processed_date-index GSI (the
+one get-job-postings-paginated pages through; STATUS_INDEX), one Query per
+processed day: status = Active AND begins_with(processed_date, day), from
+the day before the last run's cutoff (kept in STATE_PATH) up to today's
+cutoff day, days queried concurrently. Its cost follows the postings that
+expire, not the table size. Postings without a status or with a
+non-string processed_date are not in the GSI; reconcile() covers them.
+
+Each update sets only `status`, on condition that status and
+processed_date still hold the values read, so a posting re-processed or
+changed since is left alone (counted as skipped) and a rerun is harmless.
+DynamoDB still charges an UpdateItem by the item's size; what shrinks is
+the number of items touched and the bytes sent.
+
+The daily run flushes the index writers itself and records the new cutoff
+only when no update failed and every index row landed; otherwise it
+raises and the next run queries the same days again.
+
+The rule is status_for(); normalize.py uses it for postings without a
+status.
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from capacity import CapacityGovernor, is_throttle
+from checkpoint import CHECKPOINT_DIR, atomic_write_json, read_json
+from dates import parse_datetime
+from ddbwriter import DEFAULT_WORKERS, low_level_client
+
+ACTIVE, EXPIRED = "Active", "Expired"
+MAX_AGE_DAYS = 30
+LOOKBACK_DAYS = 7  # days queried on a first daily run (no state yet)
+STATUS_INDEX = os.environ.get("STATUS_INDEX", "status-processed_date-index")
+STATE_PATH = os.path.join(CHECKPOINT_DIR, "lifecycle.state.json")
+KEY = "jobId"
+# what the index rows are built from (jtindex.build_puts)
+ATTRS = ("jobId", "id", "PK", "status", "processed_date", "technologies")
+MAX_RETRIES = 8
+# what _update() made of a transition
+APPLIED, SKIPPED, FAILED = "applied", "skipped", "failed"
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def status_for(
+    processed: Optional[datetime],
+    now: Optional[datetime] = None,
+    max_age_days: int = MAX_AGE_DAYS,
+) -> Optional[str]:
+    """Active/Expired for a parsed processed_date; None when it is unknown."""
+    if processed is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    return ACTIVE if now - processed <= timedelta(days=max_age_days) else EXPIRED
+
+
+Transition = Tuple[Dict[str, Any], str]  # (posting as read, new status)
+# (BatchWriter on a job-tech-index table, posting -> its PutRequests)
+Index = Tuple[Any, Callable[[Dict[str, Any]], List[Dict[str, Any]]]]
+
+
+class LifecycleEngine:
+    def __init__(
+        self,
+        table,
+        max_age_days: int = MAX_AGE_DAYS,
+        workers: int = DEFAULT_WORKERS,
+        indexes: Sequence[Index] = (),
+        governor: Optional[CapacityGovernor] = None,
+        metrics=None,
+        now: Optional[datetime] = None,
+        dry_run: bool = False,
+    ):
+        """
+        table         boto3 Table of the postings (key jobId)
+        indexes       (writer, build_rows) per job-tech-index table, e.g.
+                      (v2 writer, indexrows.slug_puts); each writer gets the
+                      rows' delete + put for every posting whose status changed
+        governor      optional RCU/WCU buckets (capacity.py)
+        metrics       optional Metrics (metrics.py): query_call, update_call
+        dry_run       count the transitions, change nothing
+        """
+        self.table_name = table.name
+        self.client = low_level_client(table)  # thread-safe, shared
+        self.max_age_days = max_age_days
+        self.workers = max(1, workers)
+        self.indexes = list(indexes)
+        self.governor = governor
+        self.metrics = metrics
+        self.now = now or datetime.now(timezone.utc)
+        self.dry_run = dry_run
+        self.counters = dict.fromkeys(
+            ("read", "expired", "activated", "skipped", "failed", "index_rows"), 0
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def index_writers(self) -> List[Any]:
+        return [writer for writer, _ in self.indexes]
+
+    def flush_indexes(self) -> None:
+        """Wait for the queued index rows; raises BatchWriteError on failures."""
+        for writer in self.index_writers:
+            writer.flush()
+
+    @property
+    def cutoff(self) -> datetime:
+        return self.now - timedelta(days=self.max_age_days)
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def _call(self, method: str, **kwargs) -> Dict[str, Any]:
+        """One client call with governor accounting and throttle retries."""
+        gov = self.governor
+        read = method == "query"
+        for attempt in range(MAX_RETRIES + 1):
+            if gov:
+                (gov.before_read if read else gov.before_write)()
+                kwargs["ReturnConsumedCapacity"] = "TOTAL"
+            t0 = time.perf_counter()
+            try:
+                resp = getattr(self.client, method)(**kwargs)
+            except Exception as e:
+                if not is_throttle(e) or attempt == MAX_RETRIES:
+                    raise
+                if gov:
+                    (gov.read if read else gov.write).throttled()
+                time.sleep(min(10.0, 0.05 * 2**attempt) * random.uniform(0.5, 1.0))
+                continue
+            if self.metrics:
+                self.metrics.observe(f"{method}_call", time.perf_counter() - t0)
+            if gov:
+                (gov.after_read if read else gov.after_write)(resp)
+            return resp
+
+    # ---------- daily ----------
+    def query_day(self, day: str) -> List[Dict[str, Any]]:
+        """Active postings whose processed_date starts with `day` (YYYY-MM-DD)."""
+        kwargs = {
+            "TableName": self.table_name,
+            "IndexName": STATUS_INDEX,
+            # ATTRS[3] is status, ATTRS[4] processed_date
+            "KeyConditionExpression": "#a3 = :active AND begins_with(#a4, :day)",
+            "ProjectionExpression": ", ".join(f"#a{i}" for i in range(len(ATTRS))),
+            "ExpressionAttributeNames": {f"#a{i}": a for i, a in enumerate(ATTRS)},
+            "ExpressionAttributeValues": {":active": {"S": ACTIVE}, ":day": {"S": day}},
+        }
+        items = []
+        while True:
+            resp = self._call("query", **kwargs)
+            items += [
+                {k: _deserializer.deserialize(v) for k, v in it.items()}
+                for it in resp.get("Items", [])
+            ]
+            if not resp.get("LastEvaluatedKey"):
+                return items
+            kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    def due_days(
+        self, state_path: str = STATE_PATH, lookback_days: int = LOOKBACK_DAYS
+    ) -> List[str]:
+        """Processed days that can hold postings which crossed the cutoff since then."""
+        end = self.cutoff.date()
+        last = None
+        if os.path.exists(state_path):
+            last = read_json(state_path).get("cutoff_day")
+        if last:
+            # one day of overlap: a non-UTC offset can put a posting's string
+            # day before its UTC day
+            start = date.fromisoformat(last) - timedelta(days=1)
+        else:
+            start = end - timedelta(days=lookback_days)
+        days = (end - start).days + 1
+        return [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+    def run_daily(
+        self, state_path: str = STATE_PATH, lookback_days: int = LOOKBACK_DAYS
+    ) -> int:
+        """
+        Expire the postings that crossed the cutoff; returns the updates applied.
+        Raises, leaving state_path as it was, when an update or index write failed.
+        """
+        days = self.due_days(state_path, lookback_days)
+        cutoff = self.cutoff
+        print(f"Expiring Active postings processed before {cutoff.isoformat()}")
+        print(f"  day buckets: {days[0]} .. {days[-1]} ({len(days)} queries)")
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(days))) as pool:
+            buckets = list(pool.map(self.query_day, days))
+        due = []
+        for items in buckets:
+            self._count("read", len(items))
+            for it in items:
+                processed = parse_datetime(it.get("processed_date"))
+                if status_for(processed, self.now, self.max_age_days) == EXPIRED:
+                    due.append((it, EXPIRED))
+        outcomes = self.update(due)
+        if self.dry_run:
+            return outcomes.count(APPLIED)
+        self.flush_indexes()
+        failed = outcomes.count(FAILED)
+        if failed:
+            raise RuntimeError(f"{failed} of {len(due)} status updates failed")
+        atomic_write_json(
+            state_path,
+            {"cutoff_day": cutoff.date().isoformat(), "cutoff": cutoff.isoformat()},
+        )
+        return outcomes.count(APPLIED)
+
+    # ---------- any postings ----------
+    def wanted(self, it: Dict[str, Any]) -> str:
+        """The status `it` should have now."""
+        processed = parse_datetime(it.get("processed_date"))
+        wanted = status_for(processed, self.now, self.max_age_days)
+        return wanted or it.get("status") or ACTIVE  # no date: keep it, default Active
+
+    def transitions(self, items: Iterable[Dict[str, Any]]) -> Iterator[Transition]:
+        """The postings whose status differs from status_for() (or is missing)."""
+        for it in items:
+            self._count("read")
+            wanted = self.wanted(it)
+            if wanted != it.get("status"):
+                yield it, wanted
+
+    def reconcile(self, items: Iterable[Dict[str, Any]]) -> int:
+        return self.apply(list(self.transitions(items)))
+
+    # ---------- updates ----------
+    def apply(self, transitions: List[Transition]) -> int:
+        """Conditional status updates, `workers` at a time; returns the ones applied."""
+        return self.update(transitions).count(APPLIED)
+
+    def update(self, transitions: List[Transition]) -> List[str]:
+        """Like apply(), but returns APPLIED / SKIPPED / FAILED per transition."""
+        if not transitions:
+            return []
+        if self.dry_run:
+            for it, status in transitions:
+                self._count("expired" if status == EXPIRED else "activated")
+            return [APPLIED] * len(transitions)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            outcomes = list(pool.map(self._update, transitions))
+        for (it, status), outcome in zip(transitions, outcomes):
+            if outcome == APPLIED:
+                self._reindex(it, status)
+        return outcomes
+
+    def _update(self, transition: Transition) -> str:
+        it, status = transition
+        names = {"#st": "status", "#pd": "processed_date"}
+        values = {":new": {"S": status}}
+        conds = []
+        for alias, attr in (("#st", "status"), ("#pd", "processed_date")):
+            if it.get(attr) is None:
+                conds.append(f"attribute_not_exists({alias})")
+            else:
+                conds.append(f"{alias} = :was{alias[1:]}")
+                values[f":was{alias[1:]}"] = _serializer.serialize(it[attr])
+        try:
+            self._call(
+                "update_item",
+                TableName=self.table_name,
+                Key={KEY: _serializer.serialize(it[KEY])},
+                UpdateExpression="SET #st = :new",
+                ConditionExpression=" AND ".join(conds),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+            )
+        except Exception as e:
+            code = (getattr(e, "response", None) or {}).get("Error", {}).get("Code")
+            if code == "ConditionalCheckFailedException":
+                self._count("skipped")
+                return SKIPPED
+            self._count("failed")
+            print(f"✗ status update failed for {it.get(KEY)}: {e}")
+            return FAILED
+        self._count("expired" if status == EXPIRED else "activated")
+        return APPLIED
+
+    def _reindex(self, it: Dict[str, Any], status: str) -> None:
+        moved = {**it, "status": status}
+        for writer, build_rows in self.indexes:
+            old = [p["PutRequest"]["Item"] for p in build_rows(it)]
+            new = [p["PutRequest"]["Item"] for p in build_rows(moved)]
+            keep = {(r["PK"], r["SK"]) for r in new}
+            for r in old:
+                if (r["PK"], r["SK"]) not in keep:
+                    writer.delete(r)
+            for r in new:
+                writer.put(r)
+            self._count("index_rows", len(old) + len(new))
+
+    def summary(self) -> str:
+        c = self.counters
+        verb = "would change" if self.dry_run else "changed"
+        return (
+            f"read={c['read']} {verb}: expired={c['expired']} "
+            f"activated={c['activated']} skipped={c['skipped']} failed={c['failed']} "
+            f"index_rows={c['index_rows']}"
+        )
+
+
+def add_lifecycle_args(parser):
+    parser.add_argument(
+        "--max-age-days",
+        type=int,
+        default=MAX_AGE_DAYS,
+        help="days after processed_date a posting stays Active (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--lookback-days",
+        type=int,
+        default=LOOKBACK_DAYS,
+        help="days before the cutoff a first daily run queries (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--state",
+        default=STATE_PATH,
+        help="where the daily run keeps its last cutoff (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="don't carry status changes into the job-tech-index rows",
+    )
+    parser.add_argument(
+        "--update-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="concurrent UpdateItem / Query calls (default: %(default)s)",
+    )
+    return parser
+EOF
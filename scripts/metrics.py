@@ -0,0 +1,348 @@
+cat > metrics.py << "EOF"
+#!/usr/bin/env python3
+"""
+Stage-level instrumentation for the backfill scripts.
+
+    metrics = metrics_from_args(args, "jtindex-v2")
+    metrics.watch(governor=governor, writer=writer)
+    for page in metrics.pages(scan_pages(...)):       # "scan_wait" stage
+        with metrics.stage("build_puts", items=len(page.items)):
+            ...
+    metrics.close()
+
+Each stage accumulates calls, wall seconds and items, so the split between
+waiting on the scan (scan_wait), CPU in the script (normalize, build_puts)
+and waiting on writes (enqueue, flush) shows where a run spends its time.
+scan_pages and BatchWriter take the same object (metrics=) and add per-call
+latency (scan_call, write_call.<table>), scan retries and queue depths.
+Consumed RCU/WCU, capacity waits and throttles come from the watched
+CapacityGovernor, write retries and throttles from the watched writers'
+WriterStats.
+
+--metrics PATH writes a snapshot every --metrics-interval seconds and at the
+end: a Prometheus textfile (node_exporter textfile collector) when PATH ends
+in .prom, JSON lines otherwise. --profile-pages F runs cProfile over the
+consumer's work for a random fraction F of pages and writes the combined
+stats to --profile-out (view with `python3 -m pstats`).
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+METRICS_INTERVAL = 10.0  # seconds between snapshots
+PROFILE_TOP = 15  # functions shown in the closing profile summary
+PREFIX = "backfill"
+
+
+class StageStats:
+    __slots__ = ("calls", "seconds", "items")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.items = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "seconds": round(self.seconds, 6),
+            "items": self.items,
+            "items_per_s": round(self.items / self.seconds, 1) if self.seconds else None,
+        }
+
+
+class Metrics:
+    """Thread-safe stage timers, counters and gauges; path=None keeps them in memory."""
+
+    def __init__(
+        self,
+        job: str,
+        path: Optional[str] = None,
+        interval: float = METRICS_INTERVAL,
+        profile_rate: float = 0.0,
+        profile_out: Optional[str] = None,
+    ):
+        self.job = job
+        self.path = path
+        self.interval = interval
+        self.started = time.monotonic()
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.gauge_max: Dict[str, float] = {}
+        self.governor = None
+        self.writers: Dict[str, Any] = {}
+        self.profile_rate = profile_rate
+        self.profile_out = profile_out or f"{job.replace('@', '-')}.prof"
+        self.profiled_pages = 0
+        self._profile: Optional[pstats.Stats] = None  # filled on the first sample
+        self._last_emit = self.started
+        self._lock = threading.Lock()
+        self._emit_lock = threading.Lock()  # one snapshot write at a time
+
+    # --- recording --------------------------------------------------------
+    def observe(self, stage: str, seconds: float, items: int = 0) -> None:
+        with self._lock:
+            s = self.stages.get(stage)
+            if s is None:
+                s = self.stages[stage] = StageStats()
+            s.calls += 1
+            s.seconds += seconds
+            s.items += items
+
+    @contextlib.contextmanager
+    def stage(self, name: str, items: int = 0):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, items)
+            self.maybe_emit()
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self.gauges[name] = value
+            if name not in self.gauge_max or value > self.gauge_max[name]:
+                self.gauge_max[name] = value
+
+    def watch(self, governor=None, writer=None, name: Optional[str] = None) -> None:
+        """Include a CapacityGovernor / BatchWriter's stats in every snapshot."""
+        if governor is not None:
+            self.governor = governor
+        if writer is not None:
+            self.writers[name or writer.table_name] = writer
+
+    def pages(self, pages: Iterable) -> Iterator:
+        """
+        Pass scan pages through, timing the wait for each one (scan_wait) and
+        profiling the caller's work on a sampled subset of them.
+        """
+        it = iter(pages)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                page = next(it)
+            except StopIteration:
+                return
+            self.observe("scan_wait", time.perf_counter() - t0, len(page.items))
+            self.count("pages")
+            if self.profile_rate and random.random() < self.profile_rate:
+                prof = cProfile.Profile()
+                prof.enable()
+                try:
+                    yield page
+                finally:
+                    prof.disable()
+                    self._add_profile(prof)
+            else:
+                yield page
+            self.maybe_emit()
+
+    def _add_profile(self, prof: cProfile.Profile) -> None:
+        self.profiled_pages += 1
+        if self._profile is None:
+            self._profile = pstats.Stats(prof)
+        else:
+            self._profile.add(prof)
+
+    # --- snapshots --------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            snap = {
+                "job": self.job,
+                "time": time.time(),
+                "elapsed_s": round(time.monotonic() - self.started, 3),
+                "stages": {k: s.as_dict() for k, s in self.stages.items()},
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "gauges_max": dict(self.gauge_max),
+            }
+        snap["writers"] = {name: w.stats.as_dict() for name, w in self.writers.items()}
+        gov = self.governor
+        if gov is not None:
+            snap["capacity"] = {
+                b.name: {
+                    "consumed": round(b.consumed, 3),
+                    "waited_s": round(b.waited, 3),
+                    "throttles": b.throttles,
+                    "rate": b.rate,
+                    "limit": b.target,
+                }
+                for b in (gov.read, gov.write)
+            }
+        return snap
+
+    def _due(self) -> bool:
+        return time.monotonic() - self._last_emit >= self.interval
+
+    def maybe_emit(self) -> None:
+        """Emit when the interval is up; stage() calls this from any thread."""
+        if not (self.path and self._due()):
+            return
+        with self._emit_lock:
+            if self._due():  # another thread may have just emitted
+                self._emit()
+
+    def emit(self) -> None:
+        if not self.path:
+            return
+        with self._emit_lock:
+            self._emit()
+
+    def _emit(self) -> None:
+        self._last_emit = time.monotonic()
+        snap = self.snapshot()
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        if self.path.endswith(".prom"):
+            # the textfile collector must never see a half-written file; the
+            # tmp name is per process in case two runs share the path
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(prometheus_text(snap))
+            os.replace(tmp, self.path)
+        else:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(snap, sort_keys=True) + "\n")
+
+    def summary(self) -> str:
+        total = time.monotonic() - self.started
+        parts, calls = [], []
+        for name, s in sorted(self.stages.items(), key=lambda kv: -kv[1].seconds):
+            if "_call" in name:
+                # summed over reader/writer threads, so no share of the run
+                calls.append(f"{name}={s.seconds:.1f}s/{s.calls} calls")
+            else:
+                share = s.seconds / total * 100 if total else 0.0
+                parts.append(f"{name}={s.seconds:.1f}s ({share:.0f}%)")
+        return ", ".join(parts + calls) or "-"
+
+    def close(self) -> None:
+        """Final snapshot + profile dump; safe to call more than once."""
+        self.emit()
+        if self._profile is not None:
+            self._profile.dump_stats(self.profile_out)
+            out = io.StringIO()
+            self._profile.stream = out
+            self._profile.sort_stats("cumulative").print_stats(PROFILE_TOP)
+            print(f"  profile: {self.profiled_pages} pages → {self.profile_out}")
+            print(out.getvalue())
+            self._profile = None
+
+
+def _labels(**labels) -> str:
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    inner = ",".join(f'{k}="{esc(v)}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def prometheus_text(snap: Dict[str, Any]) -> str:
+    """Prometheus text exposition format for one snapshot."""
+    job = snap["job"]
+    lines = []
+
+    def metric(name, kind, help_, samples):
+        lines.append(f"# HELP {PREFIX}_{name} {help_}")
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"{PREFIX}_{name}{_labels(job=job, **labels)} {value}")
+
+    for field, kind, help_ in (
+        ("seconds", "counter", "Wall time spent in a stage"),
+        ("items", "counter", "Items handled by a stage"),
+        ("calls", "counter", "Times a stage ran"),
+    ):
+        samples = [({"stage": k}, s[field]) for k, s in snap["stages"].items()]
+        metric(f"stage_{field}_total", kind, help_, samples)
+    metric(
+        "events_total",
+        "counter",
+        "Counted events (pages, retries, ...)",
+        [({"name": k}, v) for k, v in snap["counters"].items()],
+    )
+    metric(
+        "gauge",
+        "gauge",
+        "Last sampled value (queue depths, ...)",
+        [({"name": k}, v) for k, v in snap["gauges"].items()],
+    )
+    metric(
+        "gauge_max",
+        "gauge",
+        "Highest sampled value",
+        [({"name": k}, v) for k, v in snap["gauges_max"].items()],
+    )
+    metric(
+        "writer",
+        "gauge",
+        "BatchWriter stats (cumulative counts, rates)",
+        [
+            ({"table": t, "field": f}, v)
+            for t, stats in snap["writers"].items()
+            for f, v in stats.items()
+        ],
+    )
+    cap = snap.get("capacity", {})
+    for name, field, kind, help_ in (
+        ("capacity_consumed_units_total", "consumed", "counter", "Consumed capacity units"),
+        ("capacity_waited_seconds_total", "waited_s", "counter", "Time spent waiting for tokens"),
+        ("capacity_throttles_total", "throttles", "counter", "Throttle signals"),
+        ("capacity_rate", "rate", "gauge", "Current token rate (units/s)"),
+    ):
+        metric(name, kind, help_, [({"unit": u}, c[field]) for u, c in cap.items()])
+    metric("elapsed_seconds", "gauge", "Run time so far", [({}, snap["elapsed_s"])])
+    return "\n".join(lines) + "\n"
+
+
+def add_metrics_args(parser):
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        help="write stage metrics here: PATH.prom = Prometheus textfile, else JSON lines",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=METRICS_INTERVAL,
+        help="seconds between metric snapshots (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile-pages",
+        type=float,
+        default=0.0,
+        metavar="FRACTION",
+        help="cProfile the processing of this random fraction of pages (e.g. 0.01)",
+    )
+    parser.add_argument(
+        "--profile-out",
+        default=None,
+        help="where to write the combined profile (default: <job>.prof)",
+    )
+    return parser
+
+
+def metrics_from_args(args, job: str) -> Metrics:
+    return Metrics(
+        job,
+        path=args.metrics,
+        interval=args.metrics_interval,
+        profile_rate=args.profile_pages,
+        profile_out=args.profile_out,
+    )
+EOF
@@ -0,0 +1,251 @@
+cat > momentum.py << "EOF"
+#!/usr/bin/env python3
+"""
+Period-over-period momentum for skill-trends-v2 rows, computed in bulk.
+
+    thresholds = Thresholds(rising=0.2, falling=-0.2)
+    result = compute(series, periods, counts, thresholds=thresholds)
+    result.change_pct      # aligned with the input, NaN without a previous period
+    result.signal          # codes into SIGNALS, -1 = no signal
+
+Every (skill, region#seniority#work_mode) series becomes one row of a dense
+float64 matrix whose columns are the consecutive periods (ISO weeks or
+days) from the earliest to the latest seen; a period with no postings is
+0, so "previous" means the calendar-previous period, as previousPeriod()
+in aggregate-skill-trends-v2 does. Deltas, the smoothed growth and the
+signal codes are whole-matrix NumPy expressions, then gathered back to the
+input order. Only series actually seen get a row, so the matrix stays
+(series × periods), never (techs × every combination × periods).
+
+Fields set on rows (SkillTrendV2Item, packages/shared-types/src/trendsv2.ts):
+    job_count_change_pct        (count - previous) / previous
+    median_salary_change_pct    same over salary_median, when both have one
+    job_count_smoothed_change_pct
+                                mean count over the last `window` periods vs
+                                the `window` before them
+    trend_signal                rising / falling / steady from change_pct
+                                (or the smoothed change, signal_on="smoothed")
+
+The lambda's rules are the defaults: ±20% and any previous count > 0.
+trendcube.py applies this before writing rows; run this file directly to
+annotate rows already written as JSON lines. Requires numpy.
+"""
+
+import json
+import os
+from datetime import date
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from sparsecount import _np
+
+SIGNALS = ("steady", "rising", "falling")
+NO_SIGNAL = -1
+
+
+class Thresholds(NamedTuple):
+    rising: float = 0.2  # change_pct >= this → rising
+    falling: float = -0.2  # change_pct <= this → falling
+    min_base: float = 1  # previous count (or window mean) needed for a signal
+    window: int = 4  # periods per side of the smoothed comparison
+    signal_on: str = "change"  # "change" or "smoothed"
+
+
+class Momentum(NamedTuple):
+    change_pct: Any  # float64 arrays, NaN where undefined
+    smoothed_change_pct: Any
+    salary_change_pct: Optional[Any]
+    signal: Any  # int8 codes into SIGNALS, NO_SIGNAL where undefined
+
+    def fields(self, i: int) -> Dict[str, Any]:
+        """The row attributes for input position i (undefined ones omitted)."""
+        out = {}
+        for name, arr in (
+            ("job_count_change_pct", self.change_pct),
+            ("job_count_smoothed_change_pct", self.smoothed_change_pct),
+            ("median_salary_change_pct", self.salary_change_pct),
+        ):
+            if arr is not None and arr[i] == arr[i]:  # not NaN
+                out[name] = float(arr[i])
+        if self.signal[i] != NO_SIGNAL:
+            out["trend_signal"] = SIGNALS[self.signal[i]]
+        return out
+
+
+# ---------- periods ----------
+def period_ordinal(period: str) -> int:
+    """Consecutive ints for "YYYY-Www" (weeks) and "YYYY-MM-DD" (days)."""
+    if "-W" in period:
+        year, week = period.split("-W")
+        return date.fromisocalendar(int(year), int(week), 1).toordinal() // 7
+    return date.fromisoformat(period).toordinal()
+
+
+# ---------- computation ----------
+def _pct(np, cur, prev):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prev > 0, (cur - prev) / prev, np.nan)
+
+
+def compute(
+    series: Sequence[int],
+    periods: Sequence[int],
+    counts: Sequence[float],
+    salary_median: Optional[Sequence[float]] = None,
+    thresholds: Thresholds = Thresholds(),
+) -> Momentum:
+    """
+    series         int id of each input's (skill, region#seniority#mode) series
+    periods        period_ordinal() of each input
+    counts         job_count of each input
+    salary_median  optional, NaN where unknown
+    Inputs must be unique per (series, period). Results are aligned with them.
+    """
+    np = _np()
+    series = np.asarray(series, dtype=np.int64)
+    periods = np.asarray(periods, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.float64)
+    n = len(counts)
+    if not n:
+        empty = np.zeros(0)
+        return Momentum(empty, empty, None, np.zeros(0, dtype=np.int8))
+
+    _, s = np.unique(series, return_inverse=True)
+    p = periods - periods.min()
+    shape = (int(s.max()) + 1, int(p.max()) + 1)
+    t = thresholds
+
+    dense = np.zeros(shape)
+    dense[s, p] = counts
+    prev = np.zeros(shape)
+    prev[:, 1:] = dense[:, :-1]
+    change = _pct(np, dense, prev)[s, p]
+
+    # trailing means over `window` periods, via a cumulative sum along the rows
+    w = max(1, t.window)
+    csum = np.zeros((shape[0], shape[1] + 1))
+    np.cumsum(dense, axis=1, out=csum[:, 1:])
+    recent = (csum[:, w:] - csum[:, :-w]) / w  # recent[:, j] = mean of periods j..j+w-1
+    trailing = np.zeros(shape)
+    trailing[:, w - 1 :] = recent
+    before = np.zeros(shape)
+    before[:, w:] = trailing[:, :-w]
+    smoothed = _pct(np, trailing, before)[s, p]
+
+    salary_change = None
+    if salary_median is not None:
+        med = np.full(shape, np.nan)
+        med[s, p] = np.asarray(salary_median, dtype=np.float64)
+        prev_med = np.full(shape, np.nan)
+        prev_med[:, 1:] = med[:, :-1]
+        salary_change = _pct(np, med, prev_med)[s, p]
+
+    if t.signal_on == "smoothed":
+        basis, base = smoothed, before[s, p]
+    else:
+        basis, base = change, prev[s, p]
+    signal = np.where(basis >= t.rising, 1, np.where(basis <= t.falling, 2, 0))
+    signal = signal.astype(np.int8)
+    signal[np.isnan(basis) | (base < t.min_base)] = NO_SIGNAL
+    return Momentum(change, smoothed, salary_change, signal)
+
+
+def annotate(
+    rows: List[Dict[str, Any]], thresholds: Thresholds = Thresholds()
+) -> List[Dict[str, Any]]:
+    """Set the momentum fields on SkillTrendV2Item dicts in place (and return them)."""
+    np = _np()
+    if not rows:
+        return rows
+    keys = [
+        f"{r['skill_canonical']}|{r['region_seniority_mode_period'].rsplit('#', 1)[0]}"
+        for r in rows
+    ]
+    _, series = np.unique(np.array(keys, dtype=object), return_inverse=True)
+    ordinals = {p: period_ordinal(p) for p in {r["period"] for r in rows}}
+    periods = [ordinals[r["period"]] for r in rows]
+    medians = None
+    if any("salary_median" in r for r in rows):
+        medians = [float(r.get("salary_median", "nan")) for r in rows]
+    result = compute(
+        series, periods, [float(r["job_count"]) for r in rows], medians, thresholds
+    )
+    for i, r in enumerate(rows):
+        for k in (
+            "job_count_change_pct",
+            "job_count_smoothed_change_pct",
+            "median_salary_change_pct",
+            "trend_signal",
+        ):
+            r.pop(k, None)
+        r.update(result.fields(i))
+    return rows
+
+
+def add_momentum_args(parser):
+    d = Thresholds()
+    parser.add_argument(
+        "--rising-threshold",
+        type=float,
+        default=d.rising,
+        help="change at or above this is 'rising' (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--falling-threshold",
+        type=float,
+        default=d.falling,
+        help="change at or below this is 'falling' (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-base",
+        type=float,
+        default=d.min_base,
+        help="previous-period postings needed for a signal (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--momentum-window",
+        type=int,
+        default=d.window,
+        help="periods averaged on each side of the smoothed change (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--signal-on",
+        choices=("change", "smoothed"),
+        default=d.signal_on,
+        help="classify trend_signal from the period-over-period or the smoothed change",
+    )
+    return parser
+
+
+def thresholds_from_args(args) -> Thresholds:
+    return Thresholds(
+        rising=args.rising_threshold,
+        falling=args.falling_threshold,
+        min_base=args.min_base,
+        window=args.momentum_window,
+        signal_on=args.signal_on,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    ap = argparse.ArgumentParser(
+        description="Add momentum fields to skill-trends-v2 rows written as JSON lines"
+    )
+    ap.add_argument("rows", help="JSON lines from jtindex --trends PATH")
+    ap.add_argument("--out", default=None, help="write here instead of rewriting ROWS")
+    args = add_momentum_args(ap).parse_args()
+    with open(args.rows) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    t0 = time.perf_counter()
+    annotate(rows, thresholds_from_args(args))
+    dt = time.perf_counter() - t0
+    out = args.out or args.rows
+    with open(f"{out}.tmp", "w") as f:
+        for r in rows:
+            f.write(json.dumps(r, sort_keys=True) + "\n")
+    os.replace(f"{out}.tmp", out)
+    signals = {s: sum(r.get("trend_signal") == s for r in rows) for s in SIGNALS}
+    print(f"✓ {len(rows)} rows in {dt:.2f}s → {out} {signals}")
+EOF
@@ -0,0 +1,209 @@
+cat > postings.py << "EOF"
+#!/usr/bin/env python3
+"""
+Lean posting records for migrate_postings (normalize.py): the attributes
+each mode reads, and nothing else.
+
+    scan_pages(table, **projection(attrs_for(write=True)))
+    posting = Posting(item)                  # __slots__, mapping-like
+    posting.get("technologies"); "status" in posting; posting["Id"] = ...
+    loader = AttributeLoader(table, DESCRIPTION_ATTRS)
+    loader.fill(postings)                    # BatchGetItem for what's missing
+
+COUNT_ATTRS is what counting terms reads (a --dry-run), WRITE_ATTRS adds
+the fields build_normalized_item() shapes, DESCRIPTION_ATTRS the
+description variants, which are by far the largest attributes. Scans
+project just those, so the bytes read and decoded per item follow the
+mode, not the item; note that Scan is still charged RCU by full item size.
+
+Posting keeps one slot per known attribute (an unset slot is a missing
+attribute) instead of a dict of everything the table holds, and behaves
+like the dict the normalizers expect: get, in, [], setdefault, pop.
+Setting an attribute outside FIELDS is a KeyError, so a new field read
+by build_normalized_item() has to be added here, and with it to the
+projection.
+
+AttributeLoader fills attributes the source didn't carry (a projected
+snapshot has no descriptions) with BatchGetItem on the live table,
+projected to those attributes, for just the postings being written.
+"""
+
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from capacity import CapacityGovernor, is_throttle
+from ddbwriter import low_level_client
+
+KEY = "jobId"  # job-postings-enhanced partition key
+COUNT_ATTRS = ("jobId", "Id", "id", "normalized", "technologies", "skills")
+WRITE_ATTRS = COUNT_ATTRS + (
+    "job_title",
+    "title",
+    "jobTitle",
+    "position",
+    "company_name",
+    "company",
+    "employer",
+    "company_size",
+    "location",
+    "job_location",
+    "remote_status",
+    "remote",
+    "salary_mentioned",
+    "salary_range",
+    "seniority_level",
+    "status",
+    "processed_date",
+)
+DESCRIPTION_ATTRS = ("job_description", "description", "jobDescription", "details")
+FIELDS = tuple(dict.fromkeys(WRITE_ATTRS + DESCRIPTION_ATTRS))
+_FIELD_SET = frozenset(FIELDS)
+
+BATCH_GET_KEYS = 100  # BatchGetItem limit
+MAX_RETRIES = 8
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def attrs_for(write: bool, extra: Sequence[str] = ()) -> List[str]:
+    """The attributes one migrate_postings mode reads (extra: e.g. DEDUP_ATTRS)."""
+    base = WRITE_ATTRS + DESCRIPTION_ATTRS if write else COUNT_ATTRS
+    return list(dict.fromkeys(base + tuple(extra)))
+
+
+def projection(attrs: Sequence[str]) -> Dict[str, Any]:
+    """Scan/Query kwargs projecting `attrs` (aliased: some are reserved words)."""
+    names = {f"#a{i}": a for i, a in enumerate(attrs)}
+    return {"ProjectionExpression": ",".join(names), "ExpressionAttributeNames": names}
+
+
+class Posting:
+    __slots__ = FIELDS
+
+    def __init__(self, item: Optional[Dict[str, Any]] = None):
+        if item:
+            for k, v in item.items():
+                if k in _FIELD_SET:
+                    setattr(self, k, v)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _FIELD_SET and hasattr(self, key)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in _FIELD_SET else default
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _FIELD_SET:
+            raise KeyError(f"{key!r} is not a Posting field (postings.FIELDS)")
+        setattr(self, key, value)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key in self:
+            value = getattr(self, key)
+            delattr(self, key)
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def keys(self) -> List[str]:
+        return [k for k in FIELDS if hasattr(self, k)]
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self.keys()]
+
+    def __repr__(self) -> str:
+        return f"Posting({dict(self.items())!r})"
+
+
+class AttributeLoader:
+    def __init__(
+        self,
+        table,
+        attrs: Sequence[str],
+        governor: Optional[CapacityGovernor] = None,
+        metrics=None,
+    ):
+        self.table_name = table.name
+        self.client = low_level_client(table)
+        self.attrs = list(attrs)
+        self.governor = governor
+        self.metrics = metrics
+        self.fetched = 0
+        self.calls = 0
+
+    def fill(self, postings: Iterable[Posting]) -> None:
+        """Set self.attrs on the postings from the table (those it has)."""
+        by_key = {}
+        for p in postings:
+            if p.get(KEY) is not None:
+                by_key.setdefault(p[KEY], []).append(p)
+        keys = list(by_key)
+        for start in range(0, len(keys), BATCH_GET_KEYS):
+            for item in self._get(keys[start : start + BATCH_GET_KEYS]):
+                for p in by_key.get(item.get(KEY), ()):
+                    for a in self.attrs:
+                        if a in item:
+                            p[a] = item[a]
+                self.fetched += 1
+
+    def _get(self, keys: List[Any]) -> List[Dict[str, Any]]:
+        request = {
+            "Keys": [{KEY: _serializer.serialize(k)} for k in keys],
+            **projection([KEY] + [a for a in self.attrs if a != KEY]),
+        }
+        out, gov = [], self.governor
+        for attempt in range(MAX_RETRIES + 1):
+            kwargs = {"RequestItems": {self.table_name: request}}
+            if gov:
+                gov.before_read()
+                kwargs["ReturnConsumedCapacity"] = "TOTAL"
+            self.calls += 1
+            t0 = time.perf_counter()
+            try:
+                resp = self.client.batch_get_item(**kwargs)
+            except Exception as e:
+                if not is_throttle(e) or attempt == MAX_RETRIES:
+                    raise
+                if gov:
+                    gov.read.throttled()
+                resp = {"UnprocessedKeys": {self.table_name: request}}
+            else:
+                if self.metrics:
+                    dt = time.perf_counter() - t0
+                    self.metrics.observe("batch_get_call", dt, len(request["Keys"]))
+                if gov:
+                    gov.after_read(resp)
+                for item in resp.get("Responses", {}).get(self.table_name, []):
+                    out.append(
+                        {k: _deserializer.deserialize(v) for k, v in item.items()}
+                    )
+            left = resp.get("UnprocessedKeys", {}).get(self.table_name)
+            if not left:
+                return out
+            if attempt == MAX_RETRIES:
+                raise RuntimeError(f"{len(left['Keys'])} keys still unprocessed")
+            request = left
+            time.sleep(min(10.0, 0.05 * 2**attempt) * random.uniform(0.5, 1.0))
+        return out
+
+    def summary(self) -> str:
+        return f"fetched={self.fetched} calls={self.calls} attrs={','.join(self.attrs)}"
+EOF
@@ -0,0 +1,132 @@
+cat > rawitem.py << "EOF"
+#!/usr/bin/env python3
+"""
+Low-level client scan backend: items stay in DynamoDB's wire format and an
+attribute is decoded the first time it is read.
+
+    pages = scan_pages(table, backend="client", ...)   # ddbscan.py
+    j = page.items[0]                                 # RawItem, a Mapping
+    j.get("technologies"); "status" in j; dict(j)
+
+The boto3 resource layer runs every attribute of every item through
+TypeDeserializer before the scan call returns, whether the caller reads it
+or not. RawItem keeps the client's {"S": ...} maps and decodes on access;
+the common shapes skip TypeDeserializer altogether: plain strings (status,
+processed_date, titles), booleans, string sets and lists of strings
+(technologies, skills). Numbers, maps and mixed lists take the
+TypeDeserializer path, so values read back exactly as the resource layer
+would return them (Decimal, set, dict).
+
+RawItem is read-only; build_puts, normalize_and_collect, Posting(item) and
+the other consumers only read items. ClientTable is the Table stand-in that
+scan_pages uses: it speaks wire format to the client and keeps
+ExclusiveStartKey / LastEvaluatedKey in Python form, so checkpoints are the
+same for both backends.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from ddbwriter import low_level_client
+
+BACKENDS = ("resource", "client")
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def decode(value: Dict[str, Any]) -> Any:
+    """One wire-format attribute value -> what TypeDeserializer returns."""
+    s = value.get("S")
+    if s is not None:
+        return s
+    if "SS" in value:
+        return set(value["SS"])
+    if "L" in value:
+        out = []
+        for v in value["L"]:
+            s = v.get("S")
+            if s is None:
+                return _deserializer.deserialize(value)
+            out.append(s)
+        return out
+    if "BOOL" in value:
+        return value["BOOL"]
+    if "NULL" in value:
+        return None
+    return _deserializer.deserialize(value)
+
+
+def _encode(values: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {k: _serializer.serialize(v) for k, v in values.items()}
+
+
+class RawItem(Mapping):
+    __slots__ = ("_raw", "_decoded")
+
+    def __init__(self, raw: Dict[str, Dict[str, Any]]):
+        self._raw = raw
+        self._decoded: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        decoded = self._decoded
+        if key in decoded:
+            return decoded[key]
+        value = decoded[key] = decode(self._raw[key])
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        decoded = self._decoded
+        if key in decoded:
+            return decoded[key]
+        raw = self._raw.get(key)
+        if raw is None:
+            return default
+        value = decoded[key] = decode(raw)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._raw
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(k, self[k]) for k in self._raw]
+
+    @property
+    def raw(self) -> Dict[str, Dict[str, Any]]:
+        """The wire-format attribute map (e.g. to write the item back as is)."""
+        return self._raw
+
+    def __repr__(self) -> str:
+        return f"RawItem({dict(self)!r})"
+
+
+class ClientTable:
+    """The part of a boto3 Table that scan_pages calls, on the low-level client."""
+
+    def __init__(self, table):
+        self.name = table.name
+        self.client = low_level_client(table)  # thread-safe: shared by readers
+
+    def scan(self, **kwargs) -> Dict[str, Any]:
+        kwargs["TableName"] = self.name
+        if kwargs.get("ExclusiveStartKey"):
+            kwargs["ExclusiveStartKey"] = _encode(kwargs["ExclusiveStartKey"])
+        if kwargs.get("ExpressionAttributeValues"):
+            kwargs["ExpressionAttributeValues"] = _encode(
+                kwargs["ExpressionAttributeValues"]
+            )
+        resp = self.client.scan(**kwargs)
+        resp["Items"] = [RawItem(it) for it in resp.get("Items", ())]
+        if resp.get("LastEvaluatedKey"):
+            last = resp["LastEvaluatedKey"]
+            resp["LastEvaluatedKey"] = {k: decode(v) for k, v in last.items()}
+        return resp
+EOF
@@ -0,0 +1,162 @@
+cat > salary.py << "EOF"
+#!/usr/bin/env python3
+"""
+Salary range parsing and mergeable per-key salary percentiles.
+
+    parse_salary("$120k-$150k")              # SalaryRange(120000, 150000, 135000)
+    parse_salary("$55/hr")                   # annual = 55 * 2080
+    sketches = SalarySketches()
+    sketches.add(key, 135000)                 # key: any int < 2**53
+    stats = sketches.quantiles()              # vectorized p50/p75/p95 per key
+
+parse_salary follows parseSalaryRange in aggregate-skill-trends-v2: the
+midpoint of the numbers in the range, hourly × 2080, daily × 260, kept only
+between MIN_ANNUAL and MAX_ANNUAL. It also reads "$120-150k" as 120k-150k,
+weekly and monthly figures, and skips non-amount numbers such as the 401 in
+"401(k)". The title-based anchors (lib/salaryAnchors.ts) are not applied.
+
+Percentiles come from a log-bucket sketch (DDSketch): a salary lands in
+bucket ceil(log_γ(v)), γ = (1 + ACCURACY) / (1 - ACCURACY), and every bucket
+value is within ACCURACY (1%) of the salaries in it. Buckets only span
+MIN_ANNUAL..MAX_ANNUAL, so a key never holds more than ~200 of them.
+Bucket counts are stored as (key << BUCKET_BITS | bucket) codes in a
+SparseCounter (sparsecount.py), so sketches from scan segments, resumed
+runs or other days merge by adding counts, exactly, without the postings.
+Requires numpy.
+"""
+
+import math
+import re
+from typing import Any, NamedTuple, Optional
+
+from sparsecount import SparseCounter, _np
+
+MIN_ANNUAL = 20_000  # same sanity range as the lambda
+MAX_ANNUAL = 1_000_000
+HOURS_PER_YEAR = 2080
+DAYS_PER_YEAR = 260
+WEEKS_PER_YEAR = 52
+MONTHS_PER_YEAR = 12
+
+ACCURACY = 0.01
+GAMMA = (1 + ACCURACY) / (1 - ACCURACY)
+BUCKET_BITS = 10
+_LOG_GAMMA = math.log(GAMMA)
+_BUCKET_OFFSET = math.ceil(math.log(MIN_ANNUAL) / _LOG_GAMMA)
+QUANTILES = (0.5, 0.75, 0.95)
+
+_AMOUNT = re.compile(r"(\d+(?:\.\d+)?)\s*(?:(k|m)\b)?(?![\d(])", re.I)
+_NOT_AMOUNT = re.compile(r"401\s*\(?k\)?|\d+\s*(?:\+\s*)?(?:years?|yrs?|%)", re.I)
+_PERIODS = (
+    (re.compile(r"/\s*h(?:ou)?r|\bhour|hourly|\bph\b", re.I), HOURS_PER_YEAR),
+    (re.compile(r"/\s*day|\bdaily|per day|\bday rate", re.I), DAYS_PER_YEAR),
+    (re.compile(r"/\s*w(?:ee)?k|\bweekly|per week", re.I), WEEKS_PER_YEAR),
+    (re.compile(r"/\s*mo(?:nth)?|\bmonthly|per month", re.I), MONTHS_PER_YEAR),
+)
+
+
+class SalaryRange(NamedTuple):
+    min: float  # as written (per hour/day/... for non-annual ranges)
+    max: float
+    annual: float  # midpoint, annualized
+
+
+def parse_salary(raw: Any, mentioned: bool = True) -> Optional[SalaryRange]:
+    """Annualized midpoint of a salary_range string; None if absent or implausible."""
+    if not mentioned or not raw or not isinstance(raw, str):
+        return None
+    text = _NOT_AMOUNT.sub(" ", raw.replace(",", ""))
+    found = _AMOUNT.findall(text)
+    if not found:
+        return None
+    scales = {"k": 1e3, "m": 1e6}
+    suffix = next((s.lower() for _, s in reversed(found) if s), "")
+    nums = []
+    for num, s in found:
+        n = float(num)
+        if s:
+            n *= scales[s.lower()]
+        elif suffix and n < 1000:
+            n *= scales[suffix]  # "$120-150k"
+        nums.append(n)
+    lo, hi = min(nums), max(nums)
+    annual = (lo + hi) / 2
+    for pattern, factor in _PERIODS:
+        if pattern.search(raw):
+            annual *= factor
+            break
+    if not MIN_ANNUAL <= annual <= MAX_ANNUAL:
+        return None
+    return SalaryRange(lo, hi, annual)
+
+
+# ---------- sketches ----------
+def bucket_of(annual: float) -> int:
+    return math.ceil(math.log(annual) / _LOG_GAMMA) - _BUCKET_OFFSET
+
+
+def bucket_values(buckets):
+    """Representative value of each bucket (relative error <= ACCURACY)."""
+    np = _np()
+    return 2 * np.power(GAMMA, buckets + _BUCKET_OFFSET) / (GAMMA + 1)
+
+
+class SalaryStats(NamedTuple):
+    keys: Any  # sorted int64 sketch keys
+    n: Any  # salaries per key
+    min: Any
+    max: Any
+    quantiles: Any  # {q: float64 array}
+
+
+class SalarySketches:
+    def __init__(self):
+        self.np = _np()
+        self.counts = SparseCounter()  # key << BUCKET_BITS | bucket -> salaries
+
+    def add(self, key: int, annual: float) -> None:
+        self.counts.add((key << BUCKET_BITS) | bucket_of(annual))
+
+    def extend(self, keys, annual: float) -> None:
+        """The same salary under several keys (one posting, many cells)."""
+        b = bucket_of(annual)
+        self.counts.extend([(k << BUCKET_BITS) | b for k in keys])
+
+    def merge(self, other: "SalarySketches", remap=None) -> None:
+        """
+        Add another set of sketches. remap(keys) -> keys translates the other
+        side's keys (int64 array) when both don't share one key space.
+        """
+        codes = other.counts.keys
+        if remap is not None:
+            codes = (remap(codes >> BUCKET_BITS) << BUCKET_BITS) | (
+                codes & ((1 << BUCKET_BITS) - 1)
+            )
+        self.counts.update(codes, other.counts.counts)
+
+    def __len__(self) -> int:
+        """Keys with at least one salary."""
+        keys = self.counts.keys >> BUCKET_BITS
+        return int(self.np.count_nonzero(keys[1:] != keys[:-1]) + bool(len(keys)))
+
+    def quantiles(self, qs=QUANTILES) -> SalaryStats:
+        """Nearest-rank quantiles like the lambda's percentiles(): a[floor((n-1)q)]."""
+        np = self.np
+        codes, counts = self.counts.keys, self.counts.counts
+        keys = codes >> BUCKET_BITS
+        buckets = codes & ((1 << BUCKET_BITS) - 1)
+        if not len(codes):
+            empty = np.zeros(0)
+            return SalaryStats(keys, counts, empty, empty, {q: empty for q in qs})
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)]
+        cum = np.cumsum(counts)
+        before = cum[starts] - counts[starts]
+        n = cum[ends - 1] - before
+        values = bucket_values(buckets)
+        out = {}
+        for q in qs:
+            rank = np.floor((n - 1) * q).astype(np.int64)
+            out[q] = values[np.searchsorted(cum, before + rank + 1)]
+        return SalaryStats(keys[starts], n, values[starts], values[ends - 1], out)
+EOF
@@ -0,0 +1,230 @@
+cat > sketches.py << "EOF"
+#!/usr/bin/env python3
+"""
+Bounded-memory, mergeable sketches for the trend cube's approximate mode.
+
+    distinct = HyperLogLogs(precision_for(0.02))   # ~2% standard error
+    distinct.add(keys, hash64(job_id))             # one job under several keys
+    keys, estimates = distinct.estimate()
+
+    titles = SpaceSaving(capacity_for(0.02))       # counts within 2% of N
+    titles.add(key, "Data Engineer")
+    titles.top(key, 5)                             # {label: count}
+
+HyperLogLogs keeps one HyperLogLog of 2**p registers per int key, stored
+sparsely: (key << p | register) codes with their rank, folded with max
+into sorted NumPy arrays like SparseCounter (sparsecount.py). A key with
+few jobs costs a few registers, a large one at most 2**p bytes, however many
+jobs it sees. Standard error is 1.04 / sqrt(2**p); small counts use linear
+counting. Merging is a register-wise max, so counts from overlapping
+runs are unions, not sums.
+
+SpaceSaving keeps at most `capacity` labels per key (Metwally et al.); a
+label's count is over by at most N / capacity, N being the key's total.
+Summaries merge with the Agarwal et al. rule (missing labels count as the
+other side's minimum, then the top `capacity` are kept). capacity=None
+counts exactly.
+
+Both serialize to plain arrays (state() / from_state()). Requires numpy.
+"""
+
+import hashlib
+import math
+from array import array
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sparsecount import BUFFER_CODES, _np
+
+MIN_PRECISION, MAX_PRECISION = 4, 16
+
+
+def hash64(value: Any) -> int:
+    digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def precision_for(error: float) -> int:
+    """Smallest p whose standard error 1.04 / sqrt(2**p) is <= error."""
+    p = math.ceil(math.log2((1.04 / error) ** 2))
+    return min(MAX_PRECISION, max(MIN_PRECISION, p))
+
+
+def capacity_for(error: float) -> int:
+    """Labels per key so that counts are over by at most error × N."""
+    return max(1, math.ceil(1 / error))
+
+
+class HyperLogLogs:
+    def __init__(self, precision: int = 12, buffer_codes: int = BUFFER_CODES):
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(f"precision must be {MIN_PRECISION}..{MAX_PRECISION}")
+        np = self.np = _np()
+        self.p = precision
+        self.m = 1 << precision
+        self.buffer_codes = buffer_codes
+        self._codes = np.zeros(0, dtype=np.int64)  # sorted, unique (key << p | register)
+        self._ranks = np.zeros(0, dtype=np.uint8)
+        self._buf = array("q")
+        self._buf_ranks = array("B")
+
+    @property
+    def std_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def add(self, keys: Iterable[int], h: int) -> None:
+        """Record the item hashed to `h` (hash64) under every key."""
+        p = self.p
+        register = h >> (64 - p)
+        rest = h & ((1 << (64 - p)) - 1)
+        rank = (64 - p) - rest.bit_length() + 1
+        codes = [(k << p) | register for k in keys]
+        self._buf.extend(codes)
+        self._buf_ranks.extend([rank] * len(codes))
+        if len(self._buf) >= self.buffer_codes:
+            self.fold()
+
+    def fold(self) -> None:
+        if not self._buf:
+            return
+        np = self.np
+        codes = np.frombuffer(self._buf, dtype=np.int64)
+        ranks = np.frombuffer(self._buf_ranks, dtype=np.uint8)
+        self._buf, self._buf_ranks = array("q"), array("B")
+        self._fold(codes, ranks)
+
+    def _fold(self, codes, ranks) -> None:
+        np = self.np
+        codes = np.concatenate([self._codes, codes])
+        ranks = np.concatenate([self._ranks, ranks])
+        order = np.lexsort((ranks, codes))
+        codes, ranks = codes[order], ranks[order]
+        last = np.r_[codes[1:] != codes[:-1], True]  # highest rank of each code
+        self._codes, self._ranks = codes[last], ranks[last]
+
+    def merge(self, other: "HyperLogLogs", remap=None) -> None:
+        """Union with another set; remap(keys) translates the other side's keys."""
+        if other.p != self.p:
+            raise ValueError(f"can't merge HyperLogLog p={other.p} into p={self.p}")
+        self.fold()
+        other.fold()
+        codes = other._codes
+        if remap is not None:
+            low = codes & (self.m - 1)
+            codes = (remap(codes >> self.p) << self.p) | low
+        self._fold(codes, other._ranks)
+
+    def estimate(self) -> Tuple[Any, Any]:
+        """(sorted keys, estimated distinct items) for every key seen."""
+        np = self.np
+        self.fold()
+        keys = self._codes >> self.p
+        if not len(keys):
+            return keys, np.zeros(0)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        m = self.m
+        nonzero = np.diff(np.r_[starts, len(keys)])
+        zeros = m - nonzero
+        z = np.add.reduceat(np.ldexp(1.0, -self._ranks.astype(np.int64)), starts) + zeros
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / z
+        with np.errstate(divide="ignore"):
+            linear = m * np.log(m / np.maximum(zeros, 1))
+        est = np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+        return keys[starts], est
+
+    def registers(self) -> int:
+        self.fold()
+        return len(self._codes)
+
+    def state(self) -> Dict[str, Any]:
+        self.fold()
+        return {"codes": self._codes, "ranks": self._ranks}
+
+    def load(self, codes, ranks) -> None:
+        self._codes = codes.astype(self.np.int64)
+        self._ranks = ranks.astype(self.np.uint8)
+        self._buf, self._buf_ranks = array("q"), array("B")
+
+
+class SpaceSaving:
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity  # None: exact
+        self.summaries: Dict[int, Dict[str, int]] = {}
+        self.totals: Dict[int, int] = {}
+
+    def add(self, key: int, label: str) -> None:
+        s = self.summaries.get(key)
+        if s is None:
+            s = self.summaries[key] = {}
+        self.totals[key] = self.totals.get(key, 0) + 1
+        c = s.get(label)
+        if c is not None:
+            s[label] = c + 1
+        elif self.capacity is None or len(s) < self.capacity:
+            s[label] = 1
+        else:
+            victim = min(s, key=s.get)
+            s[label] = s.pop(victim) + 1
+
+    def top(self, key: int, n: int) -> Dict[str, int]:
+        s = self.summaries.get(key)
+        if not s:
+            return {}
+        return dict(sorted(s.items(), key=lambda kv: (-kv[1], kv[0]))[:n])
+
+    def error_bound(self, key: int) -> float:
+        """Most any reported count for `key` can be over by."""
+        if self.capacity is None:
+            return 0
+        return self.totals.get(key, 0) / self.capacity
+
+    def merge(self, other: "SpaceSaving", remap=None) -> None:
+        """Add another summary set; remap(key) translates the other side's keys."""
+        if other.capacity != self.capacity:
+            raise ValueError(f"can't merge capacity {other.capacity} into {self.capacity}")
+        cap = self.capacity
+        for their_key, theirs in other.summaries.items():
+            key = remap(their_key) if remap is not None else their_key
+            self.totals[key] = self.totals.get(key, 0) + other.totals[their_key]
+            mine = self.summaries.get(key)
+            if not mine:
+                self.summaries[key] = dict(theirs)
+                continue
+            floor_mine = min(mine.values()) if cap and len(mine) >= cap else 0
+            floor_theirs = min(theirs.values()) if cap and len(theirs) >= cap else 0
+            merged = {
+                label: mine.get(label, floor_mine) + theirs.get(label, floor_theirs)
+                for label in mine.keys() | theirs.keys()
+            }
+            if cap and len(merged) > cap:
+                merged = dict(sorted(merged.items(), key=lambda kv: -kv[1])[:cap])
+            self.summaries[key] = merged
+
+    def __len__(self) -> int:
+        return len(self.summaries)
+
+    def labels(self) -> int:
+        return sum(len(s) for s in self.summaries.values())
+
+    def state(self) -> Dict[str, Any]:
+        np = _np()
+        keys, labels, counts = [], [], []
+        for key, s in self.summaries.items():
+            for label, c in s.items():
+                keys.append(key)
+                labels.append(label)
+                counts.append(c)
+        total_keys = list(self.totals)
+        return {
+            "keys": np.array(keys, dtype=np.int64),
+            "labels": np.array(labels, dtype=str),
+            "counts": np.array(counts, dtype=np.int64),
+            "total_keys": np.array(total_keys, dtype=np.int64),
+            "totals": np.array([self.totals[k] for k in total_keys], dtype=np.int64),
+        }
+
+    def load(self, keys, labels, counts, total_keys, totals) -> None:
+        self.summaries, self.totals = {}, dict(zip(total_keys.tolist(), totals.tolist()))
+        for key, label, c in zip(keys.tolist(), labels.tolist(), counts.tolist()):
+            self.summaries.setdefault(key, {})[label] = c
+EOF
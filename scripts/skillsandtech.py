@@ -5,11 +5,22 @@ Normalize and migrate skills, technologies, benefits, and requirements
 from job-postings-enhanced to normalized lookup tables and denormalized posting table
 """
 
-from datetime import datetime, timedelta, timezone
+import argparse
 import boto3
 import re
-from typing import Set, Dict, Tuple, List
-from collections import defaultdict
+from typing import Dict, Tuple, List
+
+from capacity import CapacityGovernor, add_capacity_args, governor_from_args
+from checkpoint import Checkpoint, add_checkpoint_args, default_path
+from dates import parse_datetime
+from ddbscan import add_scan_args, scan_pages
+from ddbwriter import DEFAULT_WORKERS, BatchWriter, add_writer_args
+from dedup import DEDUP_ATTRS, DedupIndex, add_dedup_args, dedup_from_args
+from lifecycle import ACTIVE, status_for
+from metrics import Metrics, add_metrics_args, metrics_from_args
+from postings import AttributeLoader, Posting, attrs_for, projection
+from snapshot import COLUMNS, add_snapshot_args, open_snapshot
+from termcount import TermCounter
 
 dynamodb = boto3.resource("dynamodb")
 source_table = dynamodb.Table("job-postings-enhanced")  # PK: jobId
@@ -20,131 +31,19 @@ requirements_table = dynamodb.Table("job-postings-requirements")  # PK: Id, SK:
 industries_table = dynamodb.Table("job-postings-industries")  # PK: Id, SK: Name
 normalized_table = dynamodb.Table("job-postings-normalized")  # PK: Id
 
-# Normalization rules mapping
-NORMALIZATION_RULES = {
-    # JavaScript frameworks
-    r"^react(?:\.js|js)?$": "React",
-    r"^vue(?:\.js|js)?$": "Vue",
-    r"^angular(?:\.js|js)?$": "Angular",
-    r"^next(?:\.js|js)?$": "Next.js",
-    r"^nuxt(?:\.js|js)?$": "Nuxt",
-    r"^svelte(?:\.js|js)?$": "Svelte",
-    # Python
-    r"^python$": "Python",
-    r"^django$": "Django",
-    r"^fastapi$": "FastAPI",
-    r"^flask$": "Flask",
-    r"^pytorch$": "PyTorch",
-    r"^tensorflow$": "TensorFlow",
-    # Node
-    r"^node(?:\.?js)?$": "Node.js",
-    r"^express(?:\.js|js)?$": "Express",
-    # Databases
-    r"^postgre?sql$": "PostgreSQL",
-    r"^mongo(?:db)?$": "MongoDB",
-    r"^redis$": "Redis",
-    r"^mysql$": "MySQL",
-    r"^dynamodb$": "DynamoDB",
-    r"^elasticsearch$": "Elasticsearch",
-    # Cloud
-    r"^aws$": "AWS",
-    r"^gcp$": "GCP",
-    r"^azure$": "Azure",
-    r"^docker$": "Docker",
-    r"^kubernetes$": "Kubernetes",
-    # Languages
-    r"^java(?:script)?$": "JavaScript",
-    r"^type(?:script)?$": "TypeScript",
-    r"^c#$": "C#",
-    r"^c\+\+$": "C++",
-    r"^golang|go$": "Go",
-    r"^rust$": "Rust",
-    # Tools
-    r"^git$": "Git",
-    r"^docker$": "Docker",
-    r"^jenkins$": "Jenkins",
-    r"^github$": "GitHub",
-    r"^gitlab$": "GitLab",
-}
-
-
-def normalize_term(term: str) -> str:
-    """
-    Normalize a skill/technology term to canonical form
-    """
-    if not term or not isinstance(term, str):
-        return None
-
-    # Clean: lowercase, strip whitespace
-    cleaned = term.strip().lower()
-
-    if not cleaned:
-        return None
-
-    # Remove common punctuation variations
-    cleaned = re.sub(r"[\s\-_\.]+", "", cleaned)
-
-    # Check against normalization rules
-    for pattern, canonical in NORMALIZATION_RULES.items():
-        if re.match(pattern, cleaned):
-            return canonical
-
-    # If no rule matches, use title case with dots/hyphens preserved
-    normalized = term.strip()
-    parts = normalized.split(".")
-    parts = [p.title() for p in parts]
-    normalized = ".".join(parts)
-
-    return normalized
+# Normalization rules + compiled/memoized normalize_term live in canonicalize.py;
+# terms are read through the persisted term map (termmap.py)
+from termmap import default_term_map, term_display
 
 
 def _parse_processed_date(val):
     """
     Parse a processed_date value into a timezone-aware datetime (UTC).
-    Handles:
-      - numeric epoch seconds (int/float)
-      - ISO 8601 strings with or without 'Z' / offset
-      - a few common strptime formats
+    Epoch seconds/ms (incl. Decimal), ISO 8601 and common date shapes are
+    handled by the shared memoized parser in dates.py.
     Returns datetime (tz-aware, UTC) or None on failure.
     """
-    if not val:
-        return None
-    # epoch seconds
-    if isinstance(val, (int, float)):
-        try:
-            return datetime.fromtimestamp(val, tz=timezone.utc)
-        except Exception:
-            return None
-
-    s = str(val).strip()
-    if not s:
-        return None
-
-    # Try fromisoformat (handles offsets but not trailing 'Z')
-    try:
-        if s.endswith("Z"):
-            return datetime.fromisoformat(s.replace("Z", "+00:00")).astimezone(
-                timezone.utc
-            )
-        return datetime.fromisoformat(s).astimezone(timezone.utc)
-    except Exception:
-        pass
-
-    # Try a few common formats
-    formats = (
-        "%Y-%m-%dT%H:%M:%S.%fZ",
-        "%Y-%m-%dT%H:%M:%SZ",
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%d",
-    )
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(s, fmt)
-            return dt.replace(tzinfo=timezone.utc)
-        except Exception:
-            continue
-
-    return None
+    return parse_datetime(val)
 
 
 def normalize_industry(industry: str) -> List[str]:
@@ -194,7 +93,7 @@ def normalize_and_collect(items_list: List[str]) -> Tuple[List[str], Dict]:
     for item in items_list:
         if not item:
             continue
-        canonical = normalize_term(item)
+        canonical = term_display(item)  # normalize_term, via the persisted term map
         if canonical:
             normalized[canonical] = {
                 "Id": get_id_from_name(canonical),
@@ -205,10 +104,249 @@ def normalize_and_collect(items_list: List[str]) -> Tuple[List[str], Dict]:
     return list(normalized.keys()), normalized
 
 
-def migrate_postings():
+def first_present(posting: dict, *keys, default=None):
+    """Return first posting[key] that exists and is not None; otherwise default."""
+    for k in keys:
+        if k in posting and posting[k] is not None:
+            return posting[k]
+    return default
+
+
+def _count_terms(index: Dict, data: Dict) -> None:
+    for term, entry in data.items():
+        if term not in index:
+            index[term] = entry
+        index[term]["count"] += 1
+
+
+def normalize_posting(posting: dict, tech_index: Dict, skill_index: Dict) -> None:
+    """
+    Normalize technologies/skills on a posting in place and count each
+    canonical term once per posting in tech_index / skill_index.
+    """
+    # Process technologies
+    if "technologies" in posting and posting["technologies"]:
+        normalized_techs, tech_data = normalize_and_collect(posting["technologies"])
+        posting["technologies"] = normalized_techs if normalized_techs else None
+        _count_terms(tech_index, tech_data)
+    else:
+        posting.pop("technologies", None)
+
+    # Process skills
+    if "skills" in posting and posting["skills"]:
+        normalized_skills, skill_data = normalize_and_collect(posting["skills"])
+        posting["skills"] = normalized_skills if normalized_skills else None
+        _count_terms(skill_index, skill_data)
+    else:
+        posting.pop("skills", None)
+
+    # # Process benefits
+    # if "benefits" in posting and posting["benefits"]:
+    #     normalized_benefits, benefits_data = normalize_and_collect(
+    #         posting["benefits"]
+    #     )
+    #     posting["benefits"] = (
+    #         normalized_benefits if normalized_benefits else None
+    #     )
+
+    #     for benefit, data in benefits_data.items():
+    #         if benefit not in benefits_index:
+    #             benefits_index[benefit] = data
+    #         benefits_index[benefit]["count"] += 1
+    # else:
+    #     posting.pop("benefits", None)
+
+    # # Process requirements
+    # if "requirements" in posting and posting["requirements"]:
+    #     normalized_requirements, requirements_data = normalize_and_collect(
+    #         posting["requirements"]
+    #     )
+    #     posting["requirements"] = (
+    #         normalized_requirements if normalized_requirements else None
+    #     )
+
+    #     for requirement, data in requirements_data.items():
+    #         if requirement not in requirements_index:
+    #             requirements_index[requirement] = data
+    #         requirements_index[requirement]["count"] += 1
+    # else:
+    #     posting.pop("requirements", None)
+
+    # # Process industry (can have multiple industries from one field)
+    # if "industry" in posting and posting["industry"]:
+    #     industries_list = normalize_industry(posting["industry"])
+    #     if industries_list:
+    #         posting["industry"] = industries_list
+
+    #         for industry in industries_list:
+    #             if industry not in industries_index:
+    #                 industries_index[industry] = {
+    #                     "Id": get_id_from_name(industry),
+    #                     "name": industry,
+    #                     "count": 0,
+    #                 }
+    #             industries_index[industry]["count"] += 1
+    #     else:
+    #         posting.pop("industry", None)
+    # else:
+    #     posting.pop("industry", None)
+
+
+def build_normalized_item(posting: dict) -> dict:
+    """Shape a (normalized) posting into a job-postings-normalized item."""
+    # Ensure Id field exists (copy from jobId if needed)
+    if "Id" not in posting and "jobId" in posting:
+        posting["Id"] = posting["jobId"]
+
+    # Defensive defaults for expected shape
+    posting.setdefault("company_size", "Unknown")
+    posting.setdefault("salary_mentioned", False)
+    posting.setdefault("salary_range", "Unknown")
+    posting.setdefault("seniority_level", "Unknown")
+
+    # derive a parsed processed_date if present (keeps your existing logic)
+    proc_dt = _parse_processed_date(posting.get("processed_date"))
+    if "status" not in posting and status_for(proc_dt) == ACTIVE:  # lifecycle.py rule
+        posting["status"] = ACTIVE
+
+    # Resolve common job title / description field name variants
+    job_title = first_present(
+        posting,
+        "job_title",
+        "title",
+        "jobTitle",
+        "position",
+        default="Unknown Title",
+    )
+    job_description = first_present(
+        posting,
+        "job_description",
+        "description",
+        "jobDescription",
+        "details",
+        default="",
+    )
+
+    # Other common field fallbacks
+    company_name = first_present(
+        posting, "company_name", "company", "employer", default=None
+    )
+    location = first_present(posting, "location", "job_location", default=None)
+    remote_status = first_present(posting, "remote_status", "remote", default=None)
+
+    # Build the normalized item with safe accessors
+    return {
+        "Id": posting.get("Id"),
+        "job_title": job_title,
+        "job_description": job_description,
+        "normalized": True,
+        "normalized_at": __import__("datetime").datetime.now().isoformat(),
+        "processed_date": posting.get("processed_date"),
+        "company_name": company_name,
+        "company_size": posting.get("company_size", "Unknown"),
+        "location": location,
+        "remote_status": remote_status,
+        "salary_mentioned": posting.get("salary_mentioned", False),
+        "salary_range": posting.get("salary_range", "Unknown"),
+        "seniority_level": posting.get("seniority_level", "Unknown"),
+        "status": posting.get("status", "Active"),
+    }
+
+
+def write_lookup_table(
+    table,
+    index: Dict,
+    workers: int = DEFAULT_WORKERS,
+    governor: CapacityGovernor = None,
+    metrics: Metrics = None,
+) -> int:
+    """Write {canonical: {Id, name, count}} to a lookup table (PK: Id, SK: Name)."""
+    with BatchWriter(
+        table, key_names=["Id", "Name"], workers=workers, governor=governor, metrics=metrics
+    ) as batch:
+        if metrics:
+            metrics.watch(writer=batch)
+        for canonical, data in sorted(index.items()):
+            batch.put(
+                {
+                    "Id": data["Id"],
+                    "Name": data["name"],
+                    "postingCount": data["count"],
+                    "createdAt": str(__import__("datetime").datetime.now().isoformat()),
+                }
+            )
+    return len(index)
+
+
+CHECKPOINT_JOB = "normalize"
+CHECKPOINT_PAGES = 20  # flush normalized writes + checkpoint every N scan pages
+DRY_RUN_TOP = 25  # terms listed per lookup by a dry run
+
+
+def migrate_postings(
+    segments: int = None,
+    workers: int = None,
+    write_workers: int = DEFAULT_WORKERS,
+    resume: bool = False,
+    checkpoint_path: str = None,
+    governor: CapacityGovernor = None,
+    snapshot: str = None,
+    dry_run: bool = False,
+    batch_normalize: bool = False,
+    metrics: Metrics = None,
+    dedup: DedupIndex = None,
+    scan_backend: str = "resource",
+):
     """
     Scan job-postings-enhanced and migrate to normalized tables
+    segments > 1 reads the table with a parallel segmented scan (see ddbscan.py)
+
+    Streaming: each scan page is normalized and written to the normalized
+    table as it arrives, so memory is bounded by page size. Only the per-term
+    count indexes grow; the lookup tables are written once the scan is done.
+
+    Writes go through a concurrent BatchWriter (write_workers threads). Every
+    CHECKPOINT_PAGES pages the writer is flushed and the scan position,
+    counters and term indexes are checkpointed; resume=True picks up from there.
+
+    governor (capacity.py) caps the RCU spent scanning and the WCU spent on
+    every write, including the lookup tables.
+
+    Scans project only the attributes the mode reads (postings.py): term
+    counting for dry_run, plus the normalized-item fields and descriptions
+    when writing. Items become slotted Posting records.
+    scan_backend="client" scans with the low-level client and decodes just
+    the attributes Posting takes (rawitem.py).
+
+    snapshot reads postings from a local snapshot (snapshot.py) instead of the
+    table. dry_run normalizes and counts without writing anything, e.g. to try
+    rule changes against a projected snapshot. Writing from a projected one
+    fetches the attributes it lacks (descriptions) per page with BatchGetItem.
+    checkpoint_path defaults to the job's checkpoint, or a separate one for a
+    dry run so it leaves the real one alone.
+
+    batch_normalize counts terms per page with a dictionary-encoded NumPy
+    TermCounter (termcount.py) instead of normalize_posting(); same counts.
+
+    metrics (metrics.py) times the scan, normalize, enqueue and flush stages.
+
+    dedup (dedup.py) finds near-duplicate postings: they are still written,
+    with duplicate_of set to the canonical posting's id, but their terms
+    aren't counted. Its signatures are saved with each checkpoint (not on a
+    dry run).
     """
+    governor = governor or CapacityGovernor()
+    metrics = metrics or Metrics(CHECKPOINT_JOB)
+    snap = open_snapshot(snapshot) if snapshot else None
+    attrs = attrs_for(write=not dry_run, extra=DEDUP_ATTRS if dedup is not None else ())
+    loader = None
+    lazy = [a for a in attrs if a not in COLUMNS]
+    if snap and not snap.full and lazy:
+        loader = AttributeLoader(source_table, lazy, governor, metrics)
+        print(f"↻ Projected snapshot: {', '.join(lazy)} are read from the table")
+    if checkpoint_path is None:
+        job = f"{CHECKPOINT_JOB}-dry-run" if dry_run else CHECKPOINT_JOB
+        checkpoint_path = default_path(job)
     print("=" * 60)
     print("Starting migration: job-postings-enhanced → normalized tables")
     print("=" * 60)
@@ -219,157 +357,172 @@ def migrate_postings():
     requirements_index = {}
     industries_index = {}
 
-    postings_processed = 0
-    items_to_normalize = []
-    skipped_normalized = 0
+    if snap:  # offline: one "segment", resumable by row offset
+        cp = Checkpoint.open(checkpoint_path, f"{CHECKPOINT_JOB}@snapshot", 1, resume=resume)
+    else:
+        cp = Checkpoint.open(checkpoint_path, CHECKPOINT_JOB, segments, resume=resume)
+    tech_index = cp.counters.get("tech_index", tech_index)
+    skill_index = cp.counters.get("skill_index", skill_index)
+    postings_processed = cp.counters.get("postings_processed", 0)
+    skipped_normalized = cp.counters.get("skipped_normalized", 0)
+    scanned = cp.counters.get("scanned", 0)
+    normalized_count = cp.counters.get("normalized_count", 0)
+    duplicates = cp.counters.get("duplicates", 0)
+    counter = None
+    if batch_normalize:
+        counter = TermCounter(id_for=get_id_from_name, normalize=term_display)
+        counter.seed("technologies", tech_index)
+        counter.seed("skills", skill_index)
 
     try:
-        # Scan source table
-        response = source_table.scan()
-        items = response["Items"]
-
-        print(f"\nInitial scan retrieved {len(items)} items")
-        items_to_normalize.extend(items)
-
-        # Handle pagination
-        while "LastEvaluatedKey" in response:
-            print(f"Paginating through results...")
-            response = source_table.scan(ExclusiveStartKey=response["LastEvaluatedKey"])
-            items_to_normalize.extend(response["Items"])
-            print(f"Retrieved {len(response['Items'])} more items")
-
-        print(f"Total items to process: {len(items_to_normalize)}\n")
-
-        # Process each posting
-        for posting in items_to_normalize:
-            # Skip if already normalized
-            if posting.get("normalized") == True:
-                skipped_normalized += 1
-                continue
-
-            postings_processed += 1
-            posting_id = posting.get("Id") or posting.get("jobId")
-
-            # Process technologies
-            if "technologies" in posting and posting["technologies"]:
-                normalized_techs, tech_data = normalize_and_collect(
-                    posting["technologies"]
-                )
-                posting["technologies"] = normalized_techs if normalized_techs else None
-
-                for tech, data in tech_data.items():
-                    if tech not in tech_index:
-                        tech_index[tech] = data
-                    tech_index[tech]["count"] += 1
-            else:
-                posting.pop("technologies", None)
-
-            # Process skills
-            if "skills" in posting and posting["skills"]:
-                normalized_skills, skill_data = normalize_and_collect(posting["skills"])
-                posting["skills"] = normalized_skills if normalized_skills else None
-
-                for skill, data in skill_data.items():
-                    if skill not in skill_index:
-                        skill_index[skill] = data
-                    skill_index[skill]["count"] += 1
-            else:
-                posting.pop("skills", None)
-
-            # # Process benefits
-            # if "benefits" in posting and posting["benefits"]:
-            #     normalized_benefits, benefits_data = normalize_and_collect(
-            #         posting["benefits"]
-            #     )
-            #     posting["benefits"] = (
-            #         normalized_benefits if normalized_benefits else None
-            #     )
-
-            #     for benefit, data in benefits_data.items():
-            #         if benefit not in benefits_index:
-            #             benefits_index[benefit] = data
-            #         benefits_index[benefit]["count"] += 1
-            # else:
-            #     posting.pop("benefits", None)
-
-            # # Process requirements
-            # if "requirements" in posting and posting["requirements"]:
-            #     normalized_requirements, requirements_data = normalize_and_collect(
-            #         posting["requirements"]
-            #     )
-            #     posting["requirements"] = (
-            #         normalized_requirements if normalized_requirements else None
-            #     )
-
-            #     for requirement, data in requirements_data.items():
-            #         if requirement not in requirements_index:
-            #             requirements_index[requirement] = data
-            #         requirements_index[requirement]["count"] += 1
-            # else:
-            #     posting.pop("requirements", None)
-
-            # # Process industry (can have multiple industries from one field)
-            # if "industry" in posting and posting["industry"]:
-            #     industries_list = normalize_industry(posting["industry"])
-            #     if industries_list:
-            #         posting["industry"] = industries_list
-
-            #         for industry in industries_list:
-            #             if industry not in industries_index:
-            #                 industries_index[industry] = {
-            #                     "Id": get_id_from_name(industry),
-            #                     "name": industry,
-            #                     "count": 0,
-            #                 }
-            #             industries_index[industry]["count"] += 1
-            #     else:
-            #         posting.pop("industry", None)
-            # else:
-            #     posting.pop("industry", None)
-
-            if postings_processed % 100 == 0:
-                print(f"✓ Processed {postings_processed} postings")
+        if cp.total_segments > 1:
+            print(
+                f"\nParallel scan: {cp.total_segments} segments, workers={workers or 'auto'}"
+            )
+
+        def checkpoint():
+            nonlocal tech_index, skill_index
+            if counter:
+                tech_index = counter.index("technologies")
+                skill_index = counter.index("skills")
+            if dedup is not None and not dry_run:
+                dedup.save()
+            cp.commit(
+                tech_index=tech_index,
+                skill_index=skill_index,
+                postings_processed=postings_processed,
+                skipped_normalized=skipped_normalized,
+                scanned=scanned,
+                normalized_count=normalized_count,
+                duplicates=duplicates,
+            )
+
+        print("\nNormalizing and writing postings...")
+        # Scan source table (sequential, or parallel segments) or the snapshot
+        if cp.complete:
+            # resumed after the scan finished: only the lookup writes are left
+            print("↻ Scan already complete; skipping to the lookup writes")
+            pages = ()
+        elif snap:
+            pages = snap.pages_from(cp.start_keys())
+        else:
+            pages = scan_pages(
+                source_table,
+                segments=cp.total_segments,
+                workers=workers,
+                only_segments=cp.remaining_segments(),
+                start_keys=cp.start_keys(),
+                governor=governor,
+                metrics=metrics,
+                backend=scan_backend,
+                **projection(attrs),
+            )
+
+        def write_failed(posting, e):
+            print(f"✗ Failed to write normalized posting (Id={posting.get('Id')}): {e}")
+            snippet_keys = ["Id", "job_title", "title", "jobId", "company_name"]
+            snippet = {k: posting.get(k) for k in snippet_keys if k in posting}
+            print(f"  Posting snippet: {snippet}")
+
+        with BatchWriter(
+            normalized_table,
+            key_names=["Id"],
+            workers=write_workers,
+            governor=governor,
+            metrics=metrics,
+        ) as batch:
+            metrics.watch(governor=governor, writer=batch)
+            for n, page in enumerate(metrics.pages(pages), 1):
+                scanned += len(page.items)
+                to_count = []
+                built = []
+                with metrics.stage("decode", items=len(page.items)):
+                    postings = [Posting(item) for item in page.items]
+                if loader is not None:
+                    with metrics.stage("fetch_lazy", items=len(postings)):
+                        loader.fill(postings)
+                dup_of = [None] * len(postings)
+                if dedup is not None:
+                    with metrics.stage("dedup", items=len(postings)):
+                        dup_of = dedup.check(postings)
+                with metrics.stage("normalize", items=len(postings)):
+                    for posting, dup in zip(postings, dup_of):
+                        # Already-normalized postings are rewritten but not recounted
+                        if posting.get("normalized") == True:
+                            skipped_normalized += 1
+                        elif dup is not None:
+                            duplicates += 1
+                        else:
+                            postings_processed += 1
+                            if counter:
+                                to_count.append(posting)
+                            else:
+                                normalize_posting(posting, tech_index, skill_index)
+                            if postings_processed % 100 == 0:
+                                print(f"✓ Processed {postings_processed} postings")
+
+                        try:
+                            item = build_normalized_item(posting)
+                            if dup is not None:
+                                item["duplicate_of"] = dup
+                            built.append((posting, item))
+                        except Exception as e:
+                            write_failed(posting, e)
+                    if counter:
+                        counter.add(to_count)
+                with metrics.stage("enqueue", items=len(built)):
+                    for posting, item in built:
+                        try:
+                            if not dry_run:
+                                batch.put(item)
+                            normalized_count += 1
+                        except Exception as e:
+                            write_failed(posting, e)
+                cp.page_done(page.segment, page.last_key)
+                if n % CHECKPOINT_PAGES == 0:
+                    with metrics.stage("flush"):
+                        batch.flush()  # the checkpoint below must only cover landed writes
+                    checkpoint()
+            with metrics.stage("flush"):
+                batch.flush()
+            print(f"  writer: {batch.stats.summary()}")
+            if loader is not None:
+                print(f"  lazy attributes: {loader.summary()}")
+        checkpoint()
 
         print(
             f"\n✓ Processed {postings_processed} total postings (skipped {skipped_normalized} already normalized)"
         )
+        if dedup is not None:
+            print(f"✓ Not counted: {duplicates} near-duplicates ({dedup.summary()})")
+        verb = "Would write" if dry_run else "Wrote"
+        print(f"✓ {verb} {normalized_count} normalized postings (scanned {scanned})")
         print(f"✓ Found {len(tech_index)} unique technologies")
         print(f"✓ Found {len(skill_index)} unique skills")
         print(f"✓ Found {len(benefits_index)} unique benefits")
         print(f"✓ Found {len(requirements_index)} unique requirements")
         print(f"✓ Found {len(industries_index)} unique industries")
 
+        if dry_run:
+            for label, index in (("technologies", tech_index), ("skills", skill_index)):
+                top = sorted(index.values(), key=lambda d: (-d["count"], d["name"]))
+                print(f"\nTop {label}:")
+                for data in top[:DRY_RUN_TOP]:
+                    print(f"  {data['count']:>7}  {data['name']}")
+            cp.finish()
+            return True
+
         # Write technology lookup table
         print("\nWriting technology lookup table...")
-        with tech_table.batch_writer(overwrite_by_pkeys=["Id", "Name"]) as batch:
-            for canonical, data in sorted(tech_index.items()):
-                batch.put_item(
-                    Item={
-                        "Id": data["Id"],
-                        "Name": data["name"],
-                        "postingCount": data["count"],
-                        "createdAt": str(
-                            __import__("datetime").datetime.now().isoformat()
-                        ),
-                    }
-                )
-        print(f"✓ Wrote {len(tech_index)} technologies")
+        with metrics.stage("lookup_write", items=len(tech_index)):
+            wrote = write_lookup_table(tech_table, tech_index, write_workers, governor, metrics)
+        print(f"✓ Wrote {wrote} technologies")
 
         # Write skills lookup table
         print("\nWriting skills lookup table...")
-        with skills_table.batch_writer(overwrite_by_pkeys=["Id", "Name"]) as batch:
-            for canonical, data in sorted(skill_index.items()):
-                batch.put_item(
-                    Item={
-                        "Id": data["Id"],
-                        "Name": data["name"],
-                        "postingCount": data["count"],
-                        "createdAt": str(
-                            __import__("datetime").datetime.now().isoformat()
-                        ),
-                    }
-                )
-        print(f"✓ Wrote {len(skill_index)} skills")
+        with metrics.stage("lookup_write", items=len(skill_index)):
+            wrote = write_lookup_table(skills_table, skill_index, write_workers, governor, metrics)
+        print(f"✓ Wrote {wrote} skills")
 
         # Write benefits lookup table
         # print("\nWriting benefits lookup table...")
@@ -421,107 +574,21 @@ def migrate_postings():
         #         )
         # print(f"✓ Wrote {len(industries_index)} industries")
 
-        # Write normalized postings
-        print("\nWriting normalized postings...")
-        with normalized_table.batch_writer(overwrite_by_pkeys=["Id"]) as batch:
-            normalized_count = 0
-
-            def first_present(posting: dict, *keys, default=None):
-                """Return first posting[key] that exists and is not None; otherwise default."""
-                for k in keys:
-                    if k in posting and posting[k] is not None:
-                        return posting[k]
-                return default
-
-            for posting in items_to_normalize:
-                # Ensure Id field exists (copy from jobId if needed)
-                if "Id" not in posting and "jobId" in posting:
-                    posting["Id"] = posting["jobId"]
-
-                # Defensive defaults for expected shape
-                posting.setdefault("company_size", "Unknown")
-                posting.setdefault("salary_mentioned", False)
-                posting.setdefault("salary_range", "Unknown")
-                posting.setdefault("seniority_level", "Unknown")
-
-                # derive a parsed processed_date if present (keeps your existing logic)
-                proc_dt = _parse_processed_date(posting.get("processed_date"))
-                if "status" not in posting and proc_dt:
-                    if datetime.now(timezone.utc) - proc_dt <= timedelta(days=30):
-                        posting["status"] = "Active"
-
-                # Resolve common job title / description field name variants
-                job_title = first_present(
-                    posting,
-                    "job_title",
-                    "title",
-                    "jobTitle",
-                    "position",
-                    default="Unknown Title",
-                )
-                job_description = first_present(
-                    posting,
-                    "job_description",
-                    "description",
-                    "jobDescription",
-                    "details",
-                    default="",
-                )
-
-                # Other common field fallbacks
-                company_name = first_present(
-                    posting, "company_name", "company", "employer", default=None
-                )
-                location = first_present(
-                    posting, "location", "job_location", default=None
-                )
-                remote_status = first_present(
-                    posting, "remote_status", "remote", default=None
-                )
-
-                # Build the normalized item with safe accessors
-                NormalizedItem = {
-                    "Id": posting.get("Id"),
-                    "job_title": job_title,
-                    "job_description": job_description,
-                    "normalized": True,
-                    "normalized_at": __import__("datetime").datetime.now().isoformat(),
-                    "processed_date": posting.get("processed_date"),
-                    "company_name": company_name,
-                    "company_size": posting.get("company_size", "Unknown"),
-                    "location": location,
-                    "remote_status": remote_status,
-                    "salary_mentioned": posting.get("salary_mentioned", False),
-                    "salary_range": posting.get("salary_range", "Unknown"),
-                    "seniority_level": posting.get("seniority_level", "Unknown"),
-                    "status": posting.get("status", "Active"),
-                }
-
-                try:
-                    batch.put_item(Item=NormalizedItem)
-                    normalized_count += 1
-                except Exception as e:
-                    print(
-                        f"✗ Failed to write normalized posting (Id={posting.get('Id')}): {e}"
-                    )
-                    snippet_keys = ["Id", "job_title", "title", "jobId", "company_name"]
-                    snippet = {k: posting.get(k) for k in snippet_keys if k in posting}
-                    print(f"  Posting snippet: {snippet}")
-                    continue
-
-        print(f"✓ Wrote {normalized_count} normalized postings")
-
         print("\n" + "=" * 60)
         print("✓ Migration complete!")
         print("=" * 60)
-        print(f"\nSummary:")
+        print("\nSummary:")
         print(f"  • Postings processed: {postings_processed}")
         print(f"  • Unique technologies: {len(tech_index)}")
         print(f"  • Unique skills: {len(skill_index)}")
         print(f"  • Unique benefits: {len(benefits_index)}")
         print(f"  • Unique requirements: {len(requirements_index)}")
         print(f"  • Unique industries: {len(industries_index)}")
+        print(f"  • Capacity: {governor.summary()}")
+        print(f"  • Term map: {default_term_map().summary()}")
+        print(f"  • Stages: {metrics.summary()}")
 
+        cp.finish()
         return True
 
     except Exception as e:
@@ -529,15 +596,40 @@ def migrate_postings():
         import traceback
 
         traceback.print_exc()
+        print(f"  checkpoint: {checkpoint_path} (rerun with --resume)")
         return False
 
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Normalize job-postings-enhanced")
+    add_scan_args(ap, only_segments=False)
+    add_writer_args(ap)
+    add_capacity_args(ap)
+    add_snapshot_args(ap)
+    add_metrics_args(ap)
+    add_dedup_args(ap)
+    ap.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="normalize and count only; write nothing (works on projected snapshots)",
+    )
+    ap.add_argument(
+        "--batch-normalize",
+        action="store_true",
+        help="count terms per page with dictionary encoding + NumPy (needs numpy)",
+    )
+    add_checkpoint_args(ap, CHECKPOINT_JOB)
+    ap.set_defaults(checkpoint=None)  # unset: a dry run gets its own (below)
+    args = ap.parse_args()
+    if args.checkpoint is None:  # an explicit --checkpoint is used as given
+        job = f"{CHECKPOINT_JOB}-dry-run" if args.dry_run else CHECKPOINT_JOB
+        args.checkpoint = default_path(job)
+
     print("\n" + "=" * 60)
     print("Technology, Skill, Benefit, Requirement & Industry Normalization Migration")
     print("=" * 60)
 
-    confirm = (
+    confirm = "yes" if args.dry_run else (
         input("\nThis will normalize and migrate all 4 fields.\nProceed? (yes/no): ")
         .strip()
         .lower()
@@ -546,6 +638,28 @@ if __name__ == "__main__":
         print("Cancelled.")
         exit(0)
 
-    success = migrate_postings()
+    metrics = metrics_from_args(args, CHECKPOINT_JOB)
+    try:
+        success = migrate_postings(
+            segments=args.segments,
+            workers=args.workers,
+            write_workers=args.write_workers,
+            resume=args.resume,
+            checkpoint_path=args.checkpoint,
+            governor=governor_from_args(
+                args, read_table=source_table, write_table=normalized_table
+            ),
+            snapshot=args.snapshot,
+            dry_run=args.dry_run,
+            batch_normalize=args.batch_normalize,
+            metrics=metrics,
+            dedup=dedup_from_args(args),
+            scan_backend=args.scan_backend,
+        )
+    except KeyboardInterrupt:
+        print(f"\n✗ Interrupted. Checkpoint: {args.checkpoint} (rerun with --resume)")
+        exit(130)
+    finally:
+        metrics.close()
     exit(0 if success else 1)
 EOF
@@ -0,0 +1,272 @@
+cat > snapshot.py << "EOF"
+#!/usr/bin/env python3
+"""
+Local columnar snapshot of job-postings-enhanced.
+
+    python3 snapshot.py export [--full] [--segments 8]    # one live scan
+    python3 snapshot.py info snapshots/job-postings-enhanced.parquet
+
+writes a zstd-compressed Parquet file that the backfills can read instead of
+scanning DynamoDB (--snapshot PATH), so normalization rule changes can be
+tried on the whole corpus offline.
+
+Known attributes (ids, titles, technologies, skills, status, processed_date,
+...) get typed columns. A value that doesn't fit its column's type (e.g. an
+epoch-number processed_date, a string set) is kept losslessly in the `_rest`
+JSON column instead, as is every other attribute of a --full snapshot, so
+items read back exactly as the scan returned them.
+
+Requires pyarrow (pip install pyarrow).
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from checkpoint import dumps, loads
+from ddbscan import ScanPage, add_scan_args, scan_pages
+
+SOURCE_TABLE = "job-postings-enhanced"
+DEFAULT_PATH = os.path.join("snapshots", f"{SOURCE_TABLE}.parquet")
+ROW_GROUP_ROWS = 50_000
+READ_BATCH_ROWS = 1000
+REST = "_rest"
+
+# column -> kind; projected by default, typed in the file
+COLUMNS = {
+    "jobId": "str",
+    "id": "str",
+    "Id": "str",
+    "PK": "str",
+    "SK": "str",
+    "title": "str",
+    "job_title": "str",
+    "company": "str",
+    "company_name": "str",
+    "status": "str",
+    "processed_date": "str",
+    "location": "str",
+    "remote_status": "str",
+    "seniority_level": "str",
+    "salary_range": "str",
+    "salary_mentioned": "bool",
+    "company_size": "str",
+    "normalized": "bool",
+    "technologies": "list",
+    "skills": "list",
+}
+
+
+def _pa():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise SystemExit(f"snapshot.py needs pyarrow (pip install pyarrow): {e}")
+    return pyarrow
+
+
+def schema(meta: Optional[Dict[str, Any]] = None):
+    pa = _pa()
+    types = {"str": pa.string(), "bool": pa.bool_(), "list": pa.list_(pa.string())}
+    fields = [pa.field(c, types[k]) for c, k in COLUMNS.items()]
+    fields.append(pa.field(REST, pa.string()))
+    return pa.schema(fields, metadata={"snapshot": json.dumps(meta or {})})
+
+
+def _fits(kind: str, v: Any) -> bool:
+    if kind == "str":
+        return isinstance(v, str)
+    if kind == "bool":
+        return isinstance(v, bool)
+    return isinstance(v, list) and all(isinstance(x, str) for x in v)
+
+
+def to_columns(items: List[Dict[str, Any]], full: bool) -> Dict[str, list]:
+    cols: Dict[str, list] = {c: [] for c in COLUMNS}
+    rest_col = []
+    for item in items:
+        rest = {}
+        for c, kind in COLUMNS.items():
+            v = item.get(c)
+            if v is not None and not _fits(kind, v):
+                rest[c] = v
+                v = None
+            cols[c].append(v)
+        if full:
+            rest.update((k, v) for k, v in item.items() if k not in COLUMNS)
+        rest_col.append(dumps(rest) if rest else None)
+    cols[REST] = rest_col
+    return cols
+
+
+def from_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    items = []
+    for row in rows:
+        rest = row.pop(REST, None)
+        item = {k: v for k, v in row.items() if v is not None}
+        if rest:
+            item.update(loads(rest))
+        items.append(item)
+    return items
+
+
+def export(
+    table,
+    path: str = DEFAULT_PATH,
+    full: bool = False,
+    row_group_rows: int = ROW_GROUP_ROWS,
+    **scan_opts,
+) -> int:
+    """Scan `table` once into a Parquet snapshot at `path`; returns rows written."""
+    pa = _pa()
+    meta = {
+        "table": table.name,
+        "full": full,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    if not full:
+        names = {f"#a{i}": c for i, c in enumerate(COLUMNS)}
+        scan_opts.setdefault("ProjectionExpression", ",".join(names))
+        scan_opts.setdefault("ExpressionAttributeNames", names)
+
+    sch = schema(meta)
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{path}.tmp"
+    rows = 0
+    buf: List[Dict[str, Any]] = []
+    with pa.parquet.ParquetWriter(tmp, sch, compression="zstd") as writer:
+
+        def flush():
+            if buf:
+                writer.write_table(
+                    pa.Table.from_pydict(to_columns(buf, full), schema=sch),
+                    row_group_size=row_group_rows,
+                )
+                buf.clear()
+
+        for page in scan_pages(table, **scan_opts):
+            buf.extend(page.items)
+            rows += len(page.items)
+            if len(buf) >= row_group_rows:
+                flush()
+                print(f"… {rows} rows")
+        flush()
+    os.replace(tmp, path)
+    return rows
+
+
+class Snapshot:
+    def __init__(self, path: str):
+        pa = _pa()
+        self.path = path
+        self._file = pa.parquet.ParquetFile(path)
+        raw = (self._file.schema_arrow.metadata or {}).get(b"snapshot", b"{}")
+        self.meta = json.loads(raw)
+        self.rows = self._file.metadata.num_rows
+
+    @property
+    def full(self) -> bool:
+        """Every attribute was captured (safe to write items back whole)."""
+        return bool(self.meta.get("full"))
+
+    def pages(
+        self, batch_rows: int = READ_BATCH_ROWS, start_row: int = 0
+    ) -> Iterator[ScanPage]:
+        """
+        ScanPage-compatible reader: segment 0, last_key {"row": n} (None at the
+        end), so Checkpoint start_keys work unchanged for --resume.
+        """
+        row = 0
+        for batch in self._file.iter_batches(batch_size=batch_rows):
+            n = batch.num_rows
+            if row + n <= start_row:
+                row += n
+                continue
+            rows = batch.to_pylist()[max(0, start_row - row) :]
+            row += n
+            last_key = {"row": row} if row < self.rows else None
+            yield ScanPage(0, from_rows(rows), last_key)
+        if self.rows == 0:
+            yield ScanPage(0, [], None)
+
+    def pages_from(self, start_keys: Optional[Dict[int, Any]] = None):
+        """
+        pages() resuming from Checkpoint.start_keys(). A finished checkpoint
+        has no key for segment 0: resume after the last row, not from row 0.
+        """
+        if start_keys is not None and 0 not in start_keys:
+            return self.pages(start_row=self.rows)
+        start = (start_keys.get(0) if start_keys else None) or {}
+        return self.pages(start_row=start.get("row", 0))
+
+    def items(self) -> Iterator[Dict[str, Any]]:
+        for page in self.pages():
+            yield from page.items
+
+    def describe(self) -> str:
+        kind = "full" if self.full else "projected"
+        return (
+            f"{self.path}: {self.rows} rows of {self.meta.get('table')} ({kind}), "
+            f"taken {self.meta.get('created_at')}"
+        )
+
+
+def open_snapshot(path: str) -> Snapshot:
+    snap = Snapshot(path)
+    print(f"Reading snapshot {snap.describe()}")
+    return snap
+
+
+def snapshot_pages(path: str, start_keys: Optional[Dict[int, Any]] = None):
+    """scan_pages() stand-in over a snapshot file."""
+    return open_snapshot(path).pages_from(start_keys)
+
+
+def add_snapshot_args(parser):
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help=f"read {SOURCE_TABLE} from a local snapshot (snapshot.py export) "
+        "instead of scanning DynamoDB",
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=f"Local Parquet snapshot of {SOURCE_TABLE}")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="scan the table once into a snapshot")
+    ex.add_argument("--out", default=DEFAULT_PATH, help=f"default: {DEFAULT_PATH}")
+    ex.add_argument(
+        "--full",
+        action="store_true",
+        help="keep every attribute (needed to write postings back, e.g. statusadd)",
+    )
+    add_scan_args(ex, only_segments=False)
+    info = sub.add_parser("info", help="describe a snapshot")
+    info.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    args = ap.parse_args()
+
+    if args.cmd == "info":
+        print(Snapshot(args.path).describe())
+    else:
+        import boto3
+
+        table = boto3.resource("dynamodb").Table(SOURCE_TABLE)
+        t0 = time.time()
+        n = export(
+            table,
+            args.out,
+            full=args.full,
+            segments=args.segments or 1,
+            workers=args.workers,
+            backend=args.scan_backend,
+        )
+        size = os.path.getsize(args.out) / 1e6
+        print(f"✓ Wrote {n} rows to {args.out} ({size:.1f} MB) in {time.time() - t0:.1f}s")
+EOF
@@ -0,0 +1,148 @@
+cat > sparsecount.py << "EOF"
+#!/usr/bin/env python3
+"""
+Sparse integer-keyed counter for the scan-time aggregations (cooccur.py,
+trendcube.py).
+
+Callers pack whatever they count into one int64 (e.g. a << 32 | b) and add
+it; codes are appended to a flat array('q') and folded, once the buffer is
+full, into two sorted NumPy arrays (key, count) with np.unique +
+np.bincount. No per-key Python objects, and memory follows the keys
+actually seen.
+
+The aggregations are saved next to the scan checkpoint at every commit,
+tagged with a sequence number the checkpoint also records (open_state).
+Requires numpy.
+"""
+
+import os
+from array import array
+from typing import Callable, Iterable, Optional, TypeVar
+
+SHIFT = 32
+LOW = (1 << SHIFT) - 1
+BUFFER_CODES = 1_000_000  # codes buffered before a merge (8 MB)
+
+T = TypeVar("T")
+
+
+def _np():
+    try:
+        import numpy
+    except ImportError as e:
+        raise SystemExit(f"scan aggregations need numpy (pip install numpy): {e}")
+    return numpy
+
+
+def pack(high: int, low: int) -> int:
+    return (high << SHIFT) | low
+
+
+class SparseCounter:
+    def __init__(self, buffer_codes: int = BUFFER_CODES):
+        np = self.np = _np()
+        self.buffer_codes = buffer_codes
+        self._keys = np.zeros(0, dtype=np.int64)  # sorted, unique
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._buf = array("q")
+
+    def add(self, code: int) -> None:
+        self._buf.append(code)
+        if len(self._buf) >= self.buffer_codes:
+            self.merge()
+
+    def extend(self, codes: Iterable[int]) -> None:
+        self._buf.extend(codes)
+        if len(self._buf) >= self.buffer_codes:
+            self.merge()
+
+    def merge(self) -> None:
+        if not self._buf:
+            return
+        np = self.np
+        new, new_counts = np.unique(
+            np.frombuffer(self._buf, dtype=np.int64), return_counts=True
+        )
+        self._buf = array("q")
+        self._fold(new, new_counts)
+
+    def update(self, keys, counts) -> None:
+        """Add counts for keys, e.g. another counter's keys / counts."""
+        self.merge()
+        self._fold(self.np.asarray(keys, dtype=self.np.int64), counts)
+
+    def _fold(self, new, new_counts) -> None:
+        np = self.np
+        keys = np.concatenate([self._keys, new])
+        weights = np.concatenate([self._counts, new_counts])
+        self._keys, inverse = np.unique(keys, return_inverse=True)
+        self._counts = np.bincount(inverse, weights=weights).astype(np.int64)
+
+    @property
+    def keys(self):
+        self.merge()
+        return self._keys
+
+    @property
+    def counts(self):
+        self.merge()
+        return self._counts
+
+    def split(self):
+        """(high, low, count) arrays of the packed keys."""
+        keys = self.keys
+        return keys >> SHIFT, keys & LOW, self._counts
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def load(self, keys, counts) -> None:
+        self._keys = keys.astype(self.np.int64)
+        self._counts = counts.astype(self.np.int64)
+        self._buf = array("q")
+
+
+def save_npz(path: str, **arrays) -> None:
+    """np.savez via tmp file + fsync + rename, like checkpoint.atomic_write_json."""
+    np = _np()
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def clear_state(path: str) -> None:
+    for p in (path, f"{path}.tmp"):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def open_state(
+    path: str,
+    seq: Optional[int],
+    resumed: bool,
+    fresh: Callable[[], T],
+    load: Callable[[str], T],
+    label: str,
+) -> Optional[T]:
+    """
+    fresh() for a new run; on --resume the state saved with checkpoint commit
+    `seq` (load(path)). None if that state is missing or from another commit,
+    since its counts would be doubled or lost: the aggregation is off then.
+    """
+    if not resumed:
+        clear_state(path)
+        return fresh()
+    if seq is not None and os.path.exists(path):
+        state = load(path)
+        if state.seq == seq:
+            print(f"↻ {label} resumed: {state.summary()}")
+            return state
+    print(f"⚠ No {label} state matching the checkpoint; not writing {label}")
+    return None
+EOF
@@ -1,90 +1,220 @@
 cat > statusadd.py << 'EOF'
 #!/usr/bin/env python3
 """
-Batch update all items in DynamoDB table to set status to 'Active'
-Uses batch_write_item for efficient bulk updates
+Keep `status` on job-postings-enhanced in step with the posting lifecycle
+(lifecycle.py): Active until processed_date is 30 days old, then Expired
+
+    python3 statusadd.py           # daily: only the day buckets crossing the cutoff
+    python3 statusadd.py --full    # scan everything once (missing / stale statuses)
+
+Both send small conditional UpdateItem calls that set `status` alone, in
+parallel, and move the postings' job-tech-index rows along (their SK
+starts with the status)
 """
 
+import argparse
 import boto3
 import time
-from typing import List, Dict, Any
+
+from capacity import CapacityGovernor, add_capacity_args, governor_from_args
+from checkpoint import Checkpoint, add_checkpoint_args, default_path
+from ddbscan import add_backend_args, scan_pages
+from ddbwriter import DEFAULT_WORKERS, BatchWriter, add_writer_args
+from indexrows import V1_TABLE, V2_TABLE, display_puts, slug_puts
+from lifecycle import APPLIED, ATTRS, FAILED, LifecycleEngine, add_lifecycle_args
+from metrics import Metrics, add_metrics_args, metrics_from_args
+from snapshot import add_snapshot_args, open_snapshot
 
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('job-postings-enhanced')
 
-def batch_update_items(table, batch_size: int = 25):
+CHECKPOINT_JOB = 'statusadd'
+
+
+def make_engine(table, write_workers: int = DEFAULT_WORKERS, update_workers: int = DEFAULT_WORKERS,
+                index: bool = True, governor: CapacityGovernor = None, metrics: Metrics = None,
+                **options) -> LifecycleEngine:
+    """
+    LifecycleEngine with writers on job-tech-index-v2 (slug rows, jtindex.py) and
+    job-tech-index (display-name rows, job-tech-index.py) unless index=False
     """
-    Scan all items and batch update them in groups of 25 (DynamoDB limit)
+    indexes = []
+    if index and not options.get('dry_run'):
+        for name, build_rows in ((V2_TABLE, slug_puts), (V1_TABLE, display_puts)):
+            writer = BatchWriter(dynamodb.Table(name), key_names=['PK', 'SK'],
+                                 workers=write_workers, governor=governor,
+                                 metrics=metrics)
+            indexes.append((writer, build_rows))
+    return LifecycleEngine(table, workers=update_workers, indexes=indexes,
+                           governor=governor, metrics=metrics, **options)
+
+
+def batch_update_items(table, resume: bool = False,
+                       checkpoint_path: str = None,
+                       write_workers: int = DEFAULT_WORKERS,
+                       governor: CapacityGovernor = None, snapshot: str = None,
+                       metrics: Metrics = None, engine: LifecycleEngine = None,
+                       scan_backend: str = 'resource'):
     """
-    items_to_update = []
-    processed_count = 0
-    updated_count = 0
-    
+    Scan all items page by page (only the attributes the lifecycle needs) and
+    update the ones whose status is missing or stale, `engine.workers` at a time.
+    Index rows are flushed before the page's LastEvaluatedKey is checkpointed,
+    so an interrupted run can continue with resume=True; a page whose updates
+    failed is not checkpointed (the run stops there and a resume retries it)
+    governor (capacity.py) caps the RCU/WCU the scan and the writes may use
+    snapshot reads the items from a local snapshot (snapshot.py) instead; the
+    updates are conditional, so a stale one only costs skipped updates
+    metrics (metrics.py) times the scan, update and flush stages
+    scan_backend 'client' decodes only what the lifecycle reads (rawitem.py)
+    checkpoint_path defaults to the job's checkpoint, or a separate one when the
+    engine is a dry run, so a dry run never moves the real one along
+    """
+    governor = governor or CapacityGovernor()
+    metrics = metrics or Metrics(CHECKPOINT_JOB)
+    engine = engine or make_engine(table, write_workers, governor=governor, metrics=metrics)
+    if checkpoint_path is None:
+        job = f"{CHECKPOINT_JOB}-dry-run" if engine.dry_run else CHECKPOINT_JOB
+        checkpoint_path = default_path(job)
+    snap = open_snapshot(snapshot) if snapshot else None
+    job = f"{CHECKPOINT_JOB}@snapshot" if snap else CHECKPOINT_JOB
+    cp = Checkpoint.open(checkpoint_path, job, resume=resume)
+    processed_count = cp.counters.get('processed', 0)
+    updated_count = cp.counters.get('updated', 0)
+    writers = engine.index_writers
+
     try:
-        # Scan all items
-        response = table.scan()
-        items = response['Items']
-        
-        print(f"Initial scan retrieved {len(items)} items")
-        items_to_update.extend(items)
-        
-        # Handle pagination if result > 1MB
-        while 'LastEvaluatedKey' in response:
-            print("Paginating through results...")
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items_to_update.extend(response['Items'])
-            print(f"Scan retrieved {len(response['Items'])} more items")
-        
-        print(f"\nTotal items to update: {len(items_to_update)}")
-        
-        # Batch write in groups of 25
-        with table.batch_writer(overwrite_by_pkeys=['jobId']) as batch:
-            for item in items_to_update:
-                try:
-                    # Add status field to item
-                    item['status'] = 'Active'
-                    batch.put_item(Item=item)
-                    updated_count += 1
-                    
-                    # Progress indicator
-                    if updated_count % 100 == 0:
-                        print(f"✓ Updated {updated_count}/{len(items_to_update)} items")
-                        
-                except Exception as e:
-                    print(f"✗ Error updating item {item.get('jobId')}: {str(e)}")
-                    processed_count += 1
-                    continue
-                
-                processed_count += 1
-        
+        metrics.watch(governor=governor)
+        for writer in writers:
+            metrics.watch(writer=writer)
+        if cp.complete:
+            pages = ()  # resumed after the last page was committed: nothing to scan
+        elif snap:
+            pages = snap.pages_from(cp.start_keys())
+        else:
+            names = {f'#a{i}': a for i, a in enumerate(ATTRS)}  # status is reserved
+            pages = scan_pages(table, only_segments=cp.remaining_segments(),
+                               start_keys=cp.start_keys(), governor=governor,
+                               metrics=metrics, backend=scan_backend,
+                               ProjectionExpression=','.join(names),
+                               ExpressionAttributeNames=names)
+        for page in metrics.pages(pages):
+            with metrics.stage('update', items=len(page.items)):
+                outcomes = engine.update(list(engine.transitions(page.items)))
+            updated_count += outcomes.count(APPLIED)
+            processed_count += len(page.items)
+            print(f"✓ Scanned {processed_count} items, updated {updated_count}")
+
+            # Only checkpoint the page once its index rows have landed
+            if writers:
+                with metrics.stage('flush'):
+                    engine.flush_indexes()
+            failed = outcomes.count(FAILED)
+            if failed:
+                raise RuntimeError(f"{failed} status updates failed; "
+                                   "page not checkpointed")
+            cp.page_done(page.segment, page.last_key)
+            cp.commit(processed=processed_count, updated=updated_count)
+
+        for writer in writers:
+            writer.close()
+            print(f"  {writer.table_name}: {writer.stats.summary()}")
+        print(f"  lifecycle: {engine.summary()}")
+        print(f"  capacity: {governor.summary()}")
+        print(f"  stages: {metrics.summary()}")
+
+        cp.finish()
         print(f"\n✓ Successfully updated {updated_count} items")
         print(f"Total processed: {processed_count}")
-        
+
     except Exception as e:
         print(f"✗ Error during batch update: {str(e)}")
+        print(f"  checkpoint: {checkpoint_path} (rerun with --resume)")
+        return False
+
+    return True
+
+
+def expire_due(engine: LifecycleEngine, state_path: str, lookback_days: int,
+               metrics: Metrics = None):
+    """
+    Daily run: expire the Active postings that crossed the cutoff since the last one
+    run_daily flushes the index rows and records the cutoff in state_path only
+    when every update and index write succeeded
+    """
+    metrics = metrics or Metrics(CHECKPOINT_JOB)
+    try:
+        with metrics.stage('expire'):
+            engine.run_daily(state_path, lookback_days)
+        for writer in engine.index_writers:
+            writer.close()
+            print(f"  {writer.table_name}: {writer.stats.summary()}")
+        print(f"  lifecycle: {engine.summary()}")
+        print(f"  stages: {metrics.summary()}")
+    except Exception as e:
+        print(f"✗ Error during expiry: {str(e)}")
+        print(f"  lifecycle: {engine.summary()}")
+        print(f"  cutoff not advanced in {state_path}; rerunning retries the same days")
         return False
-    
     return True
 
+
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Expire / activate postings on job-postings-enhanced")
+    ap.add_argument('--full', action='store_true',
+                    help='scan every posting instead of the day buckets crossing the cutoff')
+    ap.add_argument('--dry-run', action='store_true', help='count the changes, write nothing')
+    ap.add_argument('--yes', action='store_true', help="don't ask for confirmation")
+    add_lifecycle_args(ap)
+    add_writer_args(ap)
+    add_capacity_args(ap)
+    add_snapshot_args(ap)
+    add_backend_args(ap)
+    add_metrics_args(ap)
+    add_checkpoint_args(ap, CHECKPOINT_JOB)
+    ap.set_defaults(checkpoint=None)  # unset: a dry run gets its own (below)
+    args = ap.parse_args()
+    if args.checkpoint is None:  # an explicit --checkpoint is used as given
+        job = f"{CHECKPOINT_JOB}-dry-run" if args.dry_run else CHECKPOINT_JOB
+        args.checkpoint = default_path(job)
+
     print("=" * 50)
-    print("DynamoDB Batch Update - Set Status to 'Active'")
+    print("DynamoDB Status Lifecycle - Active / Expired")
     print("=" * 50)
-    print(f"Table: JobPostings")
-    print(f"Update: Add/set status = 'Active'\n")
-    
+    print(f"Table: {table.name}")
+    print(f"Rule: Active for {args.max_age_days} days after processed_date, then Expired\n")
+
     # Confirm before proceeding
-    confirm = input("Proceed with update? (yes/no): ").strip().lower()
-    if confirm != 'yes':
-        print("Cancelled.")
-        exit(0)
-    
+    if not (args.yes or args.dry_run):
+        confirm = input("Proceed with update? (yes/no): ").strip().lower()
+        if confirm != 'yes':
+            print("Cancelled.")
+            exit(0)
+
     start_time = time.time()
-    success = batch_update_items(table, batch_size=25)
+    metrics = metrics_from_args(args, CHECKPOINT_JOB)
+    governor = governor_from_args(args, read_table=table, write_table=table)
+    engine = make_engine(table, args.write_workers, args.update_workers,
+                         index=not args.no_index, governor=governor, metrics=metrics,
+                         max_age_days=args.max_age_days, dry_run=args.dry_run)
+    try:
+        if args.full or args.snapshot:
+            success = batch_update_items(table, resume=args.resume,
+                                         checkpoint_path=args.checkpoint,
+                                         write_workers=args.write_workers,
+                                         governor=governor, snapshot=args.snapshot,
+                                         metrics=metrics, engine=engine,
+                                         scan_backend=args.scan_backend)
+        else:
+            success = expire_due(engine, args.state, args.lookback_days, metrics)
+    except KeyboardInterrupt:
+        print(f"\n✗ Interrupted. Checkpoint: {args.checkpoint} (rerun with --resume)")
+        exit(130)
+    finally:
+        metrics.close()
     elapsed = time.time() - start_time
-    
+
     print(f"\nCompleted in {elapsed:.2f} seconds")
-    
+
     if not success:
         exit(1)
-EOF
\ No newline at end of file
+EOF
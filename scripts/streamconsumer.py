@@ -0,0 +1,342 @@
+cat > streamconsumer.py << "EOF"
+#!/usr/bin/env python3
+"""
+Incremental maintenance from job-postings-enhanced change records.
+
+Consumes DynamoDB Stream records (INSERT / MODIFY / REMOVE, view type
+NEW_AND_OLD_IMAGES) and applies only what they imply:
+
+  - job-tech-index rows:  build_puts(old) vs build_puts(new); stale rows are
+    deleted, new rows put (whichever index the deployed jtindex.py targets)
+  - job-postings-normalized:  build_normalized_item(new), or delete on REMOVE
+  - technologies / skills lookups:  postingCount += / -= 1 for terms that
+    appear / disappear (normalize_and_collect via normalize_posting); a term
+    whose count drops to 0 is removed, as a full rebuild would
+
+The index and normalized writes are puts/deletes, so a retried batch just
+rewrites them. The count updates are not: each carries the micro-batch's
+token (batch_token: stable for the same records) and is conditional on the
+term's appliedBatches set not holding it yet, so a batch that Lambda retries
+or a replay resumes after a crash is counted once. The set keeps the newest
+APPLIED_BATCHES_KEPT tokens per term.
+
+Two entry points:
+    handler(event, context)                       Lambda stream trigger
+    python3 streamconsumer.py --file records.jsonl [--resume]   replay/testing
+
+Each JSONL line is one stream record or a {"Records": [...]} event. Records
+are applied in micro-batches: index/normalized writes are netted per key and
+flushed before the next batch, so the final state follows record order.
+
+The term map (termmap.py) goes to $TERMMAP_DIR, /tmp/.termmap on Lambda.
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer
+
+import jtindex
+import normalize
+from checkpoint import atomic_write_json, default_path, read_json
+from ddbwriter import DEFAULT_WORKERS, BatchWriter, add_writer_args
+
+BATCH_RECORDS = 100
+APPLIED_BATCHES_KEPT = 32  # batch tokens remembered per lookup term
+CHECKPOINT_JOB = "stream-replay"
+
+_deserializer = TypeDeserializer()
+
+
+def _image(wire: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not wire:
+        return None
+    return {k: _deserializer.deserialize(v) for k, v in wire.items()}
+
+
+def record_images(record: Dict[str, Any]) -> Tuple[str, Optional[dict], Optional[dict], dict]:
+    """(eventName, old image, new image, keys) of one stream record."""
+    ddb = record.get("dynamodb") or {}
+    event = record.get("eventName")
+    old = _image(ddb.get("OldImage"))
+    new = None if event == "REMOVE" else _image(ddb.get("NewImage"))
+    keys = _image(ddb.get("Keys")) or {}
+    return event, old, new, keys
+
+
+def index_rows(image: Optional[dict]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    if not image:
+        return {}
+    rows = {}
+    for p in jtindex.build_puts(image):
+        item = p["PutRequest"]["Item"]
+        rows[(item["PK"], item["SK"])] = item
+    return rows
+
+
+def batch_token(records: List[Dict[str, Any]]) -> str:
+    """
+    Same records -> same token: "<first record's creation time>-<digest>",
+    so tokens sort oldest first. Stream records are identified by eventID;
+    records without one (hand-written replay files) by their content.
+    """
+    digest = hashlib.sha1()
+    for record in records:
+        rid = record.get("eventID") or json.dumps(record, sort_keys=True, default=str)
+        digest.update(rid.encode("utf-8"))
+        digest.update(b"\0")
+    created = (records[0].get("dynamodb") or {}) if records else {}
+    ts = int(float(created.get("ApproximateCreationDateTime") or 0))
+    return f"{ts:010d}-{digest.hexdigest()[:16]}"
+
+
+def counted_terms(image: Optional[dict]) -> Tuple[Dict, Dict]:
+    """
+    (tech_data, skill_data) the full migration would count for this image:
+    already-normalized postings are not counted there, so not here either.
+    """
+    tech, skill = {}, {}
+    if image and image.get("normalized") != True:
+        normalize.normalize_posting(copy.deepcopy(image), tech, skill)
+    return tech, skill
+
+
+class StreamConsumer:
+    def __init__(self, write_workers: int = DEFAULT_WORKERS, governor=None):
+        self.index_table = jtindex.idx
+        self.index_writer = BatchWriter(
+            self.index_table, ["PK", "SK"], workers=write_workers, governor=governor
+        )
+        self.normalized_writer = BatchWriter(
+            normalize.normalized_table, ["Id"], workers=write_workers, governor=governor
+        )
+        self.lookups = (normalize.tech_table, normalize.skills_table)
+        self.stats = Counter()
+
+    # --- one micro-batch --------------------------------------------------
+    def process(self, records: Iterable[Dict[str, Any]]) -> None:
+        records = list(records)
+        token = batch_token(records)
+        index_ops: Dict[Tuple[str, str], Optional[dict]] = {}  # None = delete
+        normalized_ops: Dict[str, Optional[dict]] = {}
+        deltas = ({}, {})  # per lookup: term -> [entry, delta]
+
+        for record in records:
+            event, old, new, keys = record_images(record)
+            self.stats["records"] += 1
+            self.stats[event or "unknown"] += 1
+            if event not in ("INSERT", "MODIFY", "REMOVE"):
+                continue
+            if event != "INSERT" and old is None:
+                # KEYS_ONLY / NEW_IMAGE streams: stale rows can't be derived
+                self.stats["missing_old_image"] += 1
+
+            before, after = index_rows(old), index_rows(new)
+            for key in before.keys() - after.keys():
+                index_ops[key] = None
+            for key, item in after.items():
+                if key not in before:
+                    index_ops[key] = item
+
+            if new is not None:
+                posting = copy.deepcopy(new)
+                if posting.get("normalized") != True:
+                    normalize.normalize_posting(posting, {}, {})
+                item = normalize.build_normalized_item(posting)
+                if item.get("Id"):
+                    normalized_ops[item["Id"]] = item
+            else:
+                job_id = keys.get("jobId") or (old or {}).get("jobId")
+                if job_id:
+                    normalized_ops[job_id] = None
+
+            for d, was, now in zip(deltas, counted_terms(old), counted_terms(new)):
+                for term in was.keys() - now.keys():
+                    d.setdefault(term, [was[term], 0])[1] -= 1
+                for term in now.keys() - was.keys():
+                    d.setdefault(term, [now[term], 0])[1] += 1
+
+        for (pk, sk), item in index_ops.items():
+            if item is None:
+                self.index_writer.delete({"PK": pk, "SK": sk})
+                self.stats["index_deletes"] += 1
+            else:
+                self.index_writer.put(item)
+                self.stats["index_puts"] += 1
+        for job_id, item in normalized_ops.items():
+            if item is None:
+                self.normalized_writer.delete({"Id": job_id})
+                self.stats["normalized_deletes"] += 1
+            else:
+                self.normalized_writer.put(item)
+                self.stats["normalized_puts"] += 1
+        self.index_writer.flush()
+        self.normalized_writer.flush()
+
+        for table, d in zip(self.lookups, deltas):
+            for term, (entry, delta) in sorted(d.items()):
+                if delta:
+                    self._apply_count(table, entry, delta, token)
+
+    def _apply_count(
+        self, table, entry: Dict[str, Any], delta: int, token: str
+    ) -> None:
+        key = {"Id": entry["Id"], "Name": entry["name"]}
+        try:
+            resp = table.update_item(
+                Key=key,
+                UpdateExpression="ADD postingCount :d, appliedBatches :t "
+                "SET createdAt = if_not_exists(createdAt, :now)",
+                ConditionExpression="NOT contains(appliedBatches, :tok)",
+                ExpressionAttributeValues={
+                    ":d": delta,
+                    ":t": {token},
+                    ":tok": token,
+                    ":now": datetime.now().isoformat(),
+                },
+                ReturnValues="UPDATED_NEW",
+            )
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            self.stats["lookup_replays"] += 1  # this batch was counted already
+            return
+        self.stats["lookup_updates"] += 1
+        applied = resp["Attributes"].get("appliedBatches") or set()
+        if len(applied) > APPLIED_BATCHES_KEPT:
+            old = sorted(applied)[: len(applied) - APPLIED_BATCHES_KEPT]
+            table.update_item(
+                Key=key,
+                UpdateExpression="DELETE appliedBatches :old",
+                ExpressionAttributeValues={":old": set(old)},
+            )
+        if resp["Attributes"]["postingCount"] <= 0:
+            try:
+                table.delete_item(
+                    Key=key,
+                    ConditionExpression="postingCount <= :z",
+                    ExpressionAttributeValues={":z": 0},
+                )
+                self.stats["lookup_deletes"] += 1
+            except table.meta.client.exceptions.ConditionalCheckFailedException:
+                pass  # a concurrent consumer counted it again
+
+    def close(self) -> None:
+        self.index_writer.close()
+        self.normalized_writer.close()
+
+    def summary(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in sorted(self.stats.items()))
+
+
+# --- Lambda entry point ---------------------------------------------------
+_consumer: Optional[StreamConsumer] = None
+
+
+def handler(event, context=None):
+    global _consumer
+    if _consumer is None:
+        _consumer = StreamConsumer()
+    _consumer.stats.clear()
+    records = event.get("Records", [])
+    for i in range(0, len(records), BATCH_RECORDS):
+        _consumer.process(records[i : i + BATCH_RECORDS])
+    print(f"stream batch: {_consumer.summary()}")
+    return dict(_consumer.stats)
+
+
+# --- JSONL replay ---------------------------------------------------------
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if "Records" in obj:
+                yield from obj["Records"]
+            else:
+                yield obj
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def replay(
+    path: str,
+    batch_records: int = BATCH_RECORDS,
+    resume: bool = False,
+    checkpoint_path: str = default_path(CHECKPOINT_JOB),
+    write_workers: int = DEFAULT_WORKERS,
+) -> StreamConsumer:
+    """
+    Apply the records in a JSONL file in order. The number of applied records
+    is checkpointed after every micro-batch; resume=True skips those.
+    """
+    done = 0
+    if resume and os.path.exists(checkpoint_path):
+        state = read_json(checkpoint_path)
+        if state.get("source") != os.path.abspath(path):
+            print(f"⚠ {checkpoint_path} was written for {state.get('source')}")
+        done = state.get("records", 0)
+        print(f"↻ Resuming after {done} records")
+
+    consumer = StreamConsumer(write_workers=write_workers)
+    batch: List[Dict[str, Any]] = []
+    seen = 0
+
+    def apply():
+        nonlocal done
+        consumer.process(batch)
+        done += len(batch)
+        batch.clear()
+        atomic_write_json(
+            checkpoint_path, {"source": os.path.abspath(path), "records": done}
+        )
+
+    try:
+        for record in read_records(path):
+            seen += 1
+            if seen <= done:
+                continue
+            batch.append(record)
+            if len(batch) >= batch_records:
+                apply()
+        if batch:
+            apply()
+    finally:
+        consumer.close()
+    return consumer
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(
+        description=f"Apply job-postings-enhanced stream records to {jtindex.INDEX_TABLE}, "
+        "job-postings-normalized and the lookup tables"
+    )
+    ap.add_argument("--file", required=True, help="JSONL of stream records ('-' = stdin)")
+    ap.add_argument("--batch", type=int, default=BATCH_RECORDS, help="records per micro-batch")
+    ap.add_argument("--resume", action="store_true", help="skip records already applied")
+    ap.add_argument("--checkpoint", default=default_path(CHECKPOINT_JOB))
+    add_writer_args(ap)
+    args = ap.parse_args()
+
+    try:
+        consumer = replay(
+            args.file,
+            batch_records=args.batch,
+            resume=args.resume,
+            checkpoint_path=args.checkpoint,
+            write_workers=args.write_workers,
+        )
+    except KeyboardInterrupt:
+        print(f"\n✗ Interrupted. Checkpoint: {args.checkpoint} (rerun with --resume)")
+        sys.exit(130)
+    print(f"✓ Done. {consumer.summary()}")
+EOF
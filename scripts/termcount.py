@@ -0,0 +1,123 @@
+cat > termcount.py << "EOF"
+#!/usr/bin/env python3
+"""
+Dictionary-encoded, vectorized form of normalize_posting()'s term counting.
+
+    counter = TermCounter(id_for=get_id_from_name)
+    for page in pages:
+        counter.add(postings_to_count)        # one call per page
+    tech_index = counter.index("technologies")
+
+Every distinct raw term is canonicalized once and given an integer id; a
+page becomes (posting, term-id) pairs, duplicates within a posting are
+dropped with np.unique and per-term posting counts come from np.bincount.
+Canonicalization cost scales with distinct terms, not mentions, and the
+resulting {canonical: {Id, name, count}} indexes are identical to the ones
+normalize_posting() builds.
+
+Unlike normalize_posting() the postings are not rewritten in place
+(build_normalized_item doesn't carry technologies/skills anyway).
+
+Requires numpy.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from canonicalize import normalize_term
+
+FIELDS = ("technologies", "skills")
+DROPPED = -1  # raw term that normalizes to nothing
+
+
+def _np():
+    try:
+        import numpy
+    except ImportError as e:
+        raise SystemExit(f"batch normalization needs numpy (pip install numpy): {e}")
+    return numpy
+
+
+class TermCounter:
+    def __init__(
+        self,
+        id_for: Callable[[str], str],
+        fields: Iterable[str] = FIELDS,
+        normalize: Callable[[str], Optional[str]] = normalize_term,
+    ):
+        self.np = _np()
+        self.id_for = id_for
+        self.fields = tuple(fields)
+        self.normalize = normalize
+        self.raw_ids: Dict[str, int] = {}  # raw term -> canonical id / DROPPED
+        self.names: List[str] = []  # canonical id -> canonical name
+        self._canon_ids: Dict[str, int] = {}
+        self.counts = {f: self.np.zeros(0, dtype=self.np.int64) for f in self.fields}
+
+    def _canonical_id(self, name: str) -> int:
+        cid = self._canon_ids.get(name)
+        if cid is None:
+            cid = self._canon_ids[name] = len(self.names)
+            self.names.append(name)
+        return cid
+
+    def _encode(self, raw: Any) -> int:
+        # same filtering as normalize_and_collect: falsy and non-str terms drop out
+        if not raw or not isinstance(raw, str):
+            return DROPPED
+        cid = self.raw_ids.get(raw)
+        if cid is None:
+            canonical = self.normalize(raw)
+            cid = self._canonical_id(canonical) if canonical else DROPPED
+            self.raw_ids[raw] = cid
+        return cid
+
+    def _grow(self, field: str):
+        c = self.counts[field]
+        if len(c) < len(self.names):
+            pad = self.np.zeros(len(self.names) - len(c), dtype=self.np.int64)
+            self.counts[field] = self.np.concatenate([c, pad])
+
+    def add(self, postings: List[Dict[str, Any]]) -> None:
+        """Count a page of postings (those normalize_posting() would count)."""
+        np = self.np
+        for field in self.fields:
+            owners: List[int] = []
+            ids: List[int] = []
+            for i, posting in enumerate(postings):
+                terms = posting.get(field)
+                # normalize_and_collect only accepts lists (not sets/strings)
+                if not terms or not isinstance(terms, list):
+                    continue
+                for raw in terms:
+                    cid = self._encode(raw)
+                    if cid != DROPPED:
+                        owners.append(i)
+                        ids.append(cid)
+            self._grow(field)
+            if not ids:
+                continue
+            n = len(self.names)
+            pairs = np.asarray(owners, dtype=np.int64) * n + np.asarray(ids, dtype=np.int64)
+            per_posting = np.unique(pairs) % n  # each term once per posting
+            self.counts[field] += np.bincount(per_posting, minlength=n)
+
+    def seed(self, field: str, index: Dict[str, Dict[str, Any]]) -> None:
+        """Start from an existing {canonical: {Id, name, count}} (e.g. a checkpoint)."""
+        for name, data in index.items():
+            self._canonical_id(name)
+        self._grow(field)
+        for name, data in index.items():
+            self.counts[field][self._canon_ids[name]] += int(data["count"])
+
+    def index(self, field: str) -> Dict[str, Dict[str, Any]]:
+        """The {canonical: {Id, name, count}} dict normalize_posting() would have built."""
+        c = self.counts[field]
+        return {
+            self.names[i]: {
+                "Id": self.id_for(self.names[i]),
+                "name": self.names[i],
+                "count": int(c[i]),
+            }
+            for i in self.np.flatnonzero(c)
+        }
+EOF
@@ -0,0 +1,198 @@
+cat > termmap.py << "EOF"
+#!/usr/bin/env python3
+"""
+Persistent raw term -> (display, slug) map shared by the index builders and
+the lookup-table writer.
+
+display is what normalize_term() gives (lookup tables, job-tech-index PK),
+slug what slugify_tech() gives (job-tech-index-v2 PK). Both are recomputed
+for every mention on every run otherwise, and nothing shows when they
+disagree. The map lives in
+
+    .termmap/termmap-<rules hash>.tsv     ($TERMMAP_DIR; /tmp/.termmap on Lambda)
+
+one file per rule set (canonicalize.rules_fingerprint()), so editing
+NORMALIZATION_RULES or STRUCTURAL_MAP starts a fresh file instead of serving
+stale answers. The file is append-only: it is memory-mapped and read once
+at startup, and only raw terms it doesn't have yet are computed and
+appended (whole lines, O_APPEND, flushed at exit). A torn last line from a
+crash is dropped on the next open. A map is safe to share between
+threads (backfill.py's sinks all go through the default one).
+
+    python3 termmap.py report     # size + displays that map to several slugs
+"""
+
+import atexit
+import mmap
+import os
+import sys
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from canonicalize import normalize_term, rules_fingerprint, slugify_tech
+
+# Lambda only lets a function write under /tmp
+TERMMAP_DIR = os.environ.get("TERMMAP_DIR") or (
+    "/tmp/.termmap" if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") else ".termmap"
+)
+FLUSH_EVERY = 1000  # pending new terms before an append
+HEADER = b"# termmap v1 "
+
+Entry = Tuple[Optional[str], str]  # (display, slug)
+
+
+def _enc(s: str) -> bytes:
+    # unicode_escape keeps every field on one line (tabs/newlines escaped)
+    return s.encode("unicode_escape")
+
+
+def _dec(b: bytes) -> str:
+    return b.decode("unicode_escape")
+
+
+class TermMap:
+    def __init__(self, path: Optional[str] = None, fingerprint: Optional[str] = None):
+        """path=None keeps the map in memory only."""
+        self.fingerprint = fingerprint or rules_fingerprint()
+        self.path = path
+        self.entries: Dict[str, Entry] = {}
+        self.loaded = 0
+        self.computed = 0
+        self._pending: List[Tuple[str, Entry]] = []
+        self._lock = threading.Lock()  # entries, _pending and the file appends
+        if path:
+            self._load()
+
+    @classmethod
+    def open(cls, directory: str = TERMMAP_DIR) -> "TermMap":
+        fp = rules_fingerprint()
+        return cls(os.path.join(directory, f"termmap-{fp[:16]}.tsv"), fp)
+
+    # --- file -------------------------------------------------------------
+    def _load(self) -> None:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            header = mm.readline()
+            if header.rstrip(b"\n") != HEADER + self.fingerprint.encode():
+                print(f"⚠ {self.path} was built for other rules; not using it")
+                self.path = None
+                return
+            end = mm.rfind(b"\n") + 1  # ignore a torn last line
+            pos = mm.tell()
+            while pos < end:
+                nl = mm.find(b"\n", pos, end)
+                raw, display, slug = mm[pos:nl].split(b"\t")
+                self.entries[_dec(raw)] = (_dec(display) or None, _dec(slug))
+                pos = nl + 1
+            size = mm.size()
+        if end < size:
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+        self.loaded = len(self.entries)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self.path or not self._pending:
+            self._pending.clear()
+            return
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        lines = [
+            b"\t".join((_enc(raw), _enc(display or ""), _enc(slug))) + b"\n"
+            for raw, (display, slug) in self._pending
+        ]
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size == 0:
+                os.write(fd, HEADER + self.fingerprint.encode() + b"\n")
+            os.write(fd, b"".join(lines))
+        finally:
+            os.close(fd)
+        self._pending.clear()
+
+    # --- lookups ----------------------------------------------------------
+    def get(self, raw: str) -> Entry:
+        """(display, slug) for a raw term, computing and recording it if new."""
+        if not isinstance(raw, str):
+            return normalize_term(raw), slugify_tech(raw)
+        hit = self.entries.get(raw)
+        if hit is not None:
+            return hit
+        entry = (normalize_term(raw), slugify_tech(raw))
+        with self._lock:
+            hit = self.entries.get(raw)
+            if hit is not None:  # another thread got there first
+                return hit
+            self.entries[raw] = entry
+            self.computed += 1
+            self._pending.append((raw, entry))
+            if len(self._pending) >= FLUSH_EVERY:
+                self._flush()
+        return entry
+
+    def display(self, raw: str) -> Optional[str]:
+        return self.get(raw)[0]
+
+    def slug(self, raw: str) -> str:
+        return self.get(raw)[1]
+
+    def summary(self) -> str:
+        return (
+            f"{self.path or '(memory)'}: {len(self.entries)} terms "
+            f"(loaded {self.loaded}, computed {self.computed})"
+        )
+
+    def drift(self) -> Dict[str, List[str]]:
+        """Display names whose raw spellings produce more than one slug."""
+        slugs = defaultdict(set)
+        with self._lock:
+            entries = list(self.entries.values())
+        for display, slug in entries:
+            if display and slug:
+                slugs[display].add(slug)
+        return {d: sorted(s) for d, s in slugs.items() if len(s) > 1}
+
+
+_default: Optional[TermMap] = None
+_default_lock = threading.Lock()
+
+
+def default_term_map() -> TermMap:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = TermMap.open()
+                atexit.register(_default.flush)
+    return _default
+
+
+def term_display(raw: str) -> Optional[str]:
+    """normalize_term() via the persisted map."""
+    return default_term_map().display(raw)
+
+
+def term_slug(raw: str) -> str:
+    """slugify_tech() via the persisted map."""
+    return default_term_map().slug(raw)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["report"]:
+        print("usage: termmap.py report")
+        sys.exit(2)
+    tm = default_term_map()
+    print(tm.summary())
+    drift = tm.drift()
+    print(f"{len(drift)} display names map to several slugs")
+    for display, slugs in sorted(drift.items()):
+        print(f"  {display}: {', '.join(slugs)}")
+EOF
@@ -0,0 +1,94 @@
+"""
+The scripts are heredocs (`cat > name.py << EOF`) that materialize the
+modules they wrap; the tests run against those, built once per session in a
+scratch directory put first on sys.path.
+
+    python3 -m pytest scripts/tests
+
+AWS calls go to stub tables, or to moto: it is started before any script
+module is imported (they create their boto3 resources at import time), and
+tests that need it skip when it isn't installed. The credentials below only
+keep boto3 from looking for real ones.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# both materialize as jtindex.py; the tests use the v2 (slug) one
+SKIP = {"job-tech-index.py"}
+
+for var, value in (
+    ("AWS_DEFAULT_REGION", "us-east-1"),
+    ("AWS_ACCESS_KEY_ID", "testing"),
+    ("AWS_SECRET_ACCESS_KEY", "testing"),
+):
+    os.environ.setdefault(var, value)
+
+
+def _materialize() -> str:
+    build = tempfile.mkdtemp(prefix="scripts-")
+    for name in sorted(os.listdir(SCRIPTS)):
+        if name.endswith(".py") and name not in SKIP:
+            subprocess.run(["bash", os.path.join(SCRIPTS, name)], cwd=build, check=True)
+    return build
+
+
+BUILD = _materialize()
+sys.path.insert(0, BUILD)
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+else:
+    mock_aws().start()
+
+# hash-only and PK/SK tables of the postings pipeline
+TABLES = {
+    "job-postings-enhanced": ["jobId"],
+    "job-postings-normalized": ["Id"],
+    "job-tech-index": ["PK", "SK"],
+    "job-tech-index-v2": ["PK", "SK"],
+    "job-postings-technologies": ["Id", "Name"],
+    "job-postings-skills": ["Id", "Name"],
+    "job-postings-benefits": ["Id", "Name"],
+    "job-postings-requirements": ["Id", "Name"],
+    "job-postings-industries": ["Id", "Name"],
+}
+
+
+@pytest.fixture(autouse=True)
+def _workdir(tmp_path, monkeypatch):
+    """Checkpoints, term maps and state files land in a per-test directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def ddb():
+    """moto DynamoDB with empty pipeline tables; dropped after the test."""
+    if mock_aws is None:
+        pytest.skip("needs moto")
+    import boto3
+
+    resource = boto3.resource("dynamodb")
+    for name, keys in TABLES.items():
+        resource.create_table(
+            TableName=name,
+            KeySchema=[
+                {"AttributeName": k, "KeyType": t}
+                for k, t in zip(keys, ("HASH", "RANGE"))
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": k, "AttributeType": "S"} for k in keys
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+    yield resource
+    for name in TABLES:
+        resource.Table(name).delete()
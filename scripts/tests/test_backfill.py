@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backfill import Sink, StatusSink
+from lifecycle import ACTIVE, EXPIRED, LifecycleEngine
+
+NOW = datetime(2026, 3, 31, 12, tzinfo=timezone.utc)
+
+
+def posting(job_id, age_days, status=ACTIVE):
+    processed = (NOW - timedelta(days=age_days)).isoformat()
+    return {"jobId": job_id, "status": status, "processed_date": processed}
+
+
+def test_status_sink_passes_on_only_the_applied_statuses(ddb, monkeypatch):
+    table = ddb.Table("job-postings-enhanced")
+    items = [posting("stale", 40), posting("broken", 40), posting("fresh", 3)]
+    for it in items:
+        table.put_item(Item=it)
+    # changed since the scan read it: the conditional update is skipped
+    items.append(posting("moved", 40))
+    table.put_item(Item=posting("moved", 1))
+
+    engine = LifecycleEngine(table, now=NOW, workers=2)
+    update_item = engine.client.update_item
+
+    def flaky(**kwargs):
+        if kwargs["Key"]["jobId"]["S"] == "broken":
+            raise RuntimeError("connection reset")
+        return update_item(**kwargs)
+
+    monkeypatch.setattr(engine.client, "update_item", flaky)
+    out = StatusSink(engine).handle(items, [None] * len(items))
+    assert [it["status"] for it in out] == [EXPIRED, ACTIVE, ACTIVE, ACTIVE]
+    assert items[0]["status"] == ACTIVE  # the scanned page isn't modified
+    c = engine.counters
+    assert (c["expired"], c["failed"], c["skipped"]) == (1, 1, 1)
+
+
+def test_a_sink_without_handle_fails_at_construction():
+    class Incomplete(Sink):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
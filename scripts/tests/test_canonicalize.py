@@ -0,0 +1,72 @@
+import random
+import re
+
+import pytest
+
+from canonicalize import GO_RULE, GO_RULE_FIXED, NORMALIZATION_RULES, Canonicalizer
+
+
+def old_normalize_term(term, rules=NORMALIZATION_RULES):
+    """The per-call regex loop Canonicalizer replaced (skillsandtech.py)."""
+    if not term or not isinstance(term, str):
+        return None
+    cleaned = term.strip().lower()
+    if not cleaned:
+        return None
+    cleaned = re.sub(r"[\s\-_\.]+", "", cleaned)
+    for pattern, canonical in rules.items():
+        if re.match(pattern, cleaned):
+            return canonical
+    normalized = term.strip()
+    parts = normalized.split(".")
+    parts = [p.title() for p in parts]
+    normalized = ".".join(parts)
+    return normalized
+
+
+def fixed_rules():
+    rules = NORMALIZATION_RULES.items()
+    return {(GO_RULE_FIXED if p == GO_RULE else p): c for p, c in rules}
+
+
+def corpus(n=20000, seed=11):
+    # each rule with its regex syntax stripped, plus near misses
+    words = [
+        re.sub(r"\\(.)", r"\1", re.sub(r"\(\?:|[\^$?()|]", "", p))
+        for p in NORMALIZATION_RULES
+    ]
+    words += ["golang", "golangci", "go", "cargo", "django", "mongo", "node.js"]
+    pieces = words + [".", "-", "_", " ", "js", ".js", "sql", "db", "script", "Go", "x"]
+    rng = random.Random(seed)
+    terms = list(words) + [None, 42, "", "   ", "...", "\t-\n"]
+    for _ in range(n):
+        term = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.5:
+            term = "".join(c.upper() if rng.random() < 0.3 else c for c in term)
+        if rng.random() < 0.2:
+            term = f" {term}\t"
+        terms.append(term)
+    return terms
+
+
+@pytest.mark.parametrize("fix", [False, True])
+def test_matches_the_old_rule_loop(fix):
+    canon = Canonicalizer(fix_go_precedence=fix)
+    rules = fixed_rules() if fix else NORMALIZATION_RULES
+    for term in corpus():
+        assert canon.normalize(term) == old_normalize_term(term, rules), term
+
+
+@pytest.mark.parametrize(
+    "term, quirk, fixed",
+    [
+        ("golangci", "Go", "Golangci"),
+        ("golang-ci", "Go", "Golang-Ci"),
+        ("go", "Go", "Go"),
+        ("Golang", "Go", "Go"),
+        ("django", "Django", "Django"),
+    ],
+)
+def test_go_precedence(term, quirk, fixed):
+    assert Canonicalizer().normalize(term) == quirk
+    assert Canonicalizer(fix_go_precedence=True).normalize(term) == fixed
@@ -0,0 +1,28 @@
+import argparse
+
+import pytest
+
+from capacity import CapacityGovernor, TokenBucket, add_capacity_args
+
+
+def parse(*argv):
+    return add_capacity_args(argparse.ArgumentParser()).parse_args(argv)
+
+
+@pytest.mark.parametrize("flag", ["--max-rcu", "--max-wcu", "--capacity-pct"])
+@pytest.mark.parametrize("value", ["0", "-5"])
+def test_non_positive_limits_are_rejected(flag, value):
+    with pytest.raises(SystemExit):
+        parse(flag, value)
+
+
+def test_limits_parse():
+    args = parse("--max-rcu", "50", "--max-wcu", "2.5")
+    gov = CapacityGovernor.for_tables(max_rcu=args.max_rcu, max_wcu=args.max_wcu)
+    assert (gov.read.target, gov.write.target) == (50.0, 2.5)
+    assert not TokenBucket("RCU", None).limited
+
+
+def test_zero_rate_bucket_is_an_error():
+    with pytest.raises(ValueError):
+        TokenBucket("RCU", 0)
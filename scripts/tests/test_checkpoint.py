@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+import pytest
+
+from checkpoint import Checkpoint, CheckpointMismatch, dumps, loads
+
+
+def test_commit_persists_only_pages_marked_so_far():
+    cp = Checkpoint.open("cp.json", "job", 2)
+    cp.page_done(0, {"jobId": "j9"})
+    cp.commit(scanned=10)
+    cp.page_done(1, None)  # marked, never committed
+
+    again = Checkpoint.open("cp.json", "job", 2, resume=True)
+    assert again.resumed
+    assert again.counters == {"scanned": 10}
+    assert again.remaining_segments() == [0, 1]
+    assert again.start_keys() == {0: {"jobId": "j9"}, 1: None}
+    assert not again.complete
+
+
+def test_resume_keeps_the_checkpoint_segment_count():
+    cp = Checkpoint.open("cp.json", "job", 4)
+    cp.page_done(2, None)
+    cp.commit()
+    again = Checkpoint.open("cp.json", "job", 8, resume=True)
+    assert again.total_segments == 4
+    assert again.remaining_segments() == [0, 1, 3]
+
+
+def test_finish_and_fresh_runs_discard_the_file():
+    cp = Checkpoint.open("cp.json", "job")
+    cp.page_done(0, {"jobId": "j1"})
+    cp.commit()
+    Checkpoint.open("cp.json", "job")  # resume=False: start over
+    assert not Checkpoint.open("cp.json", "job", resume=True).resumed
+
+    cp = Checkpoint.open("cp.json", "job")
+    cp.page_done(0, None)
+    cp.commit()
+    cp.finish()
+    assert not Checkpoint.open("cp.json", "job", resume=True).resumed
+
+
+def test_other_jobs_checkpoint_is_refused():
+    Checkpoint.open("cp.json", "job").commit()
+    with pytest.raises(CheckpointMismatch):
+        Checkpoint.open("cp.json", "other", resume=True)
+
+
+def test_keys_and_counters_round_trip():
+    value = {"n": Decimal("1.5"), "b": b"\x00\xff", "s": {"a", "b"}, "l": [1, None]}
+    assert loads(dumps(value)) == value
+    cp = Checkpoint.open("cp.json", "job")
+    cp.page_done(0, {"jobId": "j1", "n": Decimal(3)})
+    cp.commit(index={"python": {"count": Decimal(2)}})
+    again = Checkpoint.open("cp.json", "job", resume=True)
+    assert again.start_keys() == {0: {"jobId": "j1", "n": Decimal(3)}}
+    assert again.counters["index"] == {"python": {"count": Decimal(2)}}
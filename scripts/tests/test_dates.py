@@ -0,0 +1,42 @@
+import pytest
+
+import dates
+from dates import SENTINEL_ISO, iso_utc, parse_datetime
+
+# same digit shapes, different parsers: the order seen must not matter
+INPUTS = [
+    "17000000",
+    "20251005",
+    "1760000000",
+    "2025-10-05",
+    "2025-02-30",
+    "2025-10-05T10:00:00Z",
+    "10/05/2025",
+    "13/05/2025",
+    "Sun, 05 Oct 2025 10:00:00 GMT",
+    "5 Oct 2025",
+]
+
+
+def parse_all(values):
+    dates._parse.cache_clear()
+    return {v: iso_utc(v) for v in values}
+
+
+def test_results_do_not_depend_on_input_order():
+    assert parse_all(INPUTS) == parse_all(list(reversed(INPUTS)))
+
+
+def test_epoch_and_iso_values():
+    assert iso_utc(1760000000) == "2025-10-09T08:53:20+00:00"
+    assert iso_utc(1760000000000) == iso_utc("1760000000")
+    assert iso_utc("2025-10-05T10:00:00+02:00") == "2025-10-05T08:00:00+00:00"
+    assert parse_datetime(True) is None
+
+
+@pytest.mark.parametrize("value", [None, "", "not a date", ["2025-10-05"]])
+def test_unparseable_follows_policy(value):
+    assert iso_utc(value) == SENTINEL_ISO
+    assert iso_utc(value, on_error="skip") is None
+    with pytest.raises(dates.UnparseableDate):
+        iso_utc(value, on_error="error")
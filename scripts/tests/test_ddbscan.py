@@ -0,0 +1,84 @@
+import pytest
+
+from checkpoint import Checkpoint
+from ddbscan import scan_pages
+
+
+class NoScanTable:
+    name = "job-postings-enhanced"
+
+    def scan(self, **kwargs):
+        raise AssertionError(f"unexpected scan: {kwargs}")
+
+
+class PagedTable:
+    """Two pages, keys {"n": page}."""
+
+    name = "job-postings-enhanced"
+
+    def scan(self, ExclusiveStartKey=None, **kwargs):
+        page = (ExclusiveStartKey or {}).get("n", 0)
+        resp = {"Items": [{"jobId": f"0-{page}"}]}
+        if page == 0:
+            resp["LastEvaluatedKey"] = {"n": 1}
+        return resp
+
+
+@pytest.mark.parametrize("segments", [1, 4])
+def test_empty_only_segments_yields_nothing(segments):
+    states = {}
+    pages = scan_pages(
+        NoScanTable(), segments=segments, only_segments=[], states=states
+    )
+    assert list(pages) == []
+    assert states == {}
+
+
+def test_resume_scans_only_the_remaining_pages():
+    cp = Checkpoint.open("cp.json", "test")
+    cp.page_done(0, {"n": 1})
+    cp.commit(scanned=1)
+    cp = Checkpoint.open("cp.json", "test", resume=True)
+    pages = scan_pages(
+        PagedTable(),
+        segments=cp.total_segments,
+        only_segments=cp.remaining_segments(),
+        start_keys=cp.start_keys(),
+    )
+    assert [j["jobId"] for page in pages for j in page.items] == ["0-1"]
+
+
+def test_finished_checkpoint_has_nothing_to_scan():
+    cp = Checkpoint.open("cp.json", "test", 2)
+    cp.page_done(0, None)
+    cp.page_done(1, None)
+    cp.commit(scanned=4)
+    cp = Checkpoint.open("cp.json", "test", resume=True)
+    assert cp.complete and cp.start_keys() == {}
+    pages = scan_pages(
+        NoScanTable(),
+        segments=cp.total_segments,
+        only_segments=cp.remaining_segments(),
+        start_keys=cp.start_keys(),
+    )
+    assert list(pages) == []
+
+
+def test_parallel_scan_reads_the_callers_region(ddb):
+    import boto3
+
+    resource = boto3.resource("dynamodb", region_name="eu-west-1")
+    table = resource.create_table(
+        TableName="scan-region",
+        KeySchema=[{"AttributeName": "jobId", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "jobId", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    for n in range(20):
+        table.put_item(Item={"jobId": f"j{n}"})
+    states = {}
+    pages = scan_pages(table, segments=4, states=states)
+    ids = sorted(j["jobId"] for page in pages for j in page.items)
+    assert ids == sorted(f"j{n}" for n in range(20))
+    assert all(s.done and s.error is None for s in states.values())
+    table.delete()
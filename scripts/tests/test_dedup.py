@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from dedup import DedupIndex
+
+VOCAB = [f"w{i}" for i in range(500)]
+
+
+def posting(job_id, words, title="Backend Engineer", company="Acme Inc"):
+    return {
+        "jobId": job_id,
+        "job_description": " ".join(words),
+        "job_title": title,
+        "company_name": company,
+    }
+
+
+def text(seed, n=200):
+    rng = random.Random(seed)
+    return [rng.choice(VOCAB) for _ in range(n)]
+
+
+def edited(words, at=100):
+    return words[:at] + ["reposted"] + words[at + 1 :]
+
+
+def test_near_duplicates_land_in_one_cluster():
+    words = text(1)
+    items = [
+        posting("a", words),
+        posting("b", edited(words), company="ACME, LLC"),
+        posting("c", edited(words, at=20)),
+    ]
+    index = DedupIndex()
+    assert index.check(items) == [None, "a", "a"]
+    assert index.duplicates == 2
+
+
+def test_distinct_postings_stay_apart():
+    words = text(1)
+    items = [posting(f"p{k}", text(k)) for k in range(2, 12)]
+    items.append(posting("other-co", edited(words), company="Globex"))
+    items.append(posting("short", words[:5]))
+    index = DedupIndex()
+    assert index.check([posting("a", words)] + items) == [None] * (len(items) + 1)
+    assert index.unchecked == 1
+
+
+def test_incremental_run_checks_only_new_postings():
+    words = text(1)
+    first = DedupIndex.open("dd")
+    assert first.check([posting("a", words), posting("b", text(2))]) == [None, None]
+    first.save()
+
+    second = DedupIndex.open("dd")
+    assert len(second) == 2 and second.chunks
+    hashed = []
+    signatures = second.signatures
+    second.signatures = lambda sets: hashed.append(len(sets)) or signatures(sets)
+    page = [posting("a", words), posting("c", edited(words)), posting("b", text(2))]
+    assert second.check(page) == [None, "a", None]
+    assert hashed == [1]
+    assert (second.checked, second.known, second.duplicates) == (1, 2, 1)
+    second.save()
+    assert DedupIndex.open("dd").check([posting("c", [])]) == ["a"]
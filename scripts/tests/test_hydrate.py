@@ -0,0 +1,87 @@
+import hydrate
+from hydrate import Hydrator, ItemCache
+
+
+def fill(ddb, n):
+    table = ddb.Table("job-postings-normalized")
+    with table.batch_writer() as batch:
+        for i in range(n):
+            batch.put_item(Item={"Id": f"j{i}", "job_title": f"Title {i}", "x": 1})
+    return table
+
+
+def test_get_returns_postings_in_key_order(ddb):
+    hydrator = Hydrator(fill(ddb, 250), attrs=["job_title"], workers=4)
+    keys = [f"j{i}" for i in range(249, -1, -2)] + ["gone", "j3", "j249", "gone"]
+    items = hydrator.get(keys)
+    assert [it and it["Id"] for it in items] == [
+        None if k == "gone" else k for k in keys
+    ]
+    assert items[0] == {"Id": "j249", "job_title": "Title 249"}  # projected
+    assert hydrator.calls == 2  # 126 distinct keys, 100 per BatchGetItem
+    assert (hydrator.fetched, hydrator.missing) == (125, 1)
+
+
+def test_missing_postings_are_cached(ddb):
+    hydrator = Hydrator(fill(ddb, 3), attrs=[])
+    assert hydrator.get(["j0", "gone"]) == [{"Id": "j0"}, None]
+    calls = hydrator.calls
+    assert hydrator.get(["gone", "j0"]) == [None, {"Id": "j0"}]
+    assert hydrator.calls == calls and hydrator.cache.hits == 2
+
+
+def test_unprocessed_keys_are_retried(ddb, monkeypatch):
+    hydrator = Hydrator(fill(ddb, 10), attrs=["job_title"])
+    batch_get_item = hydrator.client.batch_get_item
+    requests = []
+
+    def partial(RequestItems, **kwargs):
+        # answer only the first key of each call, hand the rest back
+        name, request = next(iter(RequestItems.items()))
+        requests.append(len(request["Keys"]))
+        first, rest = request["Keys"][:1], request["Keys"][1:]
+        resp = batch_get_item(RequestItems={name: {**request, "Keys": first}})
+        if rest:
+            resp["UnprocessedKeys"] = {name: {**request, "Keys": rest}}
+        return resp
+
+    monkeypatch.setattr(hydrator.client, "batch_get_item", partial)
+    monkeypatch.setattr(hydrate.time, "sleep", lambda s: None)
+    keys = [f"j{i}" for i in range(4)]
+    assert [it["Id"] for it in hydrator.get(keys)] == keys
+    assert requests == [4, 3, 2, 1]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(hydrate.time, "monotonic", clock)
+    cache = ItemCache(max_items=10, ttl=60)
+    cache.store("a", {"Id": "a"})
+    cache.store("gone", None)
+    clock.now += 59
+    assert cache.lookup("a") == (True, {"Id": "a"})
+    assert cache.lookup("gone") == (True, None)
+    clock.now += 2
+    assert cache.lookup("a") == (False, None)
+    assert len(cache) == 1 and (cache.hits, cache.misses) == (2, 1)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ItemCache(max_items=2)
+    cache.store("a", {"Id": "a"})
+    cache.store("b", {"Id": "b"})
+    assert cache.lookup("a")[0]  # a is now the most recent
+    cache.store("c", {"Id": "c"})
+    assert [cache.lookup(k)[0] for k in ("a", "b", "c")] == [True, False, True]
+    assert cache.evicted == 1
+    disabled = ItemCache(max_items=0)
+    disabled.store("a", {"Id": "a"})
+    assert len(disabled) == 0
@@ -0,0 +1,115 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from checkpoint import read_json
+from lifecycle import ACTIVE, EXPIRED, STATUS_INDEX, LifecycleEngine
+
+NOW = datetime(2026, 3, 31, 12, tzinfo=timezone.utc)
+
+
+class RecordingWriter:
+    table_name = "job-tech-index-v2"
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.puts, self.deletes, self.flushes = [], [], 0
+
+    def put(self, item):
+        self.puts.append(item)
+
+    def delete(self, key):
+        self.deletes.append(key)
+
+    def flush(self):
+        self.flushes += 1
+        if self.fail:
+            raise RuntimeError("index write failed")
+
+
+def rows(j):
+    sk = f"{j['status']}#{j['processed_date']}#{j['jobId']}"
+    return [{"PutRequest": {"Item": {"PK": "python", "SK": sk}}}]
+
+
+@pytest.fixture
+def jobs(ddb):
+    table = ddb.create_table(
+        TableName="lifecycle-jobs",
+        KeySchema=[{"AttributeName": "jobId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": a, "AttributeType": "S"}
+            for a in ("jobId", "status", "processed_date")
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": STATUS_INDEX,
+                "KeySchema": [
+                    {"AttributeName": "status", "KeyType": "HASH"},
+                    {"AttributeName": "processed_date", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    for n, age in enumerate((32, 33, 5)):
+        processed = (NOW - timedelta(days=age)).isoformat()
+        table.put_item(
+            Item={"jobId": f"j{n}", "status": ACTIVE, "processed_date": processed}
+        )
+    yield table
+    table.delete()
+
+
+def engine_for(table, writer):
+    return LifecycleEngine(table, indexes=[(writer, rows)], now=NOW, workers=2)
+
+
+def statuses(table):
+    return {it["jobId"]: it["status"] for it in table.scan()["Items"]}
+
+
+def test_daily_run_expires_reindexes_and_advances(jobs):
+    writer = RecordingWriter()
+    engine = engine_for(jobs, writer)
+    assert engine.run_daily("state.json") == 2
+    assert statuses(jobs) == {"j0": EXPIRED, "j1": EXPIRED, "j2": ACTIVE}
+    assert sorted(r["SK"].split("#")[0] for r in writer.puts) == [EXPIRED] * 2
+    assert len(writer.deletes) == 2 and writer.flushes == 1
+    assert read_json("state.json")["cutoff_day"] == "2026-03-01"
+
+
+def test_failed_update_leaves_the_state_alone(jobs, monkeypatch):
+    writer = RecordingWriter()
+    engine = engine_for(jobs, writer)
+    update_item = engine.client.update_item
+
+    def flaky(**kwargs):
+        if kwargs["Key"]["jobId"]["S"] == "j1":
+            raise RuntimeError("connection reset")
+        return update_item(**kwargs)
+
+    monkeypatch.setattr(engine.client, "update_item", flaky)
+    with pytest.raises(RuntimeError, match="1 of 2 status updates failed"):
+        engine.run_daily("state.json")
+    assert not os.path.exists("state.json")
+    assert writer.flushes == 1  # the applied one's rows still land
+    assert statuses(jobs)["j1"] == ACTIVE
+    assert engine.counters["failed"] == 1 and engine.counters["expired"] == 1
+
+
+def test_failed_flush_leaves_the_state_alone(jobs):
+    engine = engine_for(jobs, RecordingWriter(fail=True))
+    with pytest.raises(RuntimeError, match="index write failed"):
+        engine.run_daily("state.json")
+    assert not os.path.exists("state.json")
+
+
+def test_dry_run_changes_and_records_nothing(jobs):
+    writer = RecordingWriter()
+    engine = LifecycleEngine(jobs, indexes=[(writer, rows)], now=NOW, dry_run=True)
+    assert engine.run_daily("state.json") == 2
+    assert set(statuses(jobs).values()) == {ACTIVE}
+    assert not writer.puts and not os.path.exists("state.json")
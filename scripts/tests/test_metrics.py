@@ -0,0 +1,42 @@
+import json
+import threading
+
+from metrics import Metrics
+
+
+def hammer(metrics, threads=4, stages=300):
+    errors = []
+
+    def work():
+        for _ in range(stages):
+            try:
+                with metrics.stage("handle", items=1):
+                    pass
+            except Exception as e:
+                errors.append(e)
+
+    pool = [threading.Thread(target=work) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return errors
+
+
+def test_concurrent_prom_emits_do_not_race(tmp_path):
+    path = tmp_path / "run.prom"
+    metrics = Metrics("test", str(path), interval=0)
+    assert hammer(metrics) == []
+    metrics.close()
+    text = path.read_text()
+    assert 'backfill_stage_calls_total{job="test",stage="handle"} 1200' in text
+    assert [p.name for p in tmp_path.iterdir()] == ["run.prom"]
+
+
+def test_concurrent_json_emits_write_whole_lines(tmp_path):
+    path = tmp_path / "run.jsonl"
+    metrics = Metrics("test", str(path), interval=0)
+    assert hammer(metrics) == []
+    metrics.close()
+    snaps = [json.loads(line) for line in path.read_text().splitlines()]
+    assert snaps[-1]["stages"]["handle"]["calls"] == 1200
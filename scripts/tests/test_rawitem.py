@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
+
+from rawitem import ClientTable, RawItem, decode
+
+ITEM = {
+    "jobId": "j1",
+    "title": "",
+    "technologies": ["Python", "AWS"],
+    "mixed": ["Python", Decimal(3), None, {"k": "v"}],
+    "empty": [],
+    "tags": {"a", "b"},
+    "scores": {Decimal(1), Decimal("2.5")},
+    "count": Decimal(12),
+    "ratio": Decimal("0.25"),
+    "remote": True,
+    "salary_mentioned": False,
+    "nothing": None,
+    "meta": {"source": "x", "n": Decimal(1), "l": ["a"]},
+    "blob": Binary(b"\x00\x01"),
+}
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+WIRE = {k: _serializer.serialize(v) for k, v in ITEM.items()}
+
+
+@pytest.mark.parametrize("name", sorted(ITEM))
+def test_decode_matches_type_deserializer(name):
+    expected = _deserializer.deserialize(WIRE[name])
+    got = decode(WIRE[name])
+    assert got == expected
+    assert type(got) is type(expected)
+
+
+def test_raw_item_reads_like_the_resource_item():
+    item = RawItem(WIRE)
+    assert dict(item) == ITEM
+    assert len(item) == len(ITEM) and set(item) == set(ITEM)
+    assert "nothing" in item and "missing" not in item
+    assert item.get("missing", 7) == 7
+    assert item.get("nothing", 7) is None
+    assert item["technologies"] is item["technologies"]  # decoded once
+    with pytest.raises(KeyError):
+        item["missing"]
+    assert item.raw is WIRE
+
+
+class StubClient:
+    def __init__(self):
+        self.calls = []
+
+    def scan(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"Items": [WIRE], "LastEvaluatedKey": {"jobId": {"S": "j1"}}}
+
+
+def test_client_table_speaks_wire_format(monkeypatch):
+    import rawitem
+
+    client = StubClient()
+    monkeypatch.setattr(rawitem, "low_level_client", lambda table: client)
+
+    class Table:
+        name = "job-postings-enhanced"
+
+    resp = ClientTable(Table()).scan(
+        ExclusiveStartKey={"jobId": "j0"},
+        FilterExpression="#s = :s",
+        ExpressionAttributeValues={":s": "Active"},
+    )
+    (call,) = client.calls
+    assert call["TableName"] == "job-postings-enhanced"
+    assert call["ExclusiveStartKey"] == {"jobId": {"S": "j0"}}
+    assert call["ExpressionAttributeValues"] == {":s": {"S": "Active"}}
+    assert resp["LastEvaluatedKey"] == {"jobId": "j1"}
+    assert dict(resp["Items"][0]) == ITEM
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from salary import ACCURACY, HOURS_PER_YEAR, SalaryRange, SalarySketches, parse_salary
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("$120k-$150k", SalaryRange(120_000, 150_000, 135_000)),
+        ("120,000 - 150,000 USD", SalaryRange(120_000, 150_000, 135_000)),
+        ("$55/hr", SalaryRange(55, 55, 55 * HOURS_PER_YEAR)),
+        ("$120-150k", SalaryRange(120_000, 150_000, 135_000)),
+        ("$90,000 + 401(k) match", SalaryRange(90_000, 90_000, 90_000)),
+        ("5+ years, $100k", SalaryRange(100_000, 100_000, 100_000)),
+        ("$500/day", SalaryRange(500, 500, 130_000)),
+        ("3 years experience", None),
+        ("401k", None),
+        ("$12", None),  # below MIN_ANNUAL
+        ("$5m", None),  # above MAX_ANNUAL
+        ("Competitive", None),
+        ("", None),
+        (None, None),
+        (120000, None),
+    ],
+)
+def test_parse_salary(raw, expected):
+    assert parse_salary(raw) == expected
+
+
+def test_not_mentioned_is_ignored():
+    assert parse_salary("$120k-$150k", mentioned=False) is None
+
+
+def salaries(seed, n=2000):
+    rng = random.Random(seed)
+    return [(rng.randrange(5), rng.lognormvariate(11.6, 0.4)) for _ in range(n)]
+
+
+def sketch(rows):
+    s = SalarySketches()
+    for key, annual in rows:
+        if 20_000 <= annual <= 1_000_000:
+            s.add(key, annual)
+    return s
+
+
+def test_quantiles_are_within_accuracy():
+    rows = [(k, v) for k, v in salaries(1) if 20_000 <= v <= 1_000_000]
+    stats = sketch(rows).quantiles()
+    assert stats.keys.tolist() == [0, 1, 2, 3, 4]
+    for i, key in enumerate(stats.keys.tolist()):
+        values = sorted(v for k, v in rows if k == key)
+        assert stats.n[i] == len(values)
+        for q, got in stats.quantiles.items():
+            exact = values[int((len(values) - 1) * q)]  # nearest rank
+            assert abs(got[i] - exact) <= ACCURACY * exact
+        assert abs(stats.min[i] - values[0]) <= ACCURACY * values[0]
+        assert abs(stats.max[i] - values[-1]) <= ACCURACY * values[-1]
+
+
+def test_merge_equals_union():
+    a, b = salaries(2), salaries(3)
+    merged = sketch(a)
+    merged.merge(sketch(b))
+    union = sketch(a + b)
+    assert np.array_equal(merged.counts.keys, union.counts.keys)
+    assert np.array_equal(merged.counts.counts, union.counts.counts)
+    m, u = merged.quantiles(), union.quantiles()
+    for q in m.quantiles:
+        assert np.array_equal(m.quantiles[q], u.quantiles[q])
+
+    shifted = sketch(a)  # the other side numbers its keys from 10
+    shifted.merge(sketch([(k + 10, v) for k, v in b]), remap=lambda keys: keys - 10)
+    assert np.array_equal(shifted.counts.keys, union.counts.keys)
+    assert np.array_equal(shifted.counts.counts, union.counts.counts)
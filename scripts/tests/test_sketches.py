@@ -0,0 +1,125 @@
+import random
+from collections import Counter
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from sketches import HyperLogLogs, SpaceSaving, capacity_for, hash64, precision_for
+
+SIZES = {1: 10, 2: 500, 3: 5_000, 4: 50_000}  # key -> distinct jobs
+
+
+def hll(items, precision=12):
+    h = HyperLogLogs(precision, buffer_codes=1000)
+    for keys, job in items:
+        h.add(keys, hash64(job))
+    return h
+
+
+def jobs(lo, hi, keys=(1,)):
+    return [(keys, f"job{n}") for n in range(lo, hi)]
+
+
+def test_hll_estimates_are_within_the_standard_error():
+    items = [
+        ((key, 9), f"{key}-{n}") for key, size in SIZES.items() for n in range(size)
+    ]
+    h = hll(items + items[::3])  # repeats don't count
+    keys, est = h.estimate()
+    truth = {**SIZES, 9: sum(SIZES.values())}
+    assert keys.tolist() == sorted(truth)
+    for key, e in zip(keys.tolist(), est.tolist()):
+        assert abs(e - truth[key]) <= 4 * h.std_error * truth[key], key
+    assert precision_for(0.02) == 12 and h.std_error < 0.02
+
+
+def test_hll_merge_is_the_registerwise_max():
+    a, b = hll(jobs(0, 3000)), hll(jobs(2000, 6000))
+    union = hll(jobs(0, 6000))
+    a.merge(b)
+    assert np.array_equal(a.state()["codes"], union.state()["codes"])
+    assert np.array_equal(a.state()["ranks"], union.state()["ranks"])
+
+    shifted = hll(jobs(0, 3000))  # the other side numbers its keys from 10
+    shifted.merge(hll(jobs(2000, 6000, keys=(11,))), remap=lambda keys: keys - 10)
+    for name in ("codes", "ranks"):
+        assert np.array_equal(shifted.state()[name], union.state()[name])
+    with pytest.raises(ValueError):
+        a.merge(hll([], precision=10))
+
+
+def test_hll_state_round_trip():
+    h = hll(jobs(0, 2500, keys=(1, 2)))
+    h.add([3], hash64("pending"))  # still in the buffer
+    restored = HyperLogLogs(12)
+    restored.load(**h.state())
+    for got, want in zip(restored.estimate(), h.estimate()):
+        assert np.array_equal(got, want)
+
+
+def stream(seed, n=5000, labels=200):
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) for i in range(labels)]  # Zipf
+    return rng.choices([f"title{i}" for i in range(labels)], weights, k=n)
+
+
+def check_bounds(ss, key, labels):
+    truth = Counter(labels)
+    bound = ss.error_bound(key)
+    assert bound == len(labels) / ss.capacity
+    summary = ss.summaries[key]
+    for label, count in summary.items():
+        assert truth[label] <= count <= truth[label] + bound, label
+    for label, count in truth.items():
+        if count > bound:  # heavy hitters are always kept
+            assert label in summary, label
+
+
+def test_space_saving_counts_within_n_over_capacity():
+    ss = SpaceSaving(capacity_for(0.02))
+    labels = stream(1)
+    for label in labels:
+        ss.add(7, label)
+    assert len(ss.summaries[7]) == 50
+    check_bounds(ss, 7, labels)
+    assert list(ss.top(7, 3)) == ["title0", "title1", "title2"]
+
+    exact = SpaceSaving()
+    for label in labels:
+        exact.add(7, label)
+    assert exact.summaries[7] == Counter(labels) and exact.error_bound(7) == 0
+
+
+def test_space_saving_merge():
+    mine, theirs = SpaceSaving(2), SpaceSaving(2)
+    for label in "aaaaabbb":
+        mine.add(1, label)
+    for label in "aacccccd":
+        theirs.add(1, label)
+    assert theirs.summaries[1] == {"c": 5, "d": 3}  # d took a's place
+    mine.merge(theirs)
+    # missing labels count as the other side's minimum (Agarwal et al.)
+    assert mine.summaries[1] == {"a": 5 + 3, "c": 3 + 5}
+    assert mine.totals[1] == 16
+
+    a, b = stream(2), stream(3)
+    left, right = SpaceSaving(40), SpaceSaving(40)
+    for label in a:
+        left.add(1, label)
+    for label in b:
+        right.add(5, label)
+    left.merge(right, remap=lambda key: key - 4)
+    check_bounds(left, 1, a + b)
+    with pytest.raises(ValueError):
+        left.merge(SpaceSaving(10))
+
+
+def test_space_saving_state_round_trip():
+    ss = SpaceSaving(10)
+    for key in (1, 2):
+        for label in stream(key, n=300):
+            ss.add(key, label)
+    restored = SpaceSaving(10)
+    restored.load(**ss.state())
+    assert restored.summaries == ss.summaries and restored.totals == ss.totals
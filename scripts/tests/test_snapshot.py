@@ -0,0 +1,103 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from checkpoint import Checkpoint
+from snapshot import Snapshot, export
+from statusadd import CHECKPOINT_JOB, batch_update_items
+
+
+class StubTable:
+    name = "job-postings-enhanced"
+
+    def __init__(self, n):
+        self.items = [
+            {"jobId": f"j{i}", "processed_date": "2025-10-01T00:00:00Z"}
+            for i in range(n)
+        ]
+
+    def scan(self, **kwargs):
+        return {"Items": [dict(it) for it in self.items]}
+
+
+class Stats:
+    def summary(self):
+        return "stub"
+
+
+class FailingCloseWriter:
+    """Every flush lands; the final close fails (once)."""
+
+    table_name = "job-tech-index-v2"
+    stats = Stats()
+
+    def __init__(self, fail: bool):
+        self.fail = fail
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.fail:
+            raise RuntimeError("index write failed")
+
+
+class CountingEngine:
+    def __init__(self, writer):
+        self.index_writers = [writer]
+        self.items = 0
+
+    def flush_indexes(self):
+        for writer in self.index_writers:
+            writer.flush()
+
+    def transitions(self, items):
+        for it in items:
+            yield it, "Expired"
+
+    def update(self, moves):
+        self.items += len(moves)
+        return ["applied"] * len(moves)
+
+    def summary(self):
+        return f"{self.items} items"
+
+
+@pytest.fixture
+def snap_path():
+    export(StubTable(5), "snap.parquet")
+    return "snap.parquet"
+
+
+def test_pages_from_a_finished_checkpoint_is_empty(snap_path):
+    cp = Checkpoint.open("cp.json", "test")
+    for page in Snapshot(snap_path).pages_from(cp.start_keys()):
+        cp.page_done(page.segment, page.last_key)
+    cp.commit()
+    assert cp.complete
+    assert list(Snapshot(snap_path).pages_from(cp.start_keys())) == []
+    assert sum(len(p.items) for p in Snapshot(snap_path).pages_from(None)) == 5
+
+
+def test_resume_after_scan_finished_but_close_failed(snap_path, capsys):
+    first = CountingEngine(FailingCloseWriter(fail=True))
+    assert not batch_update_items(
+        StubTable(0), checkpoint_path="cp.json", snapshot=snap_path, engine=first
+    )
+    assert first.items == 5
+    cp = Checkpoint.open("cp.json", f"{CHECKPOINT_JOB}@snapshot", resume=True)
+    assert cp.complete and cp.counters == {"processed": 5, "updated": 5}
+
+    capsys.readouterr()
+    again = CountingEngine(FailingCloseWriter(fail=False))
+    assert batch_update_items(
+        StubTable(0),
+        resume=True,
+        checkpoint_path="cp.json",
+        snapshot=snap_path,
+        engine=again,
+    )
+    assert again.items == 0  # no rows re-read, restored counts not added twice
+    out = capsys.readouterr().out
+    assert "Successfully updated 5 items" in out
+    assert "Total processed: 5" in out
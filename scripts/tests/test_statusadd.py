@@ -0,0 +1,81 @@
+import os
+
+from checkpoint import Checkpoint, default_path
+from lifecycle import APPLIED, EXPIRED, FAILED
+from statusadd import CHECKPOINT_JOB, batch_update_items
+
+
+class NoScanTable:
+    name = "job-postings-enhanced"
+
+    def scan(self, **kwargs):
+        raise AssertionError(f"unexpected scan: {kwargs}")
+
+
+class TwoPageTable:
+    name = "job-postings-enhanced"
+
+    def scan(self, ExclusiveStartKey=None, **kwargs):
+        if ExclusiveStartKey:
+            return {"Items": [{"jobId": "b"}]}
+        return {"Items": [{"jobId": "a"}], "LastEvaluatedKey": {"jobId": "a"}}
+
+
+class CountingEngine:
+    index_writers = []
+
+    def __init__(self, dry_run=False, fail_after=None, outcome=APPLIED):
+        self.dry_run = dry_run
+        self.fail_after = fail_after
+        self.outcome = outcome  # of the updates after fail_after items
+        self.items = 0
+
+    def transitions(self, items):
+        if self.items == self.fail_after and self.outcome == APPLIED:
+            raise RuntimeError("interrupted")
+        for it in items:
+            yield it, EXPIRED
+
+    def update(self, moves):
+        outcome = APPLIED if self.items != self.fail_after else self.outcome
+        self.items += len(moves)
+        return [outcome] * len(moves)
+
+    def flush_indexes(self):
+        pass
+
+    def summary(self):
+        return f"{self.items} items"
+
+
+def test_resume_of_a_finished_scan_does_not_rescan(capsys):
+    cp = Checkpoint.open("cp.json", CHECKPOINT_JOB)
+    cp.page_done(0, None)
+    cp.commit(processed=5, updated=2)
+    engine = CountingEngine()
+    assert batch_update_items(
+        NoScanTable(), resume=True, checkpoint_path="cp.json", engine=engine
+    )
+    assert engine.items == 0
+    out = capsys.readouterr().out
+    assert "Successfully updated 2 items" in out
+    assert "Total processed: 5" in out
+
+
+def test_interrupted_dry_run_leaves_the_real_checkpoint_alone():
+    engine = CountingEngine(dry_run=True, fail_after=1)
+    assert not batch_update_items(TwoPageTable(), engine=engine)
+    path = default_path(f"{CHECKPOINT_JOB}-dry-run")
+    dry = Checkpoint.open(path, CHECKPOINT_JOB, resume=True)
+    assert dry.counters["processed"] == 1
+    assert not os.path.exists(default_path(CHECKPOINT_JOB))
+
+
+def test_page_with_failed_updates_is_not_checkpointed():
+    engine = CountingEngine(fail_after=1, outcome=FAILED)
+    assert not batch_update_items(
+        TwoPageTable(), checkpoint_path="cp.json", engine=engine
+    )
+    cp = Checkpoint.open("cp.json", CHECKPOINT_JOB, resume=True)
+    assert cp.counters == {"processed": 1, "updated": 1}
+    assert cp.start_keys() == {0: {"jobId": "a"}}
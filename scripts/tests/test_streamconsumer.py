@@ -0,0 +1,70 @@
+from boto3.dynamodb.types import TypeSerializer
+
+from streamconsumer import StreamConsumer, batch_token
+
+_serializer = TypeSerializer()
+
+
+def record(event, job_id, seq, old=None, new=None):
+    ddb = {
+        "Keys": {"jobId": {"S": job_id}},
+        "SequenceNumber": seq,
+        "ApproximateCreationDateTime": 1760000000,
+    }
+    for name, image in (("OldImage", old), ("NewImage", new)):
+        if image is not None:
+            ddb[name] = {k: _serializer.serialize(v) for k, v in image.items()}
+    return {"eventID": f"{job_id}-{seq}", "eventName": event, "dynamodb": ddb}
+
+
+def posting(job_id, techs):
+    return {
+        "jobId": job_id,
+        "processed_date": "2025-10-01T00:00:00Z",
+        "technologies": techs,
+    }
+
+
+def counts(ddb):
+    items = ddb.Table("job-postings-technologies").scan()["Items"]
+    return {it["Name"]: int(it["postingCount"]) for it in items}
+
+
+def test_batch_token_is_stable_and_sorts_by_time():
+    batch = [record("INSERT", "j1", "1", new=posting("j1", ["Python"]))]
+    assert batch_token(batch) == batch_token([dict(r) for r in batch])
+    later = [dict(batch[0], dynamodb=dict(batch[0]["dynamodb"]))]
+    later[0]["dynamodb"]["ApproximateCreationDateTime"] = 1760000100
+    assert batch_token(batch) < batch_token(later)
+
+
+def test_retried_batch_is_counted_once(ddb):
+    consumer = StreamConsumer(write_workers=1)
+    inserts = [
+        record("INSERT", "j1", "1", new=posting("j1", ["Python", "AWS"])),
+        record("INSERT", "j2", "2", new=posting("j2", ["Python"])),
+    ]
+    consumer.process(inserts)
+    consumer.process(inserts)  # e.g. Lambda retrying the whole batch
+    assert counts(ddb) == {"Python": 2, "AWS": 1}
+    assert consumer.stats["lookup_replays"] == 2
+
+    removal = [record("REMOVE", "j1", "3", old=posting("j1", ["Python", "AWS"]))]
+    consumer.process(removal)
+    consumer.process(removal)
+    assert counts(ddb) == {"Python": 1}
+    consumer.close()
+
+
+def test_applied_batches_keep_only_the_newest(ddb, monkeypatch):
+    import streamconsumer
+
+    monkeypatch.setattr(streamconsumer, "APPLIED_BATCHES_KEPT", 2)
+    consumer = StreamConsumer(write_workers=1)
+    for i in range(4):
+        job = f"j{i}"
+        consumer.process([record("INSERT", job, str(i), new=posting(job, ["Go"]))])
+    (item,) = ddb.Table("job-postings-technologies").scan()["Items"]
+    assert item["postingCount"] == 4
+    assert len(item["appliedBatches"]) == 2
+    consumer.close()
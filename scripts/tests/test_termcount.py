@@ -0,0 +1,75 @@
+import copy
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from normalize import get_id_from_name, normalize_posting
+from termcount import TermCounter
+from termmap import term_display
+
+# spellings of one term, terms without a rule, and ones that count as nothing
+TERMS = "React react.js ReactJS python golang Go C# c++ Kafka kafka Node.JS".split()
+TERMS += ["node", "Python ", "", None, 7, "  "]
+
+
+def postings(n, seed=3):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        p = {"jobId": f"j{i}"}
+        for field in ("technologies", "skills"):
+            kind = rng.random()
+            if kind < 0.1:
+                continue  # missing
+            if kind < 0.15:
+                p[field] = "React"  # not a list: not counted
+            else:
+                p[field] = [rng.choice(TERMS) for _ in range(rng.randint(0, 6))]
+        out.append(p)
+    return out
+
+
+def counter():
+    return TermCounter(id_for=get_id_from_name, normalize=term_display)
+
+
+def per_posting(pages):
+    tech, skills = {}, {}
+    for page in pages:
+        for p in copy.deepcopy(page):
+            normalize_posting(p, tech, skills)
+    return tech, skills
+
+
+def test_counts_match_normalize_posting():
+    pages = [postings(50, seed) for seed in range(4)]
+    c = counter()
+    for page in pages:
+        c.add(page)
+    react = c.index("technologies")["React"]["count"]
+    # a term repeated in one posting, under several spellings, counts once
+    pages.append([{"technologies": ["React", "react", "React.js", "react"]}])
+    c.add(pages[-1])
+    assert c.index("technologies")["React"]["count"] == react + 1
+
+    tech, skills = per_posting(pages)
+    assert c.index("technologies") == tech
+    assert c.index("skills") == skills
+
+
+def test_seed_restores_checkpointed_counts():
+    first, second = postings(40, 1), postings(40, 2)
+    whole = counter()
+    whole.add(first)
+    whole.add(second)
+
+    before = counter()
+    before.add(first)
+    resumed = counter()  # a resumed run: counts come back from the checkpoint
+    for field in ("technologies", "skills"):
+        resumed.seed(field, copy.deepcopy(before.index(field)))
+    resumed.add(second)
+    for field in ("technologies", "skills"):
+        assert resumed.index(field) == whole.index(field)
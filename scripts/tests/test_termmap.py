@@ -0,0 +1,42 @@
+import threading
+
+import termmap
+from termmap import TermMap
+
+
+def test_terms_added_from_several_threads_all_reach_disk(monkeypatch):
+    monkeypatch.setattr(termmap, "FLUSH_EVERY", 4)
+    tm = TermMap.open("maps")
+    terms = [f"tool{n}" for n in range(4000)]
+
+    def work(k):
+        for raw in terms[k::4]:
+            tm.get(raw)
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    tm.flush()
+    assert tm.computed == len(terms)
+    reopened = TermMap.open("maps")
+    assert reopened.loaded == len(terms)
+    assert reopened.get("tool7") == tm.get("tool7")
+
+
+def test_default_map_is_created_once(monkeypatch):
+    monkeypatch.setattr(termmap, "_default", None)
+    registered = []
+    monkeypatch.setattr(termmap.atexit, "register", registered.append)
+    maps = []
+    threads = [
+        threading.Thread(target=lambda: maps.append(termmap.default_term_map()))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(m) for m in maps}) == 1
+    assert len(registered) == 1
@@ -0,0 +1,77 @@
+import random
+from collections import Counter, defaultdict
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from termmap import term_display
+from trendcube import TOP_COOCCURRING, TrendCube
+
+TECHS = [f"Tech{i:02d}" for i in range(14)]
+
+
+def postings(n, seed=7):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "jobId": f"j{i}",
+            "processed_date": f"2025-10-{rng.randint(1, 28):02d}T10:00:00Z",
+            "technologies": rng.sample(TECHS, rng.randint(1, 6)),
+            "location": rng.choice(["Chicago, IL, US", "Toronto, CA", ""]),
+            "remote_status": rng.choice(["remote", "hybrid", "on_site"]),
+            "seniority_level": rng.choice(["Senior", "Mid"]),
+        }
+
+
+def expected_cooccurring(items):
+    """The lambda's coMap + topN(10), ties broken by name."""
+    seen = defaultdict(Counter)
+    for p in items:
+        keys = {key for key, _ in rows_of(cube_from([p]))}
+        techs = {term_display(t) for t in p["technologies"]}
+        for key in keys:
+            for t in techs:
+                for u in techs - {t}:
+                    seen[(key, t)][u] += 1
+    return {
+        k: dict(sorted(c.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_COOCCURRING])
+        for k, c in seen.items()
+    }
+
+
+def cube_from(items, granularity="weekly"):
+    cube = TrendCube(granularity)
+    for p in items:
+        cube.add(p)
+    return cube
+
+
+def rows_of(cube):
+    return {
+        (r["region_seniority_mode_period"], r["skill_display"]): r
+        for r in cube.rows()
+    }
+
+
+def test_rows_carry_per_row_top_cooccurring():
+    items = list(postings(300))
+    rows = rows_of(cube_from(items))
+    expected = expected_cooccurring(items)
+    got = {
+        k: r["cooccurring_skills"] for k, r in rows.items() if "cooccurring_skills" in r
+    }
+    assert got == expected
+    assert any(len(v) == TOP_COOCCURRING for v in got.values())
+
+
+def test_merge_and_reload_keep_cooccurrence(tmp_path):
+    items = list(postings(200))
+    whole = rows_of(cube_from(items))
+    merged = cube_from(items[:80])
+    merged.merge(cube_from(items[80:]))
+    assert rows_of(merged) == whole
+
+    path = str(tmp_path / "cube.npz")
+    merged.save(path, 3)
+    assert rows_of(TrendCube.load(path)) == whole
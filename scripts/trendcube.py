@@ -0,0 +1,725 @@
+cat > trendcube.py << "EOF"
+#!/usr/bin/env python3
+"""
+period × region × seniority × work-mode technology counts, accumulated during
+the index backfill's scan and written as skill-trends-v2 rows.
+
+aggregate-skill-trends-v2 builds the same rows one period at a time from
+Neon; get-trends-v2 reads them by `region#seniority#work_mode#period`. This
+rebuilds every period from one scan of job-postings-enhanced:
+
+    cube = TrendCube("weekly")
+    for posting in postings:
+        cube.add(posting)
+    write_rows(cube, "ddb")          # or a .jsonl path
+
+Dimensions follow the lambda: ISO week (YYYY-Www) or day of processed_date;
+regions GLOBAL, country and country-state from `location`; seniority and
+work mode normalized like normSeniority / normWorkMode, with every posting
+also counted under work mode "All". Technologies are the canonical display
+names (normalize_term via termmap.py). Each posting adds
+(cell, tech) codes packed into one int64 to a SparseCounter
+(sparsecount.py); postings per (region, period) give the share denominators
+and the job-postings-totals rows. A parseable salary_range goes into the
+(cell, tech) salary sketches (salary.py).
+
+Rows carry job_count, salary min/median/p75/p95/max, regional/global/remote
+shares, the key/sort helpers and, with thresholds, the momentum fields
+(momentum.py) across the periods in the cube.
+
+Rows also get top_titles (5), industry_distribution (8) and
+cooccurring_skills (10: the other techs of the row's postings), like the
+lambda. By default counts and title/industry maps are exact, so the maps
+grow with the distinct titles seen. --trends-approx bounds the memory
+per row instead (sketches.py): job counts and totals become HyperLogLog
+estimates of distinct job ids (--distinct-error), and titles/industries
+become Space-Saving summaries whose counts are high by at most
+--top-error × the row's postings. summary() reports the bounds in effect.
+
+Co-occurrence is always exact: each (cell, tech) row that shares a posting
+with another tech gets a row id, and (row id, co-tech) codes go to a second
+SparseCounter, so its memory follows the distinct pairs seen.
+
+Cubes merge (TrendCube.merge): jtindex --trends-state keeps the final
+cube, and running this file adds saved cubes from separate segment runs
+or days together and writes the rows, without rescanning. Exact counts
+add up; approximate counts take the union of the job ids.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dates import parse_datetime
+from momentum import Thresholds, add_momentum_args, compute, period_ordinal
+from salary import SalarySketches, parse_salary
+from sketches import HyperLogLogs, SpaceSaving, capacity_for, hash64, precision_for
+from sparsecount import LOW, SHIFT, SparseCounter, _np, open_state, pack, save_npz
+from termmap import term_display
+
+TRENDS_TABLE = os.environ.get("TRENDS_TABLE", "skill-trends-v2")
+TOTALS_TABLE = os.environ.get("TOTALS_TABLE", "job-postings-totals")
+GRANULARITIES = ("weekly", "daily")
+DIMENSION = "technology"
+# scanned in addition to the index attributes
+TREND_ATTRS = (
+    "location",
+    "remote_status",
+    "seniority_level",
+    "salary_range",
+    "salary_mentioned",
+    "title",
+    "job_title",
+    "industry",
+)
+ROW_TECH_BITS = 24  # sketch keys: cell << ROW_TECH_BITS | tech
+TOP_TITLES = 5  # same as the lambda's topN(titles, 5) / topN(industries, 8)
+TOP_INDUSTRIES = 8
+TOP_COOCCURRING = 10  # topN(coMap, 10)
+DISTINCT_ERROR = 0.02
+TOP_ERROR = 0.02
+VERSION = 4
+READABLE_VERSIONS = (3, VERSION)  # v3 states predate co-occurrence
+
+US_STATES = frozenset(
+    "AL AK AZ AR CA CO CT DE FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO "
+    "MT NE NV NH NJ NM NY NC ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY "
+    "DC".split()
+)
+_LOCATION_SPLIT = re.compile(r"[,|]")
+_COUNTRY = re.compile(r"^[A-Z]{2}$")
+
+Cell = Tuple[str, str, str, str]  # region, seniority, work_mode, period
+
+
+# ---------- dimensions (same rules as aggregate-skill-trends-v2) ----------
+def parse_location(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """(region "US-IL" or None, country or None) from "Chicago, IL, US"."""
+    up = [p.strip().upper() for p in _LOCATION_SPLIT.split(text or "") if p.strip()]
+    country = next((p for p in reversed(up) if _COUNTRY.match(p)), None)
+    if not country:
+        if any("UNITED STATES" in p or p == "USA" for p in up):
+            country = "US"
+        elif any(p == "UK" or "UNITED KINGDOM" in p for p in up):
+            country = "GB"
+    state = None
+    if country == "US":
+        state = next((p for p in up if p in US_STATES), None)
+    region = f"{country}-{state}" if country and state else None
+    return region, country
+
+
+def regions_for(location: str) -> List[str]:
+    region, country = parse_location(location)
+    out = ["GLOBAL"]
+    if country:
+        out.append(country)
+    if region:
+        out.append(region)
+    return out
+
+
+def norm_seniority(raw: Any) -> str:
+    t = str(raw if raw is not None else "Unknown").strip().lower()
+    exact = {"entry": "Junior", "mid": "Mid", "senior": "Senior", "lead": "Lead"}
+    if t in exact:
+        return exact[t]
+    if t == "executive":
+        return "Principal"
+    for pattern, level in (
+        ("intern", "Intern"),
+        ("junior|entry", "Junior"),
+        ("lead", "Lead"),
+        ("principal", "Principal"),
+        ("manager", "Manager"),
+        ("director", "Director"),
+        ("senior|sr", "Senior"),
+        ("mid|intermediate", "Mid"),
+    ):
+        if re.search(pattern, t):
+            return level
+    return "Unknown"
+
+
+def norm_work_mode(raw: Any) -> str:
+    base = str(raw if raw is not None else "On-site").strip().lower()
+    token = re.sub(r"[\s-]+", "_", base)
+    if token == "remote":
+        return "Remote"
+    if token == "hybrid":
+        return "Hybrid"
+    if token in ("on_site", "onsite", "not_specified"):
+        return "On-site"
+    if "remote" in base:
+        return "Remote"
+    if "hybrid" in base:
+        return "Hybrid"
+    return "On-site"
+
+
+def period_of(dt: datetime, granularity: str = "weekly") -> str:
+    if granularity == "daily":
+        return dt.strftime("%Y-%m-%d")
+    year, week, _ = dt.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def norm_industry(raw: Any) -> str:
+    x = str(raw if raw is not None else "Unknown")
+    if x.lower() == "unknown":
+        return "Unknown"
+    return re.sub(r"\w\S*", lambda m: m.group(0).capitalize(), x)
+
+
+def zero_pad(n: int, width: int = 6) -> str:
+    return str(n).rjust(width, "0")
+
+
+def row_key(cell: int, tech: int) -> int:
+    return (cell << ROW_TECH_BITS) | tech
+
+
+# ---------- cube ----------
+class TrendCube:
+    def __init__(
+        self,
+        granularity: str = "weekly",
+        distinct_error: Optional[float] = None,
+        top_error: Optional[float] = None,
+    ):
+        """distinct_error / top_error set: approximate mode (see module docstring)."""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {GRANULARITIES}")
+        self.np = _np()
+        self.granularity = granularity
+        self.distinct_error = distinct_error
+        self.top_error = top_error
+        self.cells: List[Cell] = []
+        self._cell_ids: Dict[Cell, int] = {}
+        self.techs: List[str] = []
+        self._tech_ids: Dict[str, int] = {}
+        self.region_periods: List[Tuple[str, str]] = []
+        self._rp_ids: Dict[Tuple[str, str], int] = {}
+        self.counts = SparseCounter()  # cell << 32 | tech -> postings
+        self.totals = SparseCounter()  # region-period id -> postings
+        self.salaries = SalarySketches()  # keyed by row_key(cell, tech)
+        capacity = capacity_for(top_error) if top_error else None
+        self.titles = SpaceSaving(capacity)  # row_key -> {title: postings}
+        self.industries = SpaceSaving(capacity)
+        self._row_ids: Dict[int, int] = {}  # pack(cell, tech) -> row id
+        self.row_codes: List[int] = []  # row id -> pack(cell, tech)
+        self.cooccurring = SparseCounter()  # pack(row id, co-tech) -> postings
+        self.distinct = self.distinct_totals = None
+        if distinct_error:
+            # job ids per row_key / per region-period id
+            self.distinct = HyperLogLogs(precision_for(distinct_error))
+            self.distinct_totals = HyperLogLogs(self.distinct.p)
+        self.postings = 0  # postings counted
+        self.undated = 0  # skipped: processed_date missing/unparseable
+        self.seq = 0
+
+    @staticmethod
+    def _intern(key, ids: Dict, keys: List) -> int:
+        i = ids.get(key)
+        if i is None:
+            i = ids[key] = len(keys)
+            keys.append(key)
+        return i
+
+    def add(self, posting: Dict[str, Any]) -> None:
+        techs = posting.get("technologies")
+        if not techs or not isinstance(techs, list):
+            return
+        tech_ids = {
+            self._intern(d, self._tech_ids, self.techs)
+            for d in (term_display(t) for t in techs if t and isinstance(t, str))
+            if d
+        }
+        if not tech_ids:
+            return  # the lambda skips postings without a primary tech too
+        dt = parse_datetime(posting.get("processed_date"))
+        if dt is None:
+            self.undated += 1
+            return
+        self.postings += 1
+        period = period_of(dt, self.granularity)
+        seniority = norm_seniority(posting.get("seniority_level"))
+        mode = norm_work_mode(posting.get("remote_status"))
+        salary = parse_salary(
+            posting.get("salary_range"), bool(posting.get("salary_mentioned"))
+        )
+        title = str(posting.get("job_title") or posting.get("title") or "").strip()
+        industry = norm_industry(posting.get("industry"))
+        codes, keys, rps, co = [], [], [], []
+        for region in regions_for(posting.get("location") or ""):
+            rp = self._intern((region, period), self._rp_ids, self.region_periods)
+            rps.append(rp)
+            for m in (mode, "All"):
+                key = (region, seniority, m, period)
+                cell = self._intern(key, self._cell_ids, self.cells)
+                codes.extend(pack(cell, t) for t in tech_ids)
+                keys.extend(row_key(cell, t) for t in tech_ids)
+        if len(tech_ids) > 1:
+            row_ids, row_codes = self._row_ids, self.row_codes
+            techs = list(tech_ids) * (len(codes) // len(tech_ids))
+            for code, t in zip(codes, techs):
+                high = self._intern(code, row_ids, row_codes) << SHIFT
+                co.extend([high | u for u in tech_ids if u != t])
+            self.cooccurring.extend(co)
+        self.counts.extend(codes)
+        self.totals.extend(rps)
+        if salary:
+            self.salaries.extend(keys, salary.annual)
+        for k in keys:
+            if title:
+                self.titles.add(k, title)
+            self.industries.add(k, industry)
+        if self.distinct is not None:
+            job_id = posting.get("id") or posting.get("jobId") or posting.get("PK")
+            h = hash64(job_id or f"#{self.postings}")
+            self.distinct.add(keys, h)
+            self.distinct_totals.add(rps, h)
+
+    @property
+    def approximate(self) -> bool:
+        return bool(self.distinct_error or self.top_error)
+
+    def merge(self, other: "TrendCube") -> None:
+        """Add another cube's counts, totals and salary sketches to this one."""
+        if other.granularity != self.granularity:
+            raise ValueError(f"can't merge {other.granularity} into {self.granularity}")
+        if (other.distinct_error, other.top_error) != (self.distinct_error, self.top_error):
+            raise ValueError("can't merge cubes built with different error bounds")
+        np = self.np
+
+        def id_map(keys, ids, mine):
+            return np.array([self._intern(k, ids, mine) for k in keys], dtype=np.int64)
+
+        cells = id_map(other.cells, self._cell_ids, self.cells)
+        techs = id_map(other.techs, self._tech_ids, self.techs)
+        rps = id_map(other.region_periods, self._rp_ids, self.region_periods)
+        c, t, n = other.counts.split()
+        self.counts.update(pack(cells[c], techs[t]), n)
+        self.totals.update(rps[other.totals.keys], other.totals.counts)
+        mask = (1 << ROW_TECH_BITS) - 1
+
+        def remap(keys):
+            return (cells[keys >> ROW_TECH_BITS] << ROW_TECH_BITS) | techs[keys & mask]
+
+        def remap_one(key):
+            return row_key(int(cells[key >> ROW_TECH_BITS]), int(techs[key & mask]))
+
+        self.salaries.merge(other.salaries, remap)
+        self.titles.merge(other.titles, remap_one)
+        self.industries.merge(other.industries, remap_one)
+        if other.row_codes:
+            codes = np.array(other.row_codes, dtype=np.int64)
+            mine = pack(cells[codes >> SHIFT], techs[codes & LOW])
+            rows = id_map(mine.tolist(), self._row_ids, self.row_codes)
+            r, u, n = other.cooccurring.split()
+            self.cooccurring.update(pack(rows[r], techs[u]), n)
+        if self.distinct is not None:
+            self.distinct.merge(other.distinct, remap)
+            self.distinct_totals.merge(other.distinct_totals, lambda k: rps[k])
+        self.postings += other.postings
+        self.undated += other.undated
+
+    def _aligned(self, keys, values):
+        """row_key-indexed values as a float64 array aligned with counts (NaN = none)."""
+        np = self.np
+        mask = (1 << ROW_TECH_BITS) - 1
+        col = np.full(len(self.counts.keys), np.nan)
+        at = np.searchsorted(self.counts.keys, pack(keys >> ROW_TECH_BITS, keys & mask))
+        col[at] = values
+        return col
+
+    def salary_stats(self):
+        """{quantile or "min"/"max": float64 array aligned with counts, NaN = no salary}."""
+        stats = self.salaries.quantiles()
+        columns = {"min": stats.min, "max": stats.max, **stats.quantiles}
+        return {name: self._aligned(stats.keys, values) for name, values in columns.items()}
+
+    def job_counts(self):
+        """Postings per row aligned with counts: exact, or HyperLogLog estimates."""
+        np = self.np
+        if self.distinct is None:
+            return self.counts.counts
+        keys, est = self.distinct.estimate()
+        return np.maximum(np.rint(self._aligned(keys, est)), 1).astype(np.int64)
+
+    def total_counts(self) -> Dict[Tuple[str, str], int]:
+        if self.distinct_totals is None:
+            ids, counts = self.totals.keys, self.totals.counts
+        else:
+            ids, counts = self.distinct_totals.estimate()
+            counts = self.np.rint(counts)
+        rps = self.region_periods
+        return {rps[i]: int(n) for i, n in zip(ids.tolist(), counts.tolist())}
+
+    def top_cooccurring(self, k: int = TOP_COOCCURRING) -> Dict[int, Dict[str, int]]:
+        """
+        {pack(cell, tech): {co-tech: postings with both}}, the K largest per
+        row, ties by name (cooccur.CooccurrenceMatrix.top_k, per row).
+        """
+        np = self.np
+        rows, cols, counts = self.cooccurring.split()
+        if not len(counts):
+            return {}
+        rank = np.empty(len(self.techs), dtype=np.int64)
+        names = np.array(self.techs, dtype=object)
+        rank[np.argsort(names)] = np.arange(len(names))
+        order = np.lexsort((rank[cols], -counts, rows))
+        rows, cols, counts = rows[order], cols[order], counts[order]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        lengths = np.diff(np.r_[starts, len(rows)])
+        pos = np.arange(len(rows)) - np.repeat(starts, lengths)  # rank within row
+        keep = pos < k
+        out: Dict[int, Dict[str, int]] = {}
+        codes, techs = self.row_codes, self.techs
+        kept = zip(rows[keep].tolist(), cols[keep].tolist(), counts[keep].tolist())
+        for r, c, n in kept:
+            out.setdefault(codes[r], {})[techs[c]] = n
+        return out
+
+    def momentum(
+        self, thresholds: Thresholds = Thresholds(), salary_median=None, counts=None
+    ):
+        """momentum.compute() over every (tech, region#seniority#mode) series."""
+        np = self.np
+        combos: Dict[Tuple[str, str, str], int] = {}
+        ordinals = {p: period_ordinal(p) for p in {c[3] for c in self.cells}}
+        combo_of = np.array(
+            [combos.setdefault(c[:3], len(combos)) for c in self.cells], dtype=np.int64
+        )
+        ordinal_of = np.array([ordinals[c[3]] for c in self.cells], dtype=np.int64)
+        cell_ids, tech_ids, exact = self.counts.split()
+        counts = exact if counts is None else counts
+        series = pack(combo_of[cell_ids], tech_ids)
+        return compute(series, ordinal_of[cell_ids], counts, salary_median, thresholds)
+
+    def rows(self, thresholds: Optional[Thresholds] = None) -> Iterator[Dict[str, Any]]:
+        """
+        SkillTrendV2Item-shaped rows, one per (cell, tech); with thresholds
+        they carry the momentum fields too.
+        """
+        salaries = self.salary_stats()
+        job_counts = self.job_counts()
+        momentum = None
+        if thresholds is not None:
+            momentum = self.momentum(thresholds, salaries[0.5], job_counts)
+        salary_fields = [
+            (field, salaries[q].tolist())
+            for field, q in (
+                ("salary_min", "min"),
+                ("salary_max", "max"),
+                ("salary_median", 0.5),
+                ("salary_p75", 0.75),
+                ("salary_p95", 0.95),
+            )
+        ]
+        totals = self.total_counts()
+        cooccurring = self.top_cooccurring()
+        cells, techs = self.cells, self.techs
+        cell_ids, tech_ids, _ = self.counts.split()
+        counts = job_counts.tolist()
+        codes = self.counts.keys.tolist()
+        lookup = dict(zip(codes, counts))
+        entries = zip(cell_ids.tolist(), tech_ids.tolist(), counts)
+        for i, (c, t, n) in enumerate(entries):
+            region, seniority, mode, period = cells[c]
+            skill = techs[t]
+            row = {
+                "skill_canonical": skill.lower(),
+                "skill_display": skill,
+                "region_seniority_mode_period": f"{region}#{seniority}#{mode}#{period}",
+                "region": region,
+                "seniority": seniority,
+                "work_mode": mode,
+                "period": period,
+                "dimension": DIMENSION,
+                "period_skill": f"{period}#{skill}",
+                "job_count_desc": f"{zero_pad(n)}#{skill}#{region}",
+                "job_count": n,
+            }
+            for field, values in salary_fields:
+                if values[i] == values[i]:  # NaN: no salary in this cell
+                    row[field] = round(values[i])
+            if mode == "All":
+                remote = self._cell_ids.get((region, seniority, "Remote", period))
+                hits = lookup.get(pack(remote, t), 0) if remote is not None else 0
+                row["remote_share"] = min(1.0, hits / n)
+            regional = totals.get((region, period))
+            if regional:
+                row["regional_share"] = n / regional
+            global_total = totals.get(("GLOBAL", period))
+            if global_total:
+                row["global_share"] = n / global_total
+            key = row_key(c, t)
+            for field, top, n_top in (
+                ("top_titles", self.titles, TOP_TITLES),
+                ("industry_distribution", self.industries, TOP_INDUSTRIES),
+            ):
+                counts_by_label = top.top(key, n_top)
+                if counts_by_label:
+                    row[field] = counts_by_label
+            co = cooccurring.get(codes[i])
+            if co:
+                row["cooccurring_skills"] = co
+            if momentum is not None:
+                row.update(momentum.fields(i))
+            yield row
+
+    def totals_rows(self) -> Iterator[Dict[str, Any]]:
+        for (region, period), n in self.total_counts().items():
+            yield {"period": period, "region": region, "job_count": n}
+
+    # --- persistence ------------------------------------------------------
+    def save(self, path: str, seq: int) -> None:
+        """Atomically write the state, tagged with the checkpoint commit `seq`."""
+        self.seq = seq
+        meta = {
+            "version": VERSION,
+            "granularity": self.granularity,
+            "cells": self.cells,
+            "techs": self.techs,
+            "region_periods": self.region_periods,
+            "postings": self.postings,
+            "undated": self.undated,
+            "distinct_error": self.distinct_error,
+            "top_error": self.top_error,
+            "seq": seq,
+        }
+        arrays = {
+            "keys": self.counts.keys,
+            "counts": self.counts.counts,
+            "total_keys": self.totals.keys,
+            "total_counts": self.totals.counts,
+            "salary_codes": self.salaries.counts.keys,
+            "salary_counts": self.salaries.counts.counts,
+            "row_codes": self.np.array(self.row_codes, dtype=self.np.int64),
+            "cooccurring_keys": self.cooccurring.keys,
+            "cooccurring_counts": self.cooccurring.counts,
+        }
+        for name, top in (("titles", self.titles), ("industries", self.industries)):
+            arrays.update({f"{name}_{k}": v for k, v in top.state().items()})
+        if self.distinct is not None:
+            for name, hll in (("hll", self.distinct), ("hll_totals", self.distinct_totals)):
+                arrays.update({f"{name}_{k}": v for k, v in hll.state().items()})
+        save_npz(path, meta=self.np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "TrendCube":
+        with _np().load(path) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta["version"] not in READABLE_VERSIONS:
+                raise ValueError(f"{path}: trend cube state v{meta['version']}")
+            cube = cls(meta["granularity"], meta["distinct_error"], meta["top_error"])
+            for cell in meta["cells"]:
+                cube._intern(tuple(cell), cube._cell_ids, cube.cells)
+            for tech in meta["techs"]:
+                cube._intern(tech, cube._tech_ids, cube.techs)
+            for rp in meta["region_periods"]:
+                cube._intern(tuple(rp), cube._rp_ids, cube.region_periods)
+            cube.counts.load(z["keys"], z["counts"])
+            cube.totals.load(z["total_keys"], z["total_counts"])
+            cube.salaries.counts.load(z["salary_codes"], z["salary_counts"])
+            if "row_codes" in z:  # v3: no co-occurrence; its rows go without
+                for code in z["row_codes"].tolist():
+                    cube._intern(code, cube._row_ids, cube.row_codes)
+                cube.cooccurring.load(z["cooccurring_keys"], z["cooccurring_counts"])
+            fields = ("keys", "labels", "counts", "total_keys", "totals")
+            for name, top in (("titles", cube.titles), ("industries", cube.industries)):
+                top.load(*(z[f"{name}_{k}"] for k in fields))
+            if cube.distinct is not None:
+                cube.distinct.load(z["hll_codes"], z["hll_ranks"])
+                cube.distinct_totals.load(z["hll_totals_codes"], z["hll_totals_ranks"])
+        cube.postings, cube.undated = meta["postings"], meta["undated"]
+        cube.seq = meta["seq"]
+        return cube
+
+    def summary(self) -> str:
+        periods = {p for _, p in self.region_periods}
+        return (
+            f"{self.postings} postings ({self.undated} undated), {len(periods)} periods, "
+            f"{len(self.techs)} techs, {len(self.counts)} rows, "
+            f"{len(self.salaries)} with salaries; {self.accuracy()}"
+        )
+
+    def accuracy(self) -> str:
+        """The error bounds this cube's counts and top-N maps were built with."""
+        if not self.approximate:
+            return "exact counts"
+        parts = []
+        if self.distinct is not None:
+            se = self.distinct.std_error
+            parts.append(
+                f"job counts ±{se:.1%} (1σ, ±{2 * se:.1%} 95%; "
+                f"HyperLogLog p={self.distinct.p}, {self.distinct.registers()} registers)"
+            )
+        if self.top_error:
+            worst = max(self.titles.totals.values(), default=0) / self.titles.capacity
+            parts.append(
+                f"title/industry counts high by ≤{self.top_error:.1%} of a row's "
+                f"postings (≤{worst:.0f}; Space-Saving, {self.titles.capacity}/row)"
+            )
+        return ", ".join(parts)
+
+
+def state_path(checkpoint_path: str) -> str:
+    return f"{checkpoint_path}.trendcube.npz"
+
+
+def open_cube(checkpoint_path: str, seq: Optional[int], resumed: bool, **options):
+    """
+    Fresh TrendCube(**options), or on --resume the one saved with checkpoint
+    commit `seq` (which keeps the options it was built with).
+    """
+    cube = open_state(
+        state_path(checkpoint_path),
+        seq,
+        resumed,
+        fresh=lambda: TrendCube(**options),
+        load=TrendCube.load,
+        label="trend cube",
+    )
+    if cube is not None and cube.granularity != options.get("granularity", "weekly"):
+        print(f"⚠ Checkpointed trend cube is {cube.granularity}; keeping that")
+    return cube
+
+
+def cube_options(args) -> Dict[str, Any]:
+    return {
+        "granularity": args.trends_granularity,
+        "distinct_error": args.distinct_error if args.trends_approx else None,
+        "top_error": args.top_error if args.trends_approx else None,
+    }
+
+
+def write_rows(
+    cube: TrendCube, dest: str, workers: int = 8, thresholds: Optional[Thresholds] = None
+) -> Tuple[int, int]:
+    """
+    dest "ddb": BatchWriteItem into TRENDS_TABLE / TOTALS_TABLE (ddbwriter.py).
+    Otherwise a JSON-lines path; totals go to <path minus .jsonl>.totals.jsonl.
+    Returns (trend rows, totals rows).
+    """
+    if dest == "ddb":
+        import boto3
+        from decimal import Decimal
+
+        from ddbwriter import BatchWriter
+
+        def ddb_item(row):  # DynamoDB numbers must be Decimal
+            return {
+                k: Decimal(repr(v)) if isinstance(v, float) else v for k, v in row.items()
+            }
+
+        dynamodb = boto3.resource("dynamodb")
+        n_rows = n_totals = 0
+        with BatchWriter(
+            dynamodb.Table(TRENDS_TABLE),
+            key_names=["skill_canonical", "region_seniority_mode_period"],
+            workers=workers,
+        ) as w:
+            for row in cube.rows(thresholds):
+                w.put(ddb_item(row))
+                n_rows += 1
+        with BatchWriter(
+            dynamodb.Table(TOTALS_TABLE),
+            key_names=["period", "region"],
+            workers=workers,
+        ) as w:
+            for row in cube.totals_rows():
+                w.put(row)
+                n_totals += 1
+        return n_rows, n_totals
+
+    stem = dest[: -len(".jsonl")] if dest.endswith(".jsonl") else dest
+    totals_path = f"{stem}.totals.jsonl"
+    counts = []
+    for path, rows in ((dest, cube.rows(thresholds)), (totals_path, cube.totals_rows())):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        n = 0
+        with open(f"{path}.tmp", "w") as f:
+            for row in rows:
+                f.write(json.dumps(row, sort_keys=True) + "\n")
+                n += 1
+        os.replace(f"{path}.tmp", path)
+        counts.append(n)
+    return counts[0], counts[1]
+
+
+def add_trend_args(parser):
+    parser.add_argument(
+        "--trends",
+        default=None,
+        metavar="ddb|PATH",
+        help=f"also build period×region×seniority×work-mode tech counts: 'ddb' writes "
+        f"{TRENDS_TABLE} + {TOTALS_TABLE}, a path writes JSON lines",
+    )
+    parser.add_argument(
+        "--trends-granularity",
+        choices=GRANULARITIES,
+        default="weekly",
+        help="trend period: ISO week or day (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--trends-state",
+        default=None,
+        metavar="PATH",
+        help="also keep the final cube here (.npz) for merging with other runs "
+        "(python3 trendcube.py)",
+    )
+    parser.add_argument(
+        "--trends-approx",
+        action="store_true",
+        help="bounded memory per row: HyperLogLog job counts, "
+        "Space-Saving titles/industries",
+    )
+    parser.add_argument(
+        "--distinct-error",
+        type=float,
+        default=DISTINCT_ERROR,
+        help="--trends-approx job count standard error (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--top-error",
+        type=float,
+        default=TOP_ERROR,
+        help="--trends-approx title/industry count error, as a share of a row's postings "
+        "(default: %(default)s)",
+    )
+    return add_momentum_args(parser)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from ddbwriter import add_writer_args
+    from momentum import thresholds_from_args
+
+    ap = argparse.ArgumentParser(
+        description="Merge trend cubes saved by jtindex --trends-state and write their rows"
+    )
+    ap.add_argument("cubes", nargs="+", help=".npz cubes (same granularity)")
+    ap.add_argument("--out", default=None, help="save the merged cube here (.npz)")
+    ap.add_argument("--write", default=None, metavar="ddb|PATH", help="write the rows")
+    add_writer_args(ap)
+    args = add_momentum_args(ap).parse_args()
+    cube = TrendCube.load(args.cubes[0])
+    for path in args.cubes[1:]:
+        cube.merge(TrendCube.load(path))
+    print(f"✓ Merged {len(args.cubes)} cubes: {cube.summary()}")
+    if args.out:
+        cube.save(args.out, cube.seq)
+        print(f"  saved → {args.out}")
+    if args.write:
+        rows, totals = write_rows(
+            cube, args.write, args.write_workers, thresholds_from_args(args)
+        )
+        print(f"  wrote {rows} rows, {totals} totals → {args.write}")
+EOF